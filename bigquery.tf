@@ -28,7 +28,7 @@ resource "google_bigquery_table" "breweries_all_data" {
     field = "source_date"
   }
 
-  clustering = ["name_state", "type_brewery"]
+  clustering = ["id_geohash_5", "name_state", "type_brewery"]
 
   schema = jsonencode([
     {
@@ -180,6 +180,60 @@ resource "google_bigquery_table" "breweries_all_data" {
       type = "BOOLEAN"
       mode = "NULLABLE"
       description = "Whether brewery has contact information"
+    },
+    {
+      name = "value_phone_e164"
+      type = "STRING"
+      mode = "NULLABLE"
+      description = "Phone number normalized to E.164"
+    },
+    {
+      name = "url_domain"
+      type = "STRING"
+      mode = "NULLABLE"
+      description = "Website domain without scheme and www prefix"
+    },
+    {
+      name = "url_website_canonical"
+      type = "STRING"
+      mode = "NULLABLE"
+      description = "Canonical https website URL"
+    },
+    {
+      name = "value_postal_code_normalized"
+      type = "STRING"
+      mode = "NULLABLE"
+      description = "Postal code normalized with per-country rules"
+    },
+    {
+      name = "geo_point"
+      type = "GEOGRAPHY"
+      mode = "NULLABLE"
+      description = "Brewery location as a geographic point"
+    },
+    {
+      name = "id_geohash_3"
+      type = "STRING"
+      mode = "NULLABLE"
+      description = "Geohash cell with precision 3 (~156km)"
+    },
+    {
+      name = "id_geohash_5"
+      type = "STRING"
+      mode = "NULLABLE"
+      description = "Geohash cell with precision 5 (~4.9km)"
+    },
+    {
+      name = "id_geohash_7"
+      type = "STRING"
+      mode = "NULLABLE"
+      description = "Geohash cell with precision 7 (~153m)"
+    },
+    {
+      name = "id_brewery_cluster"
+      type = "STRING"
+      mode = "NULLABLE"
+      description = "Smallest brewery id among records detected as the same brewery"
     }
   ])
 
@@ -189,6 +243,335 @@ resource "google_bigquery_table" "breweries_all_data" {
   }
 }
 
+# Streaming table: silver records appended per micro-batch while the
+# extraction is still running (see stream-load)
+resource "google_bigquery_table" "breweries_stream" {
+  project = var.data-project
+  dataset_id = google_bigquery_dataset.breweries_foundation.dataset_id
+  table_id   = "breweries_stream"
+  deletion_protection = !local.enable_delete_protection
+  description = "Silver brewery records streamed before the daily transform"
+
+  depends_on = [google_bigquery_dataset.breweries_foundation]
+
+  time_partitioning {
+    type  = "DAY"
+    field = "source_date"
+  }
+
+  schema = jsonencode([
+    {
+      name = "id_brewery"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "name_brewery"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "type_brewery"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "address_line_1"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "address_line_2"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "address_line_3"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "name_city"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "name_state_province"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "value_postal_code"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "name_country"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "longitude"
+      type = "FLOAT"
+      mode = "NULLABLE"
+    },
+    {
+      name = "latitude"
+      type = "FLOAT"
+      mode = "NULLABLE"
+    },
+    {
+      name = "phone"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "url_website"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "name_state"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "name_street"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "processing_date"
+      type = "DATE"
+      mode = "NULLABLE"
+    },
+    {
+      name = "processing_timestamp"
+      type = "TIMESTAMP"
+      mode = "NULLABLE"
+    },
+    {
+      name = "source_date"
+      type = "DATE"
+      mode = "NULLABLE"
+    }
+  ])
+
+  labels = {
+    project = var.data-project
+    type    = "stream-data"
+  }
+}
+
+# Run ledger: one row per pipeline stage (functions and Dataproc jobs)
+# keyed by run_id, used to find where the daily run spends its time
+resource "google_bigquery_table" "pipeline_run_ledger" {
+  project = var.data-project
+  dataset_id = google_bigquery_dataset.breweries_foundation.dataset_id
+  table_id   = "pipeline_run_ledger"
+  deletion_protection = !local.enable_delete_protection
+  description = "Per-stage timings and volumes of each pipeline run"
+
+  depends_on = [google_bigquery_dataset.breweries_foundation]
+
+  time_partitioning {
+    type  = "DAY"
+    field = "run_date"
+  }
+
+  clustering = ["run_id", "component"]
+
+  schema = jsonencode([
+    {
+      name = "run_id"
+      type = "STRING"
+      mode = "REQUIRED"
+    },
+    {
+      name = "run_date"
+      type = "DATE"
+      mode = "REQUIRED"
+    },
+    {
+      name = "component"
+      type = "STRING"
+      mode = "REQUIRED"
+    },
+    {
+      name = "stage"
+      type = "STRING"
+      mode = "REQUIRED"
+    },
+    {
+      name = "started_at"
+      type = "TIMESTAMP"
+      mode = "NULLABLE"
+    },
+    {
+      name = "finished_at"
+      type = "TIMESTAMP"
+      mode = "NULLABLE"
+    },
+    {
+      name = "duration_seconds"
+      type = "FLOAT"
+      mode = "NULLABLE"
+    },
+    {
+      name = "status"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "records"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "bytes"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "details"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "recorded_at"
+      type = "TIMESTAMP"
+      mode = "NULLABLE"
+    }
+  ])
+
+  labels = {
+    project = var.data-project
+    type    = "run-ledger"
+  }
+}
+
+# Validation history: one row per partition validation (metrics and
+# bytes scanned), so validation cost and data quality can be tracked
+resource "google_bigquery_table" "validation_history" {
+  project = var.data-project
+  dataset_id = google_bigquery_dataset.breweries_foundation.dataset_id
+  table_id   = "validation_history"
+  deletion_protection = !local.enable_delete_protection
+  description = "Metrics and scan cost of each breweries partition validation"
+
+  depends_on = [google_bigquery_dataset.breweries_foundation]
+
+  time_partitioning {
+    type  = "DAY"
+    field = "source_date"
+  }
+
+  clustering = ["table_id"]
+
+  schema = jsonencode([
+    {
+      name = "validated_at"
+      type = "TIMESTAMP"
+      mode = "REQUIRED"
+    },
+    {
+      name = "source_date"
+      type = "DATE"
+      mode = "REQUIRED"
+    },
+    {
+      name = "table_id"
+      type = "STRING"
+      mode = "REQUIRED"
+    },
+    {
+      name = "source"
+      type = "STRING"
+      mode = "NULLABLE"
+    },
+    {
+      name = "total_records"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "unique_breweries"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "brewery_types"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "states_count"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "null_ids"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "null_names"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "null_types"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "null_states"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "quality_score"
+      type = "FLOAT"
+      mode = "NULLABLE"
+    },
+    {
+      name = "passed"
+      type = "BOOLEAN"
+      mode = "NULLABLE"
+    },
+    {
+      name = "bytes_estimated"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "bytes_processed"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "bytes_billed"
+      type = "INTEGER"
+      mode = "NULLABLE"
+    },
+    {
+      name = "cache_hit"
+      type = "BOOLEAN"
+      mode = "NULLABLE"
+    },
+    {
+      name = "details"
+      type = "STRING"
+      mode = "NULLABLE"
+    }
+  ])
+
+  labels = {
+    project = var.data-project
+    type    = "validation-history"
+  }
+}
+
 # View: Aggregated data by brewery type
 resource "google_bigquery_table" "breweries_agg_type" {
   dataset_id = google_bigquery_dataset.breweries_foundation.dataset_id
@@ -16,6 +16,16 @@ resource "google_storage_bucket" "silver" {
   labels = local.labels
 }
 
+# Per country/state extracts for downstream consumers (bulk-export job)
+resource "google_storage_bucket" "export" {
+  project = var.data-project
+  name = "${var.project}-export${var.branch-hash}"
+  force_destroy = local.enable_delete_protection
+  uniform_bucket_level_access = true
+  location = var.region
+  labels = local.labels
+}
+
 resource "google_storage_bucket" "dataproc-bucket" {
   project = var.project
   name = "${var.project}-dataproc-code${var.branch-hash}"
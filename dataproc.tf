@@ -12,6 +12,33 @@ resource "google_storage_bucket_object" "dataproc-code" {
   source = "scr/dataproc/${each.value}"
 }
 
+locals {
+  run_ledger_table = "${var.data-project}.${google_bigquery_dataset.breweries_foundation.dataset_id}.${google_bigquery_table.pipeline_run_ledger.table_id}"
+
+  # Properties read by common/run_ledger.py and common/tracing.py (runId
+  # and traceparent are set per run through the RUN_ID and TRACEPARENT
+  # template parameters)
+  dataproc_job_properties = {
+    "spark.brwy.ledgerTable"       = local.run_ledger_table
+    "spark.brwy.runId"             = ""
+    "spark.brwy.traceparent"       = ""
+    "spark.brwy.traceExporter"     = var.trace-exporter
+    # Ids changed by total-transform (common/change_feed.py)
+    "spark.brwy.changeFeedTopic"   = google_pubsub_topic.change_feed_topic.id
+    # Share of bronze pages with corrupt records total-load tolerates
+    # (common/record_quarantine.py)
+    "spark.brwy.corruptPageBudget" = tostring(var.corrupt-page-budget)
+    # Opt-in stage metrics profiles (common/stage_profiler.py)
+    "spark.brwy.profilePath"       = var.spark-profiling ? "gs://${google_storage_bucket.dataproc-bucket.name}/profiles" : ""
+  }
+
+  # Shared modules passed to every PySpark job (python_file_uris)
+  dataproc_common_files = [
+    for f in fileset("scr/dataproc/breweries/common", "*.py") :
+    "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/common/${f}"
+  ]
+}
+
 resource "google_storage_bucket_object" "init-script" {
   name = "scripts/init_dataproc.sh"
   bucket = google_storage_bucket.dataproc-bucket.name
@@ -27,7 +54,31 @@ resource "google_dataproc_workflow_template" "brwy_pipeline" {
     description = "Date parameter for processing (format: YYYY-MM-DD)"
     fields = [
         "jobs['total-load'].pysparkJob.args[0]",
-        "jobs['total-transform'].pysparkJob.args[0]"
+        "jobs['total-transform'].pysparkJob.args[0]",
+        "jobs['search-index'].pysparkJob.args[0]",
+        "jobs['bulk-export'].pysparkJob.args[0]"
+        ]
+  }
+
+  parameters {
+    name = "RUN_ID"
+    description = "Run id shared with the run ledger records"
+    fields = [
+        "jobs['total-load'].pysparkJob.properties['spark.brwy.runId']",
+        "jobs['total-transform'].pysparkJob.properties['spark.brwy.runId']",
+        "jobs['search-index'].pysparkJob.properties['spark.brwy.runId']",
+        "jobs['bulk-export'].pysparkJob.properties['spark.brwy.runId']"
+        ]
+  }
+
+  parameters {
+    name = "TRACEPARENT"
+    description = "W3C trace context of the trigger-dataproc span"
+    fields = [
+        "jobs['total-load'].pysparkJob.properties['spark.brwy.traceparent']",
+        "jobs['total-transform'].pysparkJob.properties['spark.brwy.traceparent']",
+        "jobs['search-index'].pysparkJob.properties['spark.brwy.traceparent']",
+        "jobs['bulk-export'].pysparkJob.properties['spark.brwy.traceparent']"
         ]
   }
 
@@ -86,6 +137,8 @@ resource "google_dataproc_workflow_template" "brwy_pipeline" {
     step_id = "total-load"
     pyspark_job {
       main_python_file_uri = "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/load/total-load.py"
+      python_file_uris = local.dataproc_common_files
+      properties = local.dataproc_job_properties
       args = [
         "DATE", 
         google_storage_bucket.bronze.name, 
@@ -98,6 +151,8 @@ resource "google_dataproc_workflow_template" "brwy_pipeline" {
     step_id = "total-transform"
     pyspark_job {
       main_python_file_uri = "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/transform/total-transform.py"
+      python_file_uris = local.dataproc_common_files
+      properties = local.dataproc_job_properties
       args = [
         "DATE", 
         google_storage_bucket.silver.name, 
@@ -110,5 +165,193 @@ resource "google_dataproc_workflow_template" "brwy_pipeline" {
     prerequisite_step_ids = ["total-load"]
   }
 
+  # Name search artifact built from the same silver date
+  jobs {
+    step_id = "search-index"
+    pyspark_job {
+      main_python_file_uri = "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/search/search-index.py"
+      python_file_uris = local.dataproc_common_files
+      properties = local.dataproc_job_properties
+      args = [
+        "DATE",
+        google_storage_bucket.silver.name
+      ]
+    }
+    prerequisite_step_ids = ["total-load"]
+  }
+
+  # Per country/state Parquet and CSV extracts of the same silver date
+  jobs {
+    step_id = "bulk-export"
+    pyspark_job {
+      main_python_file_uri = "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/export/bulk-export.py"
+      python_file_uris = local.dataproc_common_files
+      properties = local.dataproc_job_properties
+      args = [
+        "DATE",
+        google_storage_bucket.silver.name,
+        google_storage_bucket.export.name
+      ]
+    }
+    prerequisite_step_ids = ["total-load"]
+  }
+
   labels = local.labels
-}
\ No newline at end of file
+}
+
+# Streaming variant: stream-load micro-batches bronze pages while they land
+resource "google_dataproc_workflow_template" "brwy_stream_pipeline" {
+  name     = "brwy-stream-template${var.branch-hash}"
+  location = var.region
+
+  parameters {
+    name = "DATE"
+    description = "Date parameter for processing (format: YYYY-MM-DD)"
+    fields = [
+        "jobs['stream-load'].pysparkJob.args[0]",
+        "jobs['total-transform'].pysparkJob.args[0]",
+        "jobs['search-index'].pysparkJob.args[0]",
+        "jobs['bulk-export'].pysparkJob.args[0]"
+        ]
+  }
+
+  parameters {
+    name = "RUN_ID"
+    description = "Run id shared with the run ledger records"
+    fields = [
+        "jobs['stream-load'].pysparkJob.properties['spark.brwy.runId']",
+        "jobs['total-transform'].pysparkJob.properties['spark.brwy.runId']",
+        "jobs['search-index'].pysparkJob.properties['spark.brwy.runId']",
+        "jobs['bulk-export'].pysparkJob.properties['spark.brwy.runId']"
+        ]
+  }
+
+  parameters {
+    name = "TRACEPARENT"
+    description = "W3C trace context of the trigger-dataproc span"
+    fields = [
+        "jobs['stream-load'].pysparkJob.properties['spark.brwy.traceparent']",
+        "jobs['total-transform'].pysparkJob.properties['spark.brwy.traceparent']",
+        "jobs['search-index'].pysparkJob.properties['spark.brwy.traceparent']",
+        "jobs['bulk-export'].pysparkJob.properties['spark.brwy.traceparent']"
+        ]
+  }
+
+  placement {
+    managed_cluster {
+      cluster_name = "brwy-stream-cluster${var.branch-hash}"
+      config {
+        staging_bucket = google_storage_bucket.dataproc-bucket.name
+
+        master_config {
+          num_instances = 1
+          machine_type  = "e2-standard-2"
+          disk_config {
+            boot_disk_type    = "pd-standard"
+            boot_disk_size_gb = 50
+          }
+        }
+
+        worker_config {
+          num_instances = 2
+          machine_type  = "e2-standard-2"
+          disk_config {
+            boot_disk_type    = "pd-standard"
+            boot_disk_size_gb = 50
+          }
+        }
+
+        software_config {
+          image_version = "2.1-debian11"
+
+          properties = {
+            "spark:spark.jars.packages" = "com.google.cloud.spark:spark-bigquery-with-dependencies_2.12:0.32.0"
+            "spark:spark.sql.adaptive.enabled" = "true"
+            "spark:spark.sql.adaptive.coalescePartitions.enabled" = "true"
+            "spark:spark.serializer" = "org.apache.spark.serializer.KryoSerializer"
+            "spark:spark.dynamicAllocation.enabled" = "true"
+          }
+        }
+
+        initialization_actions {
+          executable_file = "gs://${google_storage_bucket.dataproc-bucket.name}/scripts/init_dataproc.sh"
+          execution_timeout = "300s"
+        }
+
+        gce_cluster_config {
+          zone = "${var.region}-b"
+          subnetwork             = var.subnet_name
+          service_account_scopes = ["https://www.googleapis.com/auth/cloud-platform"]
+        }
+      }
+    }
+  }
+
+  jobs {
+    step_id = "stream-load"
+    pyspark_job {
+      main_python_file_uri = "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/load/stream-load.py"
+      python_file_uris = local.dataproc_common_files
+      properties = local.dataproc_job_properties
+      args = [
+        "DATE",
+        google_storage_bucket.bronze.name,
+        google_storage_bucket.silver.name,
+        google_bigquery_dataset.breweries_foundation.dataset_id,
+        google_storage_bucket.bigquery_temp.name,
+        var.data-project
+      ]
+    }
+  }
+
+  jobs {
+    step_id = "total-transform"
+    pyspark_job {
+      main_python_file_uri = "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/transform/total-transform.py"
+      python_file_uris = local.dataproc_common_files
+      properties = local.dataproc_job_properties
+      args = [
+        "DATE",
+        google_storage_bucket.silver.name,
+        var.project,
+        google_bigquery_dataset.breweries_foundation.dataset_id,
+        google_storage_bucket.bigquery_temp.name,
+        var.data-project
+      ]
+    }
+    prerequisite_step_ids = ["stream-load"]
+  }
+
+  # Name search artifact built from the same silver date
+  jobs {
+    step_id = "search-index"
+    pyspark_job {
+      main_python_file_uri = "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/search/search-index.py"
+      python_file_uris = local.dataproc_common_files
+      properties = local.dataproc_job_properties
+      args = [
+        "DATE",
+        google_storage_bucket.silver.name
+      ]
+    }
+    prerequisite_step_ids = ["stream-load"]
+  }
+
+  # Per country/state Parquet and CSV extracts of the same silver date
+  jobs {
+    step_id = "bulk-export"
+    pyspark_job {
+      main_python_file_uri = "gs://${google_storage_bucket.dataproc-bucket.name}/src/dataproc/breweries/export/bulk-export.py"
+      python_file_uris = local.dataproc_common_files
+      properties = local.dataproc_job_properties
+      args = [
+        "DATE",
+        google_storage_bucket.silver.name,
+        google_storage_bucket.export.name
+      ]
+    }
+    prerequisite_step_ids = ["stream-load"]
+  }
+
+  labels = local.labels
+}
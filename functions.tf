@@ -1,7 +1,23 @@
 data "archive_file" "api_extract_zip" {
     type = "zip"
-    source_dir = "scr/functions/api-extract"
     output_path = "functions/api-extract.zip"
+
+    dynamic "source" {
+      for_each = fileset("scr/functions/api-extract", "*.{py,txt}")
+      content {
+        content  = file("scr/functions/api-extract/${source.value}")
+        filename = source.value
+      }
+    }
+
+    # Tracing and run ledger helpers shared by the pipeline functions
+    dynamic "source" {
+      for_each = fileset("scr/functions/common", "*.py")
+      content {
+        content  = file("scr/functions/common/${source.value}")
+        filename = source.value
+      }
+    }
 }
 
 resource "google_storage_bucket_object" "api_extract_code" {
@@ -21,13 +37,18 @@ resource "google_cloudfunctions_function" "api_extract" {
   }
   source_archive_bucket = google_storage_bucket.function_bucket.name
   source_archive_object = google_storage_bucket_object.api_extract_code.name
-  available_memory_mb   = 256
+  # pyarrow needs more headroom when Parquet fragments are enabled
+  available_memory_mb   = var.parquet-fragments ? 512 : 256
   region                = var.region
   environment_variables = {
     # is_prd = "True"
     PUBSUB_TOPIC = google_pubsub_topic.api_extract_topic.id
     GCS_BUCKET_BRONZE = google_storage_bucket.bronze.name
     TRIGGER_DATAPROC_TOPIC = google_pubsub_topic.trigger_dataproc_topic.id
+    STREAMING_LOAD = var.streaming-load ? "true" : "false"
+    WRITE_PARQUET_FRAGMENTS = var.parquet-fragments ? "true" : "false"
+    LEDGER_TABLE = local.run_ledger_table
+    TRACE_EXPORTER = var.trace-exporter
   }
   labels = local.labels
   
@@ -35,8 +56,34 @@ resource "google_cloudfunctions_function" "api_extract" {
 
 data "archive_file" "trigger_dataproc_zip" {
     type = "zip"
-    source_dir = "scr/functions/trigger-dataproc"
     output_path = "functions/trigger-dataproc.zip"
+
+    dynamic "source" {
+      for_each = fileset("scr/functions/trigger-dataproc", "*.{py,txt}")
+      content {
+        content  = file("scr/functions/trigger-dataproc/${source.value}")
+        filename = source.value
+      }
+    }
+
+    # Tracing and run ledger helpers shared by the pipeline functions
+    dynamic "source" {
+      for_each = fileset("scr/functions/common", "*.py")
+      content {
+        content  = file("scr/functions/common/${source.value}")
+        filename = source.value
+      }
+    }
+
+    # Dataproc modules of the step fingerprints, so a re-trigger whose
+    # load and transform are current skips the workflow
+    dynamic "source" {
+      for_each = fileset("scr/dataproc/breweries/common", "*.py")
+      content {
+        content  = file("scr/dataproc/breweries/common/${source.value}")
+        filename = "breweries/${source.value}"
+      }
+    }
 }
 
 resource "google_storage_bucket_object" "trigger_dataproc_code" {
@@ -63,6 +110,60 @@ resource "google_cloudfunctions_function" "trigger_dataproc" {
     GCP_PROJECT = var.project
     REGION = var.region
     DATAPROC_TEMPLATE_NAME = "brwy-pipeline-template${var.branch-hash}"
+    DATAPROC_STREAM_TEMPLATE_NAME = "brwy-stream-template${var.branch-hash}"
+    DYNAMIC_CLUSTER_SIZING = "true"
+    GCS_BUCKET_BRONZE = google_storage_bucket.bronze.name
+    GCS_BUCKET_SILVER = google_storage_bucket.silver.name
+    LEDGER_TABLE = local.run_ledger_table
+    TRACE_EXPORTER = var.trace-exporter
+  }
+  labels = local.labels
+}
+
+data "archive_file" "brewery_lookup_zip" {
+    type = "zip"
+    output_path = "functions/brewery-lookup.zip"
+
+    dynamic "source" {
+      for_each = fileset("scr/functions/brewery-lookup", "*.{py,txt}")
+      content {
+        content  = file("scr/functions/brewery-lookup/${source.value}")
+        filename = source.value
+      }
+    }
+
+    # Search artifact reader: the same module the search-index job writes
+    # the artifact with, so both sides share one format
+    source {
+      content  = file("scr/dataproc/breweries/common/search_index.py")
+      filename = "search_index.py"
+    }
+}
+
+resource "google_storage_bucket_object" "brewery_lookup_code" {
+  name   = "${data.archive_file.brewery_lookup_zip.output_path}_${data.archive_file.brewery_lookup_zip.output_sha}.zip"
+  bucket = google_storage_bucket.function_bucket.name
+  source = data.archive_file.brewery_lookup_zip.output_path
+}
+
+# Read-only lookups by id/state/city/type served from the latest silver
+# partition held in memory (callers need roles/cloudfunctions.invoker)
+resource "google_cloudfunctions_function" "brewery_lookup" {
+  name        = "brewery-lookup${var.branch-hash}"
+  description = "Serves brewery lookups from an in-memory index of the latest silver snapshot"
+  runtime     = "python310"
+  entry_point = "main"
+  trigger_http = true
+  source_archive_bucket = google_storage_bucket.function_bucket.name
+  source_archive_object = google_storage_bucket_object.brewery_lookup_code.name
+  # The snapshot and its indexes live in instance memory
+  available_memory_mb   = 1024
+  min_instances         = 0
+  region                = var.region
+  environment_variables = {
+    GCS_BUCKET_SILVER = google_storage_bucket.silver.name
+    SILVER_PREFIX = "breweries/"
+    RELOAD_CHECK_SECONDS = "60"
   }
   labels = local.labels
 }
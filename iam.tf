@@ -5,6 +5,13 @@ resource "google_storage_bucket_iam_member" "silver_editor" {
   member = "serviceAccount:${local.service_account}"
 }
 
+# IAM permissions for export bucket (SA for Dataproc)
+resource "google_storage_bucket_iam_member" "export_editor" {
+  bucket = google_storage_bucket.export.name
+  role   = "roles/storage.objectAdmin"
+  member = "serviceAccount:${local.service_account}"
+}
+
 # BigQuery permissions for Dataproc service account
 resource "google_bigquery_dataset_iam_member" "breweries_foundation_editor" {
   project    = var.data-project
@@ -14,3 +21,10 @@ resource "google_bigquery_dataset_iam_member" "breweries_foundation_editor" {
   
   depends_on = [google_bigquery_dataset.breweries_foundation]
 }
+
+# Change feed publishing from the Dataproc jobs
+resource "google_pubsub_topic_iam_member" "change_feed_publisher" {
+  topic  = google_pubsub_topic.change_feed_topic.name
+  role   = "roles/pubsub.publisher"
+  member = "serviceAccount:${local.service_account}"
+}
@@ -7,3 +7,9 @@ resource "google_pubsub_topic" "trigger_dataproc_topic" {
   name = "trigger-dataproc-topic${var.branch-hash}"
   labels = local.labels
 }
+
+# Ids inserted/updated/deleted by each total-transform (common/change_feed.py)
+resource "google_pubsub_topic" "change_feed_topic" {
+  name = "breweries-change-feed${var.branch-hash}"
+  labels = local.labels
+}
@@ -0,0 +1,243 @@
+import sys
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pyspark.sql import SparkSession
+from datetime import datetime, timedelta
+from google.cloud import storage
+from brewery_load import load_brewery_data
+from brewery_transform import transform_brewery_data
+from pipeline_steps import (load_step_fingerprint, transform_step_fingerprint,
+                            LOAD_STEP, TRANSFORM_STEP)
+from step_fingerprint import is_step_current, record_step_success
+from run_ledger import RunLedger, LEDGER_TABLE_PROPERTY
+from tracing import configure_tracing
+from stage_profiler import write_stage_profile
+from spark_tuning import plan_spark_config, apply_spark_config
+from bronze_archive import measure_bronze_date
+
+start_date_param = sys.argv[1]
+end_date_param = sys.argv[2]
+bronze_bucket_arg = sys.argv[3]
+silver_bucket_arg = sys.argv[4]
+project_id = sys.argv[5]
+dataset_id = sys.argv[6]
+temp_bucket = sys.argv[7]
+data_project_id = sys.argv[8]
+max_parallel_dates = int(sys.argv[9]) if len(sys.argv) > 9 else 4
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - (%(threadName)s) %(message)s'
+)
+
+STATUS_SUCCEEDED = 'succeeded'
+STATUS_FAILED = 'failed'
+STATUS_SKIPPED = 'skipped'
+
+
+class BackfillStatus:
+    """
+    Per-date status stored as JSON objects in the silver bucket, so an
+    interrupted backfill can be resumed with the same date range
+    """
+
+    def __init__(self, bucket_name, start_date, end_date):
+        self.bucket = storage.Client().bucket(bucket_name)
+        self.prefix = f"_backfill/{start_date}_{end_date}/status"
+
+    def get(self, date):
+        blob = self.bucket.blob(f"{self.prefix}/{date}.json")
+        if not blob.exists():
+            return None
+        return json.loads(blob.download_as_text())
+
+    def record(self, date, status, **details):
+        payload = {
+            'date': date,
+            'status': status,
+            'updated_at': datetime.now().isoformat(),
+            **details
+        }
+        self.bucket.blob(f"{self.prefix}/{date}.json").upload_from_string(
+            json.dumps(payload), content_type='application/json')
+
+
+def date_range(start_date, end_date):
+    """
+    List the YYYY-MM-DD dates between start and end (inclusive)
+    """
+    dates = []
+    current_date = start_date
+    while current_date <= end_date:
+        dates.append(current_date.strftime('%Y-%m-%d'))
+        current_date += timedelta(days=1)
+    return dates
+
+
+def run_step_if_changed(step, date, step_fingerprint, run_step, ledger):
+    """
+    Run a step unless its fingerprint matches the last successful run;
+    returns the record count, or None when skipped
+    """
+    fingerprint, components = step_fingerprint
+    if is_step_current(silver_bucket_arg, step, date, fingerprint):
+        logging.info(f"{step} input unchanged for {date}, skipping")
+        return None
+
+    with RunLedger(ledger.ledger_table, ledger.run_id, date,
+                   step).stage(step.split('-')[-1]) as stage_metrics:
+        record_count = run_step()
+        stage_metrics["records"] = record_count
+
+    record_step_success(silver_bucket_arg, step, date, fingerprint,
+                        components, records=record_count)
+    return record_count
+
+
+def process_date(spark, status_store, date, input_size, pool_name,
+                 ledger):
+    """
+    Run load and transform for one date inside the shared Spark
+    application and record its status
+    """
+    # Each worker thread gets its own fair scheduler pool
+    spark.sparkContext.setLocalProperty("spark.scheduler.pool", pool_name)
+
+    input_bytes, input_files = input_size
+    if input_files == 0:
+        logging.info(f"No bronze pages for {date}, skipping")
+        status_store.record(date, STATUS_SKIPPED)
+        return STATUS_SKIPPED
+
+    started_at = datetime.now()
+    try:
+        load_count = run_step_if_changed(
+            LOAD_STEP, date,
+            load_step_fingerprint(bronze_bucket_arg, date),
+            lambda: load_brewery_data(
+                spark, bronze_bucket_arg, silver_bucket_arg, date),
+            ledger)
+
+        transform_count = run_step_if_changed(
+            TRANSFORM_STEP, date,
+            transform_step_fingerprint(silver_bucket_arg, date),
+            lambda: transform_brewery_data(
+                spark, silver_bucket_arg, dataset_id,
+                data_project_id, date, temp_bucket),
+            ledger)
+
+    except Exception as e:
+        logging.error(f"Backfill failed for {date}: {str(e)}")
+        status_store.record(date, STATUS_FAILED, error=str(e),
+                            started_at=started_at.isoformat())
+        return STATUS_FAILED
+
+    duration = (datetime.now() - started_at).total_seconds()
+    logging.info(f"Backfill of {date} completed in {duration:.1f}s")
+    status_store.record(date, STATUS_SUCCEEDED,
+                        started_at=started_at.isoformat(),
+                        duration_seconds=duration,
+                        input_bytes=input_bytes,
+                        load_records=load_count,
+                        transform_records=transform_count)
+    return STATUS_SUCCEEDED
+
+
+def main():
+    """
+    Brewery backfill script: load and transform a date range in one
+    Spark application with a bounded number of concurrent dates
+    """
+    try:
+        start_date = datetime.strptime(start_date_param, '%Y-%m-%d')
+        end_date = datetime.strptime(end_date_param, '%Y-%m-%d')
+    except ValueError:
+        error_msg = "Error: Dates must be in YYYY-MM-DD format"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Backfilling dates from {start_date_param} "
+                 f"to {end_date_param}")
+    logging.info(f"Maximum concurrent dates: {max_parallel_dates}")
+
+    status_store = BackfillStatus(silver_bucket_arg, start_date_param,
+                                  end_date_param)
+
+    # Resume: skip dates that already succeeded
+    pending_dates = []
+    for date in date_range(start_date, end_date):
+        previous = status_store.get(date)
+        if previous and previous.get('status') == STATUS_SUCCEEDED:
+            logging.info(f"{date} already backfilled, skipping")
+            continue
+        pending_dates.append(date)
+
+    if not pending_dates:
+        logging.info("Nothing to backfill")
+        return 'OK'
+
+    # Size the application for the dates that run at the same time
+    input_sizes = {
+        date: measure_bronze_date(bronze_bucket_arg, date)
+        for date in pending_dates
+    }
+    range_bytes = sum(size for size, _ in input_sizes.values())
+    range_files = sum(files for _, files in input_sizes.values())
+    largest_dates = sorted((size for size, _ in input_sizes.values()),
+                           reverse=True)[:max_parallel_dates]
+    spark_plan = plan_spark_config(sum(largest_dates), range_files)
+    spark_plan["spark.scheduler.mode"] = "FAIR"
+
+    builder = SparkSession.builder \
+        .appName(f"Breweries Backfill - {start_date_param}"
+                 f"_{end_date_param}")
+    spark = apply_spark_config(builder, spark_plan,
+                               range_bytes, range_files) \
+        .getOrCreate()
+
+    # One run id for the whole backfill, one ledger record per date/step
+    conf = spark.sparkContext.getConf()
+    configure_tracing("backfill", conf)
+    ledger = RunLedger(
+        conf.get(LEDGER_TABLE_PROPERTY, ""),
+        f"backfill-{start_date_param}_{end_date_param}",
+        start_date_param, "backfill")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_parallel_dates,
+                            thread_name_prefix="backfill") as executor:
+        futures = {
+            executor.submit(process_date, spark, status_store, date,
+                            input_sizes[date],
+                            f"backfill-{index % max_parallel_dates}",
+                            ledger): date
+            for index, date in enumerate(pending_dates)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    failed = sorted(d for d, s in results.items() if s == STATUS_FAILED)
+    logging.info(f"Backfill summary: "
+                 f"{sum(s == STATUS_SUCCEEDED for s in results.values())} "
+                 f"succeeded, "
+                 f"{sum(s == STATUS_SKIPPED for s in results.values())} "
+                 f"skipped, {len(failed)} failed")
+
+    write_stage_profile(spark, "backfill",
+                        f"{start_date_param}_{end_date_param}")
+
+    spark.stop()
+
+    if failed:
+        error_msg = (f"Backfill failed for dates: {', '.join(failed)}. "
+                     f"Rerun with the same range to resume")
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    return 'OK'
+
+
+if __name__ == "__main__":
+    main()
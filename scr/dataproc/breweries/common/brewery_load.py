@@ -0,0 +1,138 @@
+import logging
+from functools import reduce
+from pyspark.sql import DataFrame
+from pyspark.sql.functions import lit
+from bronze_archive import archived_date, read_archived_date, archive_object
+from schema_registry import registered_fields
+from record_quarantine import (with_corrupt_column,
+                               quarantine_corrupt_records,
+                               SOURCE_FILE_COLUMN)
+from brewery_schema import (define_brewery_schema, define_silver_schema,
+                            rename_columns_to_standard,
+                            add_processing_metadata)
+from silver_writer import (path_size_bytes, count_files,
+                           write_silver_parquet, bucket_path,
+                           PARQUET_TO_JSON_RATIO)
+
+
+def load_brewery_data(spark, bronze_bucket, silver_bucket, date_param,
+                      stage_metrics=None):
+    """
+    Load brewery data from bronze bucket JSON files (or the monthly
+    archive once the date was compacted) and save as Parquet in silver
+    bucket. Fields in the schema registry are added as nullable columns.
+    Corrupt records are quarantined instead of failing the load, within
+    the error budget; their counts by file go to stage_metrics details.
+    """
+    # Define input and output paths
+    input_path = bucket_path(bronze_bucket, f"{date_param}/*.json")
+    fragment_path = bucket_path(bronze_bucket, f"{date_param}/*.parquet")
+    output_path = bucket_path(silver_bucket,
+                              f"breweries/date={date_param}")
+    
+    logging.info(f"Reading JSON files from: {input_path}")
+    
+    # Define schema
+    extra_fields = registered_fields()
+    if extra_fields:
+        logging.info(f"Registered fields: "
+                     f"{[column for _, column, _ in extra_fields]}")
+    brewery_schema = with_corrupt_column(define_brewery_schema(extra_fields))
+    # Bronze read cached by the quarantine split, released once the silver
+    # files are written
+    cached_read = None
+
+    try:
+        # Estimate output size from the bronze input to size silver files
+        input_bytes = path_size_bytes(spark, input_path)
+        logging.info(f"Bronze input size: {input_bytes} bytes")
+
+        # Prefer the typed Parquet fragments written by api-extract when
+        # every JSON page has one
+        json_pages = count_files(spark, input_path)
+        fragments = count_files(spark, fragment_path)
+
+        archived_lines = None
+        corrupt_files = {}
+        if json_pages == 0:
+            archived_lines = read_archived_date(bronze_bucket, date_param)
+
+        if json_pages > 0 and fragments == json_pages:
+            logging.info(f"Reading {fragments} Parquet fragments from: "
+                         f"{fragment_path}")
+            df_renamed = spark.read \
+                .schema(define_silver_schema(extra_fields)) \
+                .parquet(fragment_path)
+        elif archived_lines is not None:
+            # One ranged read of the month archive on the driver, then one
+            # DataFrame per page, tagged <archive>#page=N, so corrupt
+            # records count against the page budget as bronze pages do
+            entry = archived_date(bronze_bucket, date_param)
+            logging.info(f"Reading {len(archived_lines)} archived records "
+                         f"of {date_param} from the bronze archive")
+            input_bytes = entry["bytes"]
+            archive = bucket_path(bronze_bucket,
+                                  archive_object(date_param[:7]))
+            page_lines = {int(number): [] for number in entry["pages"]}
+            for page, line in archived_lines:
+                page_lines[page].append(line)
+            df = reduce(DataFrame.unionByName, [
+                spark.read
+                .option("mode", "PERMISSIVE")
+                .schema(brewery_schema)
+                .json(spark.sparkContext.parallelize(lines, 1))
+                .withColumn(SOURCE_FILE_COLUMN,
+                            lit(f"{archive}#page={page}"))
+                for page, lines in sorted(page_lines.items())])
+            df, corrupt_files, cached_read = quarantine_corrupt_records(
+                spark, df, silver_bucket, date_param, len(page_lines))
+            df_renamed = rename_columns_to_standard(df, extra_fields)
+        else:
+            # Read JSON files from bronze bucket
+            df = spark.read \
+                .option("multiline", "true") \
+                .option("mode", "PERMISSIVE") \
+                .schema(brewery_schema) \
+                .json(input_path)
+            df, corrupt_files, cached_read = quarantine_corrupt_records(
+                spark, df, silver_bucket, date_param, json_pages)
+
+            # Rename columns to standardized format
+            df_renamed = rename_columns_to_standard(df, extra_fields)
+        
+        # Add processing metadata
+        df_with_metadata = add_processing_metadata(df_renamed, date_param)
+        
+        # Data quality checks
+        initial_count = df_with_metadata.count()
+        logging.info(f"Total records loaded: {initial_count}")
+        
+        # Remove duplicates based on brewery id
+        df_clean = df_with_metadata.dropDuplicates(["id_brewery"])
+        final_count = df_clean.count()
+        
+        if initial_count != final_count:
+            duplicates_removed = initial_count - final_count
+            logging.info(f"Removed {duplicates_removed} duplicate records")
+
+        # Save as sorted, right-sized Parquet files
+        logging.info(f"Writing Parquet files to: {output_path}")
+        write_silver_parquet(df_clean, output_path,
+                             input_bytes * PARQUET_TO_JSON_RATIO)
+        
+        if stage_metrics is not None:
+            stage_metrics["details"]["corrupt_records"] = \
+                sum(corrupt_files.values())
+            stage_metrics["details"]["corrupt_files"] = corrupt_files
+
+        logging.info(f"Successfully processed {final_count} brewery records")
+        return final_count
+        
+    except Exception as e:
+        error_msg = f"Error processing brewery data: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    finally:
+        if cached_read is not None:
+            cached_read.unpersist()
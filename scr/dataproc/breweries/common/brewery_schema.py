@@ -0,0 +1,95 @@
+from pyspark.sql.functions import current_date, current_timestamp, lit
+from pyspark.sql.types import (StructType, StructField, StringType,
+                               DoubleType, BooleanType)
+
+# Bronze JSON field -> standardized silver column
+COLUMN_MAPPING = {
+    "id": "id_brewery",
+    "name": "name_brewery",
+    "brewery_type": "type_brewery",
+    "address_1": "address_line_1",
+    "address_2": "address_line_2",
+    "address_3": "address_line_3",
+    "city": "name_city",
+    "state_province": "name_state_province",
+    "postal_code": "value_postal_code",
+    "country": "name_country",
+    "longitude": "longitude",
+    "latitude": "latitude",
+    "phone": "phone",
+    "website_url": "url_website",
+    "state": "name_state",
+    "street": "name_street"
+}
+
+# Schema registry type -> Spark type of fields added after the fixed
+# schema (schema_registry.py)
+REGISTRY_TYPES = {
+    "string": StringType(),
+    "double": DoubleType(),
+    "boolean": BooleanType()
+}
+
+
+def define_brewery_schema(extra_fields=()):
+    """
+    Define the schema for brewery data based on the JSON structure, with
+    registered (field, column, type) extra fields as nullable columns
+    """
+    return StructType([
+        StructField("id", StringType(), True),
+        StructField("name", StringType(), True),
+        StructField("brewery_type", StringType(), True),
+        StructField("address_1", StringType(), True),
+        StructField("address_2", StringType(), True),
+        StructField("address_3", StringType(), True),
+        StructField("city", StringType(), True),
+        StructField("state_province", StringType(), True),
+        StructField("postal_code", StringType(), True),
+        StructField("country", StringType(), True),
+        StructField("longitude", DoubleType(), True),
+        StructField("latitude", DoubleType(), True),
+        StructField("phone", StringType(), True),
+        StructField("website_url", StringType(), True),
+        StructField("state", StringType(), True),
+        StructField("street", StringType(), True)
+    ] + [
+        StructField(field, REGISTRY_TYPES[value_type], True)
+        for field, _, value_type in extra_fields
+    ])
+
+
+def define_silver_schema(extra_fields=()):
+    """
+    Define the bronze schema with the standardized silver column names
+    """
+    mapping = dict(COLUMN_MAPPING)
+    mapping.update({field: column for field, column, _ in extra_fields})
+    return StructType([
+        StructField(mapping[field.name], field.dataType, True)
+        for field in define_brewery_schema(extra_fields).fields
+    ])
+
+
+def rename_columns_to_standard(df, extra_fields=()):
+    """
+    Rename columns to standardized format with prefixes
+    """
+    # Apply column renaming
+    for old_name, new_name in COLUMN_MAPPING.items():
+        df = df.withColumnRenamed(old_name, new_name)
+
+    for field, column, _ in extra_fields:
+        df = df.withColumnRenamed(field, column)
+    
+    return df
+
+
+def add_processing_metadata(df, date_param):
+    """
+    Add processing date, timestamp and source date columns
+    """
+    return df \
+        .withColumn("processing_date", current_date()) \
+        .withColumn("processing_timestamp", current_timestamp()) \
+        .withColumn("source_date", lit(date_param))
@@ -0,0 +1,603 @@
+import logging
+from contextlib import nullcontext
+from pyspark.sql.functions import (
+    col, when, concat_ws, to_date, year, month, dayofmonth, lit, floor,
+    least, greatest, shiftright, array, element_at, concat, substring,
+    format_string, lower, trim, regexp_replace, split, explode,
+    array_except, levenshtein, length, count, upper, regexp_extract,
+    create_map, min as spark_min, filter as array_filter
+)
+from google.cloud import bigquery
+from silver_writer import bucket_path
+from change_feed import publish_change_feed, CHANGE_TYPES
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+# Cell resolutions exposed as columns (~156km, ~4.9km, ~153m cells)
+GEOHASH_PRECISIONS = [3, 5, 7]
+
+# Fuzzy duplicate detection settings
+NAME_STOPWORDS = [
+    "the", "and", "of", "co", "company", "inc", "llc", "ltd",
+    "brewing", "brewery", "breweries", "brewpub", "brewhouse", "brew",
+    "beer", "beers", "taproom", "tap", "room", "house", "works",
+    "craft", "ale", "ales", "pub"
+]
+MAX_BLOCK_SIZE = 50
+NAME_SIMILARITY_THRESHOLD = 0.85
+ADDRESS_SIMILARITY_THRESHOLD = 0.8
+MAX_CLUSTER_ITERATIONS = 20
+
+# Country calling codes and national trunk prefix usage for E.164 phones
+COUNTRY_CALLING_CODES = {
+    "United States": "1",
+    "Canada": "1",
+    "England": "44",
+    "Scotland": "44",
+    "Wales": "44",
+    "Northern Ireland": "44",
+    "Isle of Man": "44",
+    "Ireland": "353",
+    "Portugal": "351",
+    "France": "33",
+    "Germany": "49",
+    "Austria": "43",
+    "Poland": "48",
+    "Singapore": "65",
+    "Australia": "61",
+    "South Korea": "82"
+}
+TRUNK_PREFIX_COUNTRIES = [
+    "England", "Scotland", "Wales", "Northern Ireland", "Isle of Man",
+    "Ireland", "France", "Germany", "Austria", "Australia", "South Korea"
+]
+UK_POSTAL_COUNTRIES = [
+    "England", "Scotland", "Wales", "Northern Ireland", "Isle of Man"
+]
+
+
+def clean_brewery_data(df):
+    """
+    Apply data cleaning and transformations to brewery data
+    """
+    logging.info("Starting data cleaning transformations")
+    
+    # Create full address field
+    df = df \
+        .withColumn("full_address",
+                    concat_ws(", ",
+                              col("address_line_1"),
+                              col("address_line_2"),
+                              col("address_line_3"),
+                              col("name_city"),
+                              col("name_state"),
+                              col("value_postal_code")))
+    
+    # Add date components for partitioning
+    df = df \
+        .withColumn("source_date",
+                    to_date(col("source_date"), "yyyy-MM-dd")) \
+        .withColumn("year", year(col("source_date"))) \
+        .withColumn("month", month(col("source_date"))) \
+        .withColumn("day", dayofmonth(col("source_date")))
+    
+    # Add has_coordinates flag
+    df = df \
+        .withColumn("has_coordinates",
+                    when((col("latitude").isNotNull()) &
+                         (col("longitude").isNotNull()), True)
+                    .otherwise(False))
+    
+    # Add normalized contact and postal keys
+    df = add_normalized_keys(df)
+
+    # Add geospatial point and grid cells
+    df = add_geo_columns(df)
+
+    # Add has_contact_info flag
+    df = df \
+        .withColumn("has_contact_info",
+                    when((col("phone").isNotNull()) |
+                         (col("url_website").isNotNull()), True)
+                    .otherwise(False))
+    
+    logging.info("Data cleaning transformations completed")
+    return df
+
+
+def phone_e164_column(phone_col, country_col):
+    """
+    Normalize phone numbers to E.164 using the country calling code
+    """
+    calling_codes = create_map(*[lit(v) for item in
+                                 COUNTRY_CALLING_CODES.items()
+                                 for v in item])
+    calling_code = element_at(calling_codes, country_col)
+    digits = regexp_replace(phone_col, "[^0-9]", "")
+
+    national = when(country_col.isin(TRUNK_PREFIX_COUNTRIES) &
+                    digits.startswith("0"),
+                    substring(digits, 2, 20)) \
+        .when((calling_code == "1") & (length(digits) == 11) &
+              digits.startswith("1"),
+              substring(digits, 2, 20)) \
+        .otherwise(digits)
+
+    e164 = when(trim(phone_col).startswith("+"), concat(lit("+"), digits)) \
+        .when(digits.startswith("00"),
+              concat(lit("+"), substring(digits, 3, 20))) \
+        .when(calling_code.isNotNull(),
+              concat(lit("+"), calling_code, national))
+
+    # E.164 allows at most 15 digits; shorter than 8 is not a full number
+    return when(length(e164).between(9, 16), e164)
+
+
+def url_domain_column(url_col):
+    """
+    Extract the lowercase host of a URL without scheme and www prefix
+    """
+    domain = regexp_extract(
+        lower(trim(url_col)),
+        r"^(?:[a-z][a-z0-9+.-]*://)?(?:www\.)?([^/:?#\s]+)", 1)
+    return when(domain != "", domain)
+
+
+def url_canonical_column(url_col, domain_col):
+    """
+    Canonical https URL from the normalized domain and the original path
+    """
+    path = regexp_replace(
+        regexp_extract(
+            trim(url_col),
+            r"^(?:[A-Za-z][A-Za-z0-9+.-]*://)?[^/?#]+(/[^?#]*)?", 1),
+        "/+$", "")
+    return when(domain_col.isNotNull(),
+                concat(lit("https://"), domain_col, path))
+
+
+def postal_code_column(postal_col, country_col):
+    """
+    Normalize postal codes with per-country formatting rules
+    """
+    compact = regexp_replace(upper(postal_col), r"[^0-9A-Z]", "")
+    generic = trim(regexp_replace(upper(postal_col), r"\s+", " "))
+
+    normalized = when(country_col == "United States",
+                      regexp_extract(postal_col, r"^\s*(\d{5})", 1)) \
+        .when(country_col == "Canada",
+              regexp_replace(compact, r"^([A-Z]\d[A-Z])(\d[A-Z]\d)$",
+                             "$1 $2")) \
+        .when(country_col.isin(UK_POSTAL_COUNTRIES),
+              regexp_replace(compact, r"^([0-9A-Z]{2,4})([0-9][A-Z]{2})$",
+                             "$1 $2")) \
+        .when(country_col == "Ireland",
+              regexp_replace(compact, r"^([0-9A-Z]{3})([0-9A-Z]{4})$",
+                             "$1 $2")) \
+        .otherwise(generic)
+
+    return when(normalized != "", normalized)
+
+
+def add_normalized_keys(df):
+    """
+    Add normalized phone, website and postal code keys used for joins
+    and duplicate detection. Built from native Spark expressions, so they
+    run vectorized in the JVM without Python serialization.
+    """
+    df = df \
+        .withColumn("value_phone_e164",
+                    phone_e164_column(col("phone"), col("name_country"))) \
+        .withColumn("url_domain", url_domain_column(col("url_website"))) \
+        .withColumn("value_postal_code_normalized",
+                    postal_code_column(col("value_postal_code"),
+                                       col("name_country")))
+
+    df = df \
+        .withColumn("url_website_canonical",
+                    url_canonical_column(col("url_website"),
+                                         col("url_domain")))
+
+    return df
+
+
+def geohash_column(lat_col, lon_col, precision):
+    """
+    Build a geohash expression with native Spark functions.
+
+    Coordinates are quantized once into integer lon/lat indexes and the
+    interleaved bits of each base32 character are extracted with shifts,
+    so the whole computation stays inside the JVM (no Python UDF).
+    """
+    total_bits = precision * 5
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+
+    lon_idx = least(
+        greatest(floor((lon_col + 180.0) / 360.0 * (1 << lon_bits)), lit(0)),
+        lit((1 << lon_bits) - 1)).cast("long")
+    lat_idx = least(
+        greatest(floor((lat_col + 90.0) / 180.0 * (1 << lat_bits)), lit(0)),
+        lit((1 << lat_bits) - 1)).cast("long")
+
+    alphabet = array(*[lit(c) for c in GEOHASH_ALPHABET])
+    chars = []
+    for char_pos in range(precision):
+        char_value = lit(0)
+        for bit_pos in range(5):
+            bit = char_pos * 5 + bit_pos
+            # Even bits come from longitude, odd bits from latitude
+            if bit % 2 == 0:
+                source, width = lon_idx, lon_bits
+            else:
+                source, width = lat_idx, lat_bits
+            shift = width - 1 - bit // 2
+            bit_value = shiftright(source, shift).bitwiseAND(1)
+            char_value = char_value + bit_value * (1 << (4 - bit_pos))
+        chars.append(element_at(alphabet, (char_value + 1).cast("int")))
+
+    return concat(*chars)
+
+
+def add_geo_columns(df):
+    """
+    Add a WKT point (loaded as BigQuery GEOGRAPHY) and hierarchical
+    geohash cells at each resolution in GEOHASH_PRECISIONS
+    """
+    valid_coordinates = (
+        col("latitude").isNotNull() & col("longitude").isNotNull() &
+        col("latitude").between(-90.0, 90.0) &
+        col("longitude").between(-180.0, 180.0)
+    )
+
+    df = df \
+        .withColumn("geo_point",
+                    when(valid_coordinates,
+                         format_string("POINT(%.8f %.8f)",
+                                       col("longitude"), col("latitude"))))
+
+    # Geohashes are prefix-hierarchical: compute the finest cell once and
+    # derive the coarser resolutions as prefixes
+    max_precision = max(GEOHASH_PRECISIONS)
+    df = df \
+        .withColumn("_geohash",
+                    when(valid_coordinates,
+                         geohash_column(col("latitude"), col("longitude"),
+                                        max_precision)))
+
+    for precision in GEOHASH_PRECISIONS:
+        df = df.withColumn(f"id_geohash_{precision}",
+                           substring(col("_geohash"), 1, precision))
+
+    return df.drop("_geohash")
+
+
+def normalize_text_column(text_col):
+    """
+    Lowercase and keep only letters and digits separated by single spaces
+    """
+    return trim(regexp_replace(lower(text_col), r"[^\p{L}\p{N}]+", " "))
+
+
+def similarity_column(left_col, right_col):
+    """
+    Normalized Levenshtein similarity in [0, 1]
+    """
+    max_length = greatest(length(left_col), length(right_col))
+    return when(max_length == 0, lit(0.0)) \
+        .otherwise(1 - levenshtein(left_col, right_col) / max_length)
+
+
+def build_blocking_keys(df):
+    """
+    Build blocking keys per brewery from name tokens, postal code, phone
+    and the finest geohash cell. Oversized blocks are dropped so candidate
+    generation stays near-linear.
+    """
+    name_tokens = array_filter(
+        array_except(split(col("name_normalized"), " "),
+                     array(*[lit(w) for w in NAME_STOPWORDS])),
+        lambda token: length(token) >= 3)
+
+    token_keys = df \
+        .select("id_brewery",
+                col("name_country"),
+                explode(name_tokens).alias("token")) \
+        .select("id_brewery",
+                concat_ws(":", lit("tk"), col("name_country"),
+                          col("token")).alias("block_key"))
+
+    postal_keys = df \
+        .filter(col("value_postal_code_normalized").isNotNull()) \
+        .select("id_brewery",
+                concat_ws(":", lit("pc"), col("name_country"),
+                          col("value_postal_code_normalized"))
+                .alias("block_key"))
+
+    phone_keys = df \
+        .filter(col("value_phone_e164").isNotNull()) \
+        .select("id_brewery",
+                concat(lit("ph:"), col("value_phone_e164"))
+                .alias("block_key"))
+
+    geo_keys = df \
+        .filter(col("id_geohash_7").isNotNull()) \
+        .select("id_brewery",
+                concat(lit("gh:"), col("id_geohash_7")).alias("block_key"))
+
+    keys = token_keys.union(postal_keys).union(phone_keys) \
+        .union(geo_keys).distinct()
+
+    block_sizes = keys.groupBy("block_key").agg(count("*").alias("size"))
+    oversized = block_sizes.filter(col("size") > MAX_BLOCK_SIZE).count()
+    if oversized > 0:
+        logging.info(f"Skipping {oversized} blocking keys larger than "
+                     f"{MAX_BLOCK_SIZE} records")
+
+    return keys.join(
+        block_sizes.filter((col("size") > 1) &
+                           (col("size") <= MAX_BLOCK_SIZE)),
+        "block_key").select("id_brewery", "block_key")
+
+
+def find_duplicate_pairs(df):
+    """
+    Compare candidates only within blocks and keep pairs whose names are
+    similar and whose location agrees (postal code, phone, geo cell or
+    address)
+    """
+    attributes = df \
+        .filter(col("id_brewery").isNotNull()) \
+        .select("id_brewery",
+                "name_country",
+                "value_postal_code_normalized",
+                "value_phone_e164",
+                "id_geohash_7",
+                normalize_text_column(col("name_brewery"))
+                .alias("name_normalized"),
+                normalize_text_column(col("address_line_1"))
+                .alias("address_normalized"))
+
+    keys = build_blocking_keys(attributes)
+
+    candidates = keys.alias("a") \
+        .join(keys.alias("b"),
+              (col("a.block_key") == col("b.block_key")) &
+              (col("a.id_brewery") < col("b.id_brewery"))) \
+        .select(col("a.id_brewery").alias("id_a"),
+                col("b.id_brewery").alias("id_b")) \
+        .distinct()
+
+    left = attributes.select([col(c).alias(f"{c}_a")
+                              for c in attributes.columns])
+    right = attributes.select([col(c).alias(f"{c}_b")
+                               for c in attributes.columns])
+
+    scored = candidates \
+        .join(left, col("id_a") == col("id_brewery_a")) \
+        .join(right, col("id_b") == col("id_brewery_b")) \
+        .withColumn("name_similarity",
+                    similarity_column(col("name_normalized_a"),
+                                      col("name_normalized_b"))) \
+        .withColumn("address_similarity",
+                    similarity_column(col("address_normalized_a"),
+                                      col("address_normalized_b")))
+
+    same_location = \
+        (col("value_postal_code_normalized_a") ==
+         col("value_postal_code_normalized_b")) | \
+        (col("value_phone_e164_a") == col("value_phone_e164_b")) | \
+        (col("id_geohash_7_a") == col("id_geohash_7_b")) | \
+        (col("address_similarity") >= ADDRESS_SIMILARITY_THRESHOLD)
+
+    return scored \
+        .filter((col("name_similarity") >= NAME_SIMILARITY_THRESHOLD) &
+                same_location) \
+        .select("id_a", "id_b")
+
+
+def assign_cluster_ids(ids, pairs):
+    """
+    Label connected components of the duplicate graph with the smallest
+    brewery id of each component (iterative min-label propagation)
+    """
+    edges = pairs.select(col("id_a").alias("src"), col("id_b").alias("dst")) \
+        .union(pairs.select(col("id_b").alias("src"),
+                            col("id_a").alias("dst")))
+
+    labels = ids.select("id_brewery",
+                        col("id_brewery").alias("id_brewery_cluster"))
+
+    for iteration in range(MAX_CLUSTER_ITERATIONS):
+        neighbour_labels = edges \
+            .join(labels, edges.dst == labels.id_brewery) \
+            .groupBy("src") \
+            .agg(spark_min("id_brewery_cluster").alias("neighbour_label"))
+
+        updated = labels \
+            .join(neighbour_labels,
+                  labels.id_brewery == neighbour_labels.src, "left") \
+            .select("id_brewery",
+                    when(col("neighbour_label").isNotNull(),
+                         least(col("id_brewery_cluster"),
+                               col("neighbour_label")))
+                    .otherwise(col("id_brewery_cluster"))
+                    .alias("id_brewery_cluster")) \
+            .localCheckpoint()
+
+        changed = updated.alias("n") \
+            .join(labels.alias("o"), "id_brewery") \
+            .filter(col("n.id_brewery_cluster") !=
+                    col("o.id_brewery_cluster")) \
+            .count()
+
+        labels = updated
+        if changed == 0:
+            logging.info(f"Cluster labels converged after "
+                         f"{iteration + 1} iterations")
+            break
+    else:
+        logging.warning(f"Cluster labels did not converge after "
+                        f"{MAX_CLUSTER_ITERATIONS} iterations")
+
+    return labels
+
+
+def add_duplicate_clusters(df):
+    """
+    Detect fuzzy duplicates across brewery ids and add id_brewery_cluster
+    """
+    logging.info("Starting fuzzy duplicate detection")
+
+    pairs = find_duplicate_pairs(df).localCheckpoint()
+    pair_count = pairs.count()
+    logging.info(f"Found {pair_count} duplicate candidate pairs")
+
+    ids = df.filter(col("id_brewery").isNotNull()) \
+        .select("id_brewery").distinct()
+
+    if pair_count == 0:
+        clusters = ids.select("id_brewery",
+                              col("id_brewery").alias("id_brewery_cluster"))
+    else:
+        clusters = assign_cluster_ids(ids, pairs)
+
+    df = df.join(clusters, "id_brewery", "left")
+
+    duplicated = df \
+        .groupBy("id_brewery_cluster") \
+        .agg(count("*").alias("members")) \
+        .filter(col("members") > 1) \
+        .count()
+    logging.info(f"Fuzzy duplicate clusters with more than one record: "
+                 f"{duplicated}")
+
+    return df
+
+
+def delete_partition(data_project_id, dataset_id, table_name, source_date):
+    """
+    Delete existing partition data for the given date
+    """
+    try:
+        client = bigquery.Client(project=data_project_id)
+        
+        delete_query = f"""
+        DELETE FROM `{data_project_id}.{dataset_id}.{table_name}`
+        WHERE DATE(source_date) = '{source_date}'
+        """
+        
+        logging.info(f"Executing partition deletion for date: {source_date}")
+        job = client.query(delete_query)
+        job.result()  # Wait for the job to complete
+        
+        logging.info(f"Successfully deleted partition data for {source_date}")
+        
+    except Exception as e:
+        error_msg = f"Could not delete partition data: {str(e)}"
+        logging.warning(error_msg)
+        raise Exception(error_msg)
+
+
+def load_to_bigquery(df, data_project_id, dataset_id, table_name, source_date,
+                     temp_bucket):
+    """
+    Load DataFrame to BigQuery table
+    """
+    logging.info(f"Loading data to BigQuery: "
+                 f"{data_project_id}.{dataset_id}.{table_name}")
+    
+    # Delete existing partition data before loading new data
+    delete_partition(data_project_id, dataset_id, table_name, source_date)
+    
+    try:
+        # Configure BigQuery options for optimized loading; columns of
+        # fields registered after a schema drift are added as NULLABLE
+        df.write \
+            .format("bigquery") \
+            .option("table", f"{data_project_id}.{dataset_id}.{table_name}") \
+            .option("writeMethod", "indirect") \
+            .option("temporaryGcsBucket", temp_bucket) \
+            .option("partitionField", "source_date") \
+            .option("partitionType", "DAY") \
+            .option("clusteredFields",
+                    "id_geohash_5,name_state,type_brewery") \
+            .option("createDisposition", "CREATE_NEVER") \
+            .option("allowFieldAddition", "true") \
+            .mode("append") \
+            .save()
+    except Exception as e:
+        error_msg = f"Error loading data to BigQuery: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+    
+    logging.info("Data successfully loaded to BigQuery table")
+
+
+def transform_brewery_data(spark, silver_bucket, dataset_id,
+                           data_project_id, date_param, temp_bucket,
+                           ledger=None):
+    """
+    Main transformation function. With a RunLedger, the transformation,
+    the BigQuery write and the change feed are recorded as separate
+    stages.
+    """
+    # Define input path for silver bucket data
+    input_path = bucket_path(silver_bucket, f"breweries/date={date_param}")
+    
+    logging.info(f"Reading Parquet files from: {input_path}")
+
+    transform_stage = ledger.stage("transform") if ledger else nullcontext({})
+    
+    try:
+        with transform_stage as stage_metrics:
+            # Read data from silver bucket
+            df = spark.read.parquet(input_path)
+
+            logging.info(f"Initial record count: {df.count()}")
+
+            # Apply data cleaning and transformations
+            df_transformed = clean_brewery_data(df)
+
+            # Flag the same brewery published under different ids
+            df_transformed = add_duplicate_clusters(df_transformed)
+
+            # Data quality validation
+            final_count = df_transformed.count()
+            logging.info(f"Final record count after transformations: "
+                         f"{final_count}")
+
+            # Check for required fields
+            null_brewery_ids = df_transformed.filter(
+                col("id_brewery").isNull()).count()
+            if null_brewery_ids > 0:
+                logging.warning(f"Found {null_brewery_ids} records with "
+                                f"null brewery IDs")
+
+            stage_metrics["records"] = final_count
+        
+    except Exception as e:
+        error_msg = f"Error during transformation: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+            
+    # Load to BigQuery
+    write_stage = (ledger.stage("bigquery_write") if ledger
+                   else nullcontext({}))
+    with write_stage as stage_metrics:
+        load_to_bigquery(df_transformed, data_project_id, dataset_id,
+                         "breweries_all_data", date_param, temp_bucket)
+        stage_metrics["records"] = final_count
+
+    # Publish the ids changed since the previous date once loaded
+    feed_stage = ledger.stage("change_feed") if ledger else nullcontext({})
+    with feed_stage as stage_metrics:
+        feed = publish_change_feed(spark, df_transformed, silver_bucket,
+                                   date_param,
+                                   ledger.run_id if ledger else date_param)
+        if feed is not None:
+            stage_metrics["records"] = sum(
+                feed[change] for change in CHANGE_TYPES)
+            stage_metrics["details"] = feed
+    
+    logging.info("Transformation process completed successfully")
+    return final_count
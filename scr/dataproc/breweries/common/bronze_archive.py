@@ -0,0 +1,239 @@
+import re
+import gzip
+import json
+import uuid
+import logging
+from functools import lru_cache
+from google.cloud import storage
+from step_fingerprint import gcs_manifest_checksum
+from spark_tuning import measure_gcs_prefix
+
+# Monthly bronze archives (bronze-compact job):
+#   _archive/month=YYYY-MM/breweries.ndjson.gz  one brewery per line, each
+#       page compressed as an independent gzip member, so the file is a
+#       regular .ndjson.gz and any page or date can be decompressed alone
+#   _archive/month=YYYY-MM/index.json  date -> byte range, raw bytes,
+#       records and manifest checksum of the compacted pages, with the
+#       byte range of every page
+# Closed days are appended to the month archive with a GCS compose, so
+# offsets already in the index never move.
+ARCHIVE_PREFIX = "_archive"
+ARCHIVE_VERSION = 1
+PAGE_PATTERN = re.compile(r"^page_(\d+)\.json$")
+
+
+def archive_object(month):
+    """
+    Object name of the archive of a YYYY-MM month
+    """
+    return f"{ARCHIVE_PREFIX}/month={month}/breweries.ndjson.gz"
+
+
+def index_object(month):
+    """
+    Object name of the index of a YYYY-MM month archive
+    """
+    return f"{ARCHIVE_PREFIX}/month={month}/index.json"
+
+
+def empty_index(month):
+    """
+    Index of a month without archived dates
+    """
+    return {"version": ARCHIVE_VERSION, "month": month,
+            "archive": archive_object(month), "dates": {}}
+
+
+def load_index(bucket_name, month):
+    """
+    (index, generation) of a month archive; a new empty index and
+    generation 0 when the month has no archive yet
+    """
+    blob = storage.Client().bucket(bucket_name).get_blob(
+        index_object(month))
+    if blob is None:
+        return empty_index(month), 0
+    return json.loads(blob.download_as_text()), blob.generation
+
+
+@lru_cache(maxsize=64)
+def _cached_index(bucket_name, month):
+    return load_index(bucket_name, month)[0]
+
+
+def archived_date(bucket_name, date):
+    """
+    Index entry of an archived date, or None
+    """
+    return _cached_index(bucket_name, date[:7])["dates"].get(date)
+
+
+def has_raw_pages(bucket_name, date):
+    """
+    True when the date still has page objects in bronze
+    """
+    blobs = storage.Client().list_blobs(bucket_name, prefix=f"{date}/",
+                                        max_results=1)
+    return any(True for _ in blobs)
+
+
+def date_input_checksum(bucket_name, date):
+    """
+    Checksum of the bronze pages of a date: the manifest of the page
+    objects, or the one recorded when the date was archived, so archiving
+    does not change the load fingerprint
+    """
+    if not has_raw_pages(bucket_name, date):
+        entry = archived_date(bucket_name, date)
+        if entry is not None:
+            return entry["manifest_checksum"]
+    return gcs_manifest_checksum(bucket_name, f"{date}/")
+
+
+def measure_bronze_date(bucket_name, date):
+    """
+    (bytes, pages) of the JSON pages of a date, from the archive index
+    when its page objects were compacted away
+    """
+    input_bytes, input_files = measure_gcs_prefix(bucket_name, f"{date}/",
+                                                  suffix=".json")
+    if input_files == 0:
+        entry = archived_date(bucket_name, date)
+        if entry is not None:
+            return entry["bytes"], len(entry["pages"])
+    return input_bytes, input_files
+
+
+def read_archived_date(bucket_name, date):
+    """
+    (page number, JSON line) pairs (one brewery each) of an archived
+    date in page order, read with one ranged download; None when the
+    date is not archived
+    """
+    entry = archived_date(bucket_name, date)
+    if entry is None:
+        return None
+
+    blob = storage.Client().bucket(bucket_name).blob(
+        archive_object(date[:7]))
+    data = blob.download_as_bytes(
+        start=entry["offset"], end=entry["offset"] + entry["length"] - 1)
+    # Concatenated gzip members decompress as one stream. Records are
+    # split on "\n" only: names may hold U+0085/U+2028/U+2029, which
+    # json.dumps leaves unescaped and str.splitlines() would split on
+    text = gzip.decompress(data).decode("utf-8")
+    lines = text.rstrip("\n").split("\n") if text else []
+    if len(lines) != entry["records"]:
+        raise Exception(f"Archived {date} has {len(lines)} records, "
+                        f"index expects {entry['records']}")
+
+    # Pages were compressed in page order, so their records follow it
+    pairs, start = [], 0
+    for number, page in sorted(entry["pages"].items(),
+                               key=lambda item: item[1]["offset"]):
+        pairs.extend((int(number), line)
+                     for line in lines[start:start + page["records"]])
+        start += page["records"]
+    return pairs
+
+
+def compress_date_pages(bucket_name, date):
+    """
+    Download and compress the JSON pages of a date in page order.
+    Returns (date, archive bytes, page entries with offsets relative to
+    the date, raw bytes, manifest checksum); raises if a page is not a
+    JSON array
+    """
+    client = storage.Client()
+    checksum = gcs_manifest_checksum(bucket_name, f"{date}/")
+    pages = []
+    for blob in client.list_blobs(bucket_name, prefix=f"{date}/"):
+        match = PAGE_PATTERN.match(blob.name[len(date) + 1:])
+        if match:
+            pages.append((int(match.group(1)), blob))
+    pages.sort(key=lambda page: page[0])
+
+    chunk, entries, raw_bytes = bytearray(), {}, 0
+    for page_number, blob in pages:
+        content = blob.download_as_bytes()
+        raw_bytes += len(content)
+        records = json.loads(content)
+        if not isinstance(records, list):
+            raise Exception(f"{blob.name} is not a JSON array")
+        lines = "".join(json.dumps(record, ensure_ascii=False,
+                                   separators=(",", ":")) + "\n"
+                        for record in records)
+        member = gzip.compress(lines.encode("utf-8"), mtime=0)
+        entries[str(page_number)] = {"offset": len(chunk),
+                                     "length": len(member),
+                                     "records": len(records)}
+        chunk += member
+
+    return date, bytes(chunk), entries, raw_bytes, checksum
+
+
+def append_to_archive(bucket_name, month, compressed_dates):
+    """
+    Append compressed dates (compress_date_pages results) to the month
+    archive and index. The archive is extended with a compose and the
+    index is replaced with a generation precondition, so a concurrent
+    compaction of the same month fails instead of losing entries.
+    Returns the updated index.
+    """
+    client = storage.Client()
+    bucket = client.bucket(bucket_name)
+    index, index_generation = load_index(bucket_name, month)
+
+    archive = bucket.get_blob(archive_object(month))
+    offset = archive.size if archive is not None else 0
+    chunk = bytearray()
+    for date, data, pages, raw_bytes, checksum in sorted(compressed_dates):
+        start = offset + len(chunk)
+        index["dates"][date] = {
+            "offset": start,
+            "length": len(data),
+            "bytes": raw_bytes,
+            "records": sum(page["records"] for page in pages.values()),
+            "manifest_checksum": checksum,
+            "pages": {number: dict(page, offset=start + page["offset"])
+                      for number, page in pages.items()}
+        }
+        chunk += data
+
+    if archive is None:
+        bucket.blob(archive_object(month)).upload_from_string(
+            bytes(chunk), content_type="application/gzip",
+            if_generation_match=0)
+    else:
+        part = bucket.blob(f"{ARCHIVE_PREFIX}/month={month}/"
+                           f"_append-{uuid.uuid4().hex}")
+        part.upload_from_string(bytes(chunk),
+                                content_type="application/gzip")
+        try:
+            target = bucket.blob(archive_object(month))
+            target.content_type = "application/gzip"
+            target.compose([archive, part],
+                           if_generation_match=archive.generation)
+        finally:
+            part.delete()
+
+    bucket.blob(index_object(month)).upload_from_string(
+        json.dumps(index, sort_keys=True), content_type="application/json",
+        if_generation_match=index_generation)
+    _cached_index.cache_clear()
+
+    logging.info(f"Archived {len(compressed_dates)} date(s) into "
+                 f"gs://{bucket_name}/{archive_object(month)} "
+                 f"(+{len(chunk)} bytes)")
+    return index
+
+
+def delete_raw_pages(bucket_name, date):
+    """
+    Delete the page objects (JSON and Parquet fragments) of a date
+    """
+    client = storage.Client()
+    blobs = list(client.list_blobs(bucket_name, prefix=f"{date}/"))
+    for blob in blobs:
+        blob.delete()
+    return len(blobs)
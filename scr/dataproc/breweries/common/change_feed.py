@@ -0,0 +1,211 @@
+import gzip
+import json
+import logging
+from pyspark.sql.functions import (
+    col, when, sha2, to_json, struct, collect_list, sort_array, concat_ws,
+    crc32, count
+)
+from silver_writer import bucket_path, get_filesystem
+
+# Job property with the topic path (projects/<project>/topics/<topic>);
+# the change feed is disabled when it is empty
+CHANGE_FEED_TOPIC_PROPERTY = "spark.brwy.changeFeedTopic"
+
+# Columns that change on every run without the brewery changing
+HASH_EXCLUDED_COLUMNS = [
+    "processing_date", "processing_timestamp", "source_date",
+    "year", "month", "day"
+]
+CHANGE_INSERTED = "inserted"
+CHANGE_UPDATED = "updated"
+CHANGE_DELETED = "deleted"
+CHANGE_TYPES = [CHANGE_INSERTED, CHANGE_UPDATED, CHANGE_DELETED]
+
+# Changes of one brewery always use the same ordering key (CRC32 of the
+# id modulo the buckets), so consumers receive them in publish order;
+# ids are sorted within each key
+ORDERING_KEY_BUCKETS = 16
+# Brewery ids per message (gzipped JSON, a few tens of kilobytes)
+MAX_IDS_PER_MESSAGE = 5000
+
+
+def change_feed_path(silver_bucket, date, name):
+    """
+    Path of a change feed dataset of a date
+    """
+    return bucket_path(silver_bucket, f"changes/date={date}/{name}")
+
+
+def ordering_key(bucket):
+    """
+    Pub/Sub ordering key of an id bucket
+    """
+    return f"breweries-{bucket:02d}"
+
+
+def row_hashes(df):
+    """
+    (id_brewery, row_hash) of a transformed partition; ids published
+    more than once hash all their rows together
+    """
+    columns = sorted(c for c in df.columns
+                     if c not in HASH_EXCLUDED_COLUMNS)
+    return df \
+        .filter(col("id_brewery").isNotNull()) \
+        .select("id_brewery",
+                sha2(to_json(struct(*columns)), 256).alias("row_hash")) \
+        .groupBy("id_brewery") \
+        .agg(sha2(concat_ws(",", sort_array(collect_list("row_hash"))),
+                  256).alias("row_hash"))
+
+
+def previous_hashes_date(spark, silver_bucket, date):
+    """
+    Newest date before date with stored row hashes, or None
+    """
+    fs, changes = get_filesystem(spark, bucket_path(silver_bucket,
+                                                    "changes"))
+    if not fs.exists(changes):
+        return None
+
+    dates = sorted((status.getPath().getName()[len("date="):]
+                    for status in fs.listStatus(changes)
+                    if status.getPath().getName().startswith("date=")),
+                   reverse=True)
+    for previous in dates:
+        _, marker = get_filesystem(spark, change_feed_path(
+            silver_bucket, previous, "row_hashes/_SUCCESS"))
+        if previous < date and fs.exists(marker):
+            return previous
+    return None
+
+
+def compute_changes(current, previous):
+    """
+    (id_brewery, change) of the ids inserted, updated or deleted between
+    two row hash datasets
+    """
+    joined = current.alias("c").join(
+        previous.alias("p"),
+        col("c.id_brewery") == col("p.id_brewery"), "full_outer")
+
+    return joined \
+        .select(
+            when(col("c.id_brewery").isNull(), col("p.id_brewery"))
+            .otherwise(col("c.id_brewery")).alias("id_brewery"),
+            when(col("p.id_brewery").isNull(), CHANGE_INSERTED)
+            .when(col("c.id_brewery").isNull(), CHANGE_DELETED)
+            .when(col("c.row_hash") != col("p.row_hash"), CHANGE_UPDATED)
+            .alias("change")) \
+        .filter(col("change").isNotNull())
+
+
+def change_batches(rows, bucket_counts):
+    """
+    Group (bucket, id_brewery, change) rows sorted by bucket and id into
+    (ordering key, batch index, batch count, changes) batches
+    """
+    batch, batch_index, current_bucket = [], 0, None
+    for row in rows:
+        if row.bucket != current_bucket:
+            if batch:
+                yield current_key, batch_index, batch_count, batch
+            current_bucket = row.bucket
+            current_key = ordering_key(current_bucket)
+            batch_count = -(-bucket_counts[current_bucket]
+                            // MAX_IDS_PER_MESSAGE)
+            batch, batch_index = [], 0
+        batch.append([row.id_brewery, row.change])
+        if len(batch) == MAX_IDS_PER_MESSAGE:
+            yield current_key, batch_index, batch_count, batch
+            batch, batch_index = [], batch_index + 1
+    if batch:
+        yield current_key, batch_index, batch_count, batch
+
+
+def publish_changes(topic, changes, date, previous_date, run_id):
+    """
+    Publish the changes sorted by ordering key and id as gzipped JSON
+    messages; returns the number of messages
+    """
+    from google.cloud import pubsub_v1
+
+    publisher = pubsub_v1.PublisherClient(
+        batch_settings=pubsub_v1.types.BatchSettings(
+            max_messages=100, max_bytes=4 * 1024 * 1024, max_latency=0.05),
+        publisher_options=pubsub_v1.types.PublisherOptions(
+            enable_message_ordering=True))
+
+    changes = changes \
+        .withColumn("bucket",
+                    crc32(col("id_brewery")) % ORDERING_KEY_BUCKETS) \
+        .cache()
+    bucket_counts = {row.bucket: row["count"] for row in changes
+                     .groupBy("bucket").agg(count("*").alias("count"))
+                     .collect()}
+
+    # Only the sorted (bucket, id, change) rows reach the driver,
+    # streamed by partition
+    rows = changes.orderBy("bucket", "id_brewery").toLocalIterator()
+    futures = []
+    for key, batch_index, batch_count, batch in change_batches(
+            rows, bucket_counts):
+        payload = gzip.compress(json.dumps(
+            {"date": date, "previous_date": previous_date,
+             "changes": batch}).encode("utf-8"))
+        futures.append(publisher.publish(
+            topic, payload, ordering_key=key,
+            content_encoding="gzip", date=date,
+            previous_date=previous_date or "", run_id=run_id,
+            batch_index=str(batch_index), batch_count=str(batch_count),
+            changes=str(len(batch))))
+
+    for future in futures:
+        future.result()
+    changes.unpersist()
+    return len(futures)
+
+
+def publish_change_feed(spark, df, silver_bucket, date, run_id):
+    """
+    Store the row hashes of a transformed partition and publish the ids
+    inserted, updated or deleted since the previous stored date to the
+    change feed topic. Returns the counts by change type (None when the
+    feed is disabled).
+    """
+    topic = spark.sparkContext.getConf().get(CHANGE_FEED_TOPIC_PROPERTY, "")
+    if not topic:
+        logging.info("Change feed topic not configured, skipping")
+        return None
+
+    try:
+        hashes_path = change_feed_path(silver_bucket, date, "row_hashes")
+        row_hashes(df).write.mode("overwrite").parquet(hashes_path)
+        current = spark.read.parquet(hashes_path)
+
+        previous_date = previous_hashes_date(spark, silver_bucket, date)
+        if previous_date is None:
+            logging.info("No previous row hashes, publishing every id as "
+                         "inserted")
+            previous = current.limit(0)
+        else:
+            previous = spark.read.parquet(change_feed_path(
+                silver_bucket, previous_date, "row_hashes"))
+
+        changes = compute_changes(current, previous)
+        counts = dict.fromkeys(CHANGE_TYPES, 0)
+        counts.update({row.change: row["count"] for row in changes
+                       .groupBy("change").agg(count("*").alias("count"))
+                       .collect()})
+        logging.info(f"Changes since {previous_date}: {counts}")
+
+        messages = publish_changes(topic, changes, date, previous_date,
+                                   run_id) if sum(counts.values()) else 0
+
+    except Exception as e:
+        error_msg = f"Error publishing change feed: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Published {messages} change feed message(s) to {topic}")
+    return dict(counts, previous_date=previous_date, messages=messages)
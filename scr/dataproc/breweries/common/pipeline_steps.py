@@ -0,0 +1,55 @@
+from bronze_archive import date_input_checksum
+from schema_registry import registered_fields
+from step_fingerprint import (gcs_manifest_checksum, code_version,
+                              compute_step_fingerprint, is_step_current)
+
+# Steps of the workflow template that are skipped when their input, code
+# and schema are unchanged; computed without Spark, so trigger-dataproc
+# can skip the whole workflow (cluster included)
+LOAD_STEP = "total-load"
+TRANSFORM_STEP = "total-transform"
+
+# Modules each step runs, hashed into its code version
+LOAD_MODULES = ("brewery_load", "brewery_schema", "silver_writer",
+                "record_quarantine", "bronze_archive", "schema_registry")
+TRANSFORM_MODULES = ("brewery_transform", "change_feed", "silver_writer",
+                     "brewery_schema", "run_ledger")
+
+
+def load_step_fingerprint(bronze_bucket, date_param):
+    """
+    Fingerprint of the load step: bronze manifest, code of every module
+    the step runs and schema (registering a new field reloads the date)
+    """
+    return compute_step_fingerprint(
+        LOAD_STEP,
+        date_input_checksum(bronze_bucket, date_param),
+        code_version(*LOAD_MODULES),
+        registered_fields())
+
+
+def transform_step_fingerprint(silver_bucket, date_param):
+    """
+    Fingerprint of the transform step: silver manifest, code of every
+    module the step runs and schema
+    """
+    return compute_step_fingerprint(
+        TRANSFORM_STEP,
+        gcs_manifest_checksum(silver_bucket, f"breweries/date={date_param}/"),
+        code_version(*TRANSFORM_MODULES))
+
+
+def current_steps(bronze_bucket, silver_bucket, date_param):
+    """
+    True when both the load and the transform of a date are current. The
+    transform is only checked once the load is: an unchanged load leaves
+    the silver manifest the transform fingerprint reads as it is
+    """
+    load_fingerprint, _ = load_step_fingerprint(bronze_bucket, date_param)
+    if not is_step_current(silver_bucket, LOAD_STEP, date_param,
+                           load_fingerprint):
+        return False
+    transform_fingerprint, _ = transform_step_fingerprint(silver_bucket,
+                                                          date_param)
+    return is_step_current(silver_bucket, TRANSFORM_STEP, date_param,
+                           transform_fingerprint)
@@ -0,0 +1,93 @@
+import logging
+from datetime import datetime, timezone
+from pyspark.sql.functions import col, input_file_name, lit, count
+from pyspark.sql.types import StructType, StructField, StringType
+from silver_writer import bucket_path, get_filesystem
+
+# Raw text of the records the JSON reader could not parse
+CORRUPT_COLUMN = "_corrupt_record"
+SOURCE_FILE_COLUMN = "_source_file"
+
+# Job property with the share of bronze pages that may hold corrupt
+# records before total-load fails
+CORRUPT_BUDGET_PROPERTY = "spark.brwy.corruptPageBudget"
+DEFAULT_CORRUPT_BUDGET = 0.05
+
+
+def with_corrupt_column(schema):
+    """
+    Read schema with the column PERMISSIVE mode fills for corrupt records
+    """
+    return StructType(schema.fields +
+                      [StructField(CORRUPT_COLUMN, StringType(), True)])
+
+
+def corrupt_page_budget(spark):
+    """
+    Error budget from the job properties (fraction of pages)
+    """
+    return float(spark.sparkContext.getConf().get(
+        CORRUPT_BUDGET_PROPERTY, str(DEFAULT_CORRUPT_BUDGET)))
+
+
+def quarantine_path(silver_bucket, date):
+    """
+    Path of the corrupt records of a date
+    """
+    return bucket_path(silver_bucket, f"quarantine/date={date}")
+
+
+def quarantine_corrupt_records(spark, df, silver_bucket, date, total_pages):
+    """
+    Split a DataFrame read with with_corrupt_column into its valid rows
+    and the corrupt ones, written to the silver quarantine with their
+    page and raw text. Returns (valid rows, corrupt records by page,
+    cached read); the caller unpersists the cached read once the valid
+    rows are written. Raises once the pages with corrupt records exceed
+    the error budget.
+    Rows are attributed to their input file unless the DataFrame already
+    has a SOURCE_FILE_COLUMN (archived dates, one value per page).
+    """
+    if SOURCE_FILE_COLUMN not in df.columns:
+        df = df.withColumn(SOURCE_FILE_COLUMN, input_file_name())
+    df = df.cache()
+
+    # Spark only allows queries on the corrupt column of a cached read
+    corrupt = df.filter(col(CORRUPT_COLUMN).isNotNull())
+    corrupt_files = {row[SOURCE_FILE_COLUMN]: row["records"]
+                     for row in corrupt.groupBy(SOURCE_FILE_COLUMN)
+                     .agg(count("*").alias("records")).collect()}
+
+    output_path = quarantine_path(silver_bucket, date)
+    if corrupt_files:
+        # A page that fails as a whole yields its full text once per row
+        corrupt.groupBy(SOURCE_FILE_COLUMN, CORRUPT_COLUMN) \
+            .agg(count("*").alias("records")) \
+            .select(col(SOURCE_FILE_COLUMN).alias("source_file"),
+                    col(CORRUPT_COLUMN).alias("raw_record"),
+                    col("records"),
+                    lit(datetime.now(timezone.utc).isoformat())
+                    .alias("quarantined_at")) \
+            .coalesce(1) \
+            .write \
+            .mode("overwrite") \
+            .parquet(output_path)
+        logging.warning(f"Quarantined {sum(corrupt_files.values())} "
+                        f"corrupt records from {len(corrupt_files)} "
+                        f"page(s) to {output_path}: {corrupt_files}")
+    else:
+        # Drop the quarantine of an earlier run of the date
+        fs, path = get_filesystem(spark, output_path)
+        if fs.exists(path):
+            fs.delete(path, True)
+
+    budget = corrupt_page_budget(spark)
+    if len(corrupt_files) > budget * max(total_pages, 1):
+        df.unpersist()
+        raise Exception(f"{len(corrupt_files)} of {total_pages} pages have "
+                        f"corrupt records, over the error budget of "
+                        f"{budget:.0%}; see {output_path}")
+
+    valid = df.filter(col(CORRUPT_COLUMN).isNull()) \
+        .drop(CORRUPT_COLUMN, SOURCE_FILE_COLUMN)
+    return valid, corrupt_files, df
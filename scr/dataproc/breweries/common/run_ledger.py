@@ -0,0 +1,105 @@
+import json
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from google.cloud import bigquery
+from tracing import configure_tracing, span
+
+# Job properties set by the workflow template / trigger-dataproc
+LEDGER_TABLE_PROPERTY = "spark.brwy.ledgerTable"
+RUN_ID_PROPERTY = "spark.brwy.runId"
+
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+
+class RunLedger:
+    """
+    Appends stage timing and volume records to the run ledger table.
+    Ledger errors are logged and never fail the pipeline.
+    """
+
+    def __init__(self, ledger_table, run_id, run_date, component):
+        self.ledger_table = ledger_table
+        self.run_id = run_id
+        self.run_date = run_date
+        self.component = component
+        self._client = None
+
+    @classmethod
+    def from_spark_conf(cls, spark, run_date, component):
+        """
+        Build a ledger from the job properties of a started session (run id
+        defaults to the date) and continue the run trace in this job. The
+        properties are not visible before the SparkContext exists.
+        """
+        conf = spark.sparkContext.getConf()
+        configure_tracing(component, conf)
+        return cls(conf.get(LEDGER_TABLE_PROPERTY, ""),
+                   conf.get(RUN_ID_PROPERTY, "") or run_date,
+                   run_date, component)
+
+    def record(self, stage, started_at, finished_at, status=STATUS_SUCCEEDED,
+               records=None, bytes_processed=None, details=None):
+        """
+        Append one stage record
+        """
+        if not self.ledger_table:
+            return
+
+        row = {
+            "run_id": self.run_id,
+            "run_date": self.run_date,
+            "component": self.component,
+            "stage": stage,
+            "started_at": started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "duration_seconds": (finished_at - started_at).total_seconds(),
+            "status": status,
+            "records": records,
+            "bytes": bytes_processed,
+            "details": json.dumps(details or {}),
+            "recorded_at": datetime.now(timezone.utc).isoformat()
+        }
+
+        try:
+            if self._client is None:
+                self._client = bigquery.Client()
+            errors = self._client.insert_rows_json(self.ledger_table, [row])
+            if errors:
+                logging.warning(f"Run ledger insert errors: {errors}")
+        except Exception as e:
+            logging.warning(f"Could not write run ledger record: {str(e)}")
+
+    @contextmanager
+    def stage(self, stage):
+        """
+        Time a block in a span and record it; the yielded dict collects
+        records, bytes_processed, details and an optional status override
+        """
+        metrics = {"records": None, "bytes_processed": None, "details": {},
+                   "status": STATUS_SUCCEEDED}
+        started_at = datetime.now(timezone.utc)
+        try:
+            with span(stage, run_id=self.run_id, component=self.component,
+                      run_date=self.run_date) as current:
+                yield metrics
+                if current is not None:
+                    for key in ("records", "bytes_processed"):
+                        if metrics[key] is not None:
+                            current.set_attribute(key, metrics[key])
+        except Exception as e:
+            metrics["details"]["error"] = str(e)
+            self.record(stage, started_at, datetime.now(timezone.utc),
+                        status=STATUS_FAILED,
+                        records=metrics["records"],
+                        bytes_processed=metrics["bytes_processed"],
+                        details=metrics["details"])
+            raise
+
+        self.record(stage, started_at, datetime.now(timezone.utc),
+                    status=metrics["status"],
+                    records=metrics["records"],
+                    bytes_processed=metrics["bytes_processed"],
+                    details=metrics["details"])
@@ -0,0 +1,32 @@
+import logging
+from google.cloud import firestore
+
+# Fields the API added after the fixed bronze schema, registered by
+# api-extract when a page first shows them
+SCHEMA_REGISTRY_COLLECTION = "schema_registry"
+SCHEMA_REGISTRY_DOCUMENT = "breweries"
+# Types total-load can read (Spark types in brewery_schema.REGISTRY_TYPES)
+REGISTRY_TYPE_NAMES = ("string", "double", "boolean")
+
+
+def registered_fields():
+    """
+    Sorted (bronze field, silver column, type name) of the registered
+    fields; empty when the registry cannot be read, so a registry outage
+    loads the fixed schema
+    """
+    try:
+        snapshot = firestore.Client().collection(
+            SCHEMA_REGISTRY_COLLECTION).document(
+                SCHEMA_REGISTRY_DOCUMENT).get()
+    except Exception as e:
+        logging.warning(f"Could not read the schema registry: {str(e)}")
+        return []
+
+    if not snapshot.exists:
+        return []
+    fields = (snapshot.to_dict() or {}).get("fields", {})
+    return sorted((field, entry["column"], entry["type"])
+                  for field, entry in fields.items()
+                  if entry.get("type") in REGISTRY_TYPE_NAMES)
+
@@ -0,0 +1,389 @@
+import re
+import sys
+import bisect
+import json
+import heapq
+import mmap
+import struct
+import unicodedata
+from array import array
+
+# Search artifact layout (little-endian, sections 8-byte aligned):
+#   header: MAGIC, version, doc/term/gram counts, then (offset, length)
+#   of each section in SECTIONS order
+#   docs:  doc_offsets (u32) + doc_blob (one JSON object per brewery,
+#          doc ids in normalized name order)
+#   terms: term_offsets (u32) + term_blob (sorted UTF-8 name tokens),
+#          posting_offsets (u32) + postings (u32 doc ids per term)
+#   grams: gram_offsets (u32) + gram_blob (sorted character trigrams of
+#          the terms), gram_posting_offsets (u32) + gram_postings (u32
+#          term ids per gram)
+# Every section is read in place from the mapped file; nothing is
+# deserialized up front.
+MAGIC = b"BRWYSIX1"
+VERSION = 1
+SECTIONS = ["doc_offsets", "doc_blob", "term_offsets", "term_blob",
+            "posting_offsets", "postings", "gram_offsets", "gram_blob",
+            "gram_posting_offsets", "gram_postings"]
+HEADER = struct.Struct(f"<8sIIII{2 * len(SECTIONS)}Q")
+
+GRAM_SIZE = 3
+# Prefix queries stop expanding after this many matching terms
+MAX_PREFIX_TERMS = 256
+# Columns kept in each search result
+DOCUMENT_FIELDS = {
+    "id_brewery": "id",
+    "name_brewery": "name",
+    "name_city": "city",
+    "name_state": "state",
+    "type_brewery": "type"
+}
+
+# Latin letters without a Unicode decomposition
+TRANSLITERATION = str.maketrans({
+    "ł": "l", "Ł": "L", "ß": "ss", "æ": "ae", "Æ": "AE", "ø": "o",
+    "Ø": "O", "đ": "d", "Đ": "D", "œ": "oe", "Œ": "OE", "ı": "i",
+    "þ": "th", "Þ": "TH", "ð": "d"
+})
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def normalize_text(text):
+    """
+    Case-fold and strip accents; Hangul syllables are decomposed into
+    jamo so partial syllables match as prefixes and typos cost one jamo
+    """
+    text = unicodedata.normalize("NFKD", text.translate(TRANSLITERATION))
+    return "".join(char for char in text
+                   if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text):
+    """
+    Normalized tokens of a name
+    """
+    return TOKEN_PATTERN.findall(normalize_text(text or ""))
+
+
+def term_grams(term):
+    """
+    Character trigrams of a term padded with start/end markers
+    """
+    padded = f"\x02{term}\x03"
+    return {padded[i:i + GRAM_SIZE]
+            for i in range(max(1, len(padded) - GRAM_SIZE + 1))}
+
+
+def max_edits(term):
+    """
+    Edit distance tolerated for a query token of this length
+    """
+    if len(term) <= 2:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def edit_distance(a, b, limit):
+    """
+    Levenshtein distance of a and b, or limit + 1 once it exceeds limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _u32(values):
+    data = array("I", values)
+    if sys.byteorder == "big":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _string_table(strings):
+    offsets, blob, position = [0], bytearray(), 0
+    for value in strings:
+        encoded = value.encode("utf-8")
+        blob += encoded
+        position += len(encoded)
+        offsets.append(position)
+    return _u32(offsets), bytes(blob)
+
+
+def _postings_table(lists):
+    offsets, values = [0], []
+    for items in lists:
+        values.extend(items)
+        offsets.append(len(values))
+    return _u32(offsets), _u32(values)
+
+
+def build_search_index(rows):
+    """
+    Serialize the search artifact of an iterable of silver rows (dicts
+    with the DOCUMENT_FIELDS columns); returns the artifact bytes
+    """
+    documents = []
+    for row in rows:
+        if row.get("name_brewery"):
+            documents.append({field: row.get(column) for column, field
+                              in DOCUMENT_FIELDS.items()})
+    documents.sort(key=lambda d: (normalize_text(d["name"]), d["id"] or ""))
+
+    term_docs = {}
+    for doc_id, document in enumerate(documents):
+        for token in tokenize(document["name"]):
+            term_docs.setdefault(token, set()).add(doc_id)
+
+    # Terms sorted by UTF-8 bytes, the order the reader bisects in
+    terms = sorted(term_docs, key=lambda t: t.encode("utf-8"))
+    gram_terms = {}
+    for term_id, term in enumerate(terms):
+        for gram in term_grams(term):
+            gram_terms.setdefault(gram, []).append(term_id)
+    grams = sorted(gram_terms, key=lambda g: g.encode("utf-8"))
+
+    sections = {}
+    sections["doc_offsets"], sections["doc_blob"] = _string_table(
+        json.dumps(d, ensure_ascii=False) for d in documents)
+    sections["term_offsets"], sections["term_blob"] = _string_table(terms)
+    sections["posting_offsets"], sections["postings"] = _postings_table(
+        sorted(term_docs[term]) for term in terms)
+    sections["gram_offsets"], sections["gram_blob"] = _string_table(grams)
+    sections["gram_posting_offsets"], sections["gram_postings"] = \
+        _postings_table(gram_terms[gram] for gram in grams)
+
+    body, positions = bytearray(), []
+    for name in SECTIONS:
+        body += b"\0" * (-(HEADER.size + len(body)) % 8)
+        positions += [HEADER.size + len(body), len(sections[name])]
+        body += sections[name]
+
+    header = HEADER.pack(MAGIC, VERSION, len(documents), len(terms),
+                         len(grams), *positions)
+    return header + bytes(body)
+
+
+class _StringTable:
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+    def lower_bound(self, key):
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self[middle] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def find(self, key):
+        position = self.lower_bound(key)
+        if position < len(self) and self[position] == key:
+            return position
+        return None
+
+
+class _PostingsTable:
+    def __init__(self, offsets, values):
+        self.offsets = offsets
+        self.values = values
+
+    def __getitem__(self, i):
+        return self.values[self.offsets[i]:self.offsets[i + 1]]
+
+
+class SearchIndex:
+    """
+    Reader of a search artifact, memory-mapped from a file (or over an
+    in-memory buffer); prefix and typo-tolerant lookups on brewery names.
+    The mapping is released when the reader is garbage collected.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, self.num_docs, self.num_terms, self.num_grams, \
+            *positions = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            raise Exception(f"Not a search index (version {version})")
+
+        sections = {}
+        for position, name in enumerate(SECTIONS):
+            offset, length = positions[2 * position:2 * position + 2]
+            section = view[offset:offset + length]
+            if not name.endswith("_blob"):
+                section = self._u32_view(section)
+            sections[name] = section
+
+        self.docs = _StringTable(sections["doc_offsets"],
+                                 sections["doc_blob"])
+        self.terms = _StringTable(sections["term_offsets"],
+                                  sections["term_blob"])
+        self.postings = _PostingsTable(sections["posting_offsets"],
+                                       sections["postings"])
+        self.grams = _StringTable(sections["gram_offsets"],
+                                  sections["gram_blob"])
+        self.gram_postings = _PostingsTable(
+            sections["gram_posting_offsets"], sections["gram_postings"])
+
+    @staticmethod
+    def _u32_view(section):
+        if sys.byteorder == "little":
+            return section.cast("I")
+        values = array("I", section)
+        values.byteswap()
+        return values
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-map an artifact file
+        """
+        with open(path, "rb") as index_file:
+            return cls(mmap.mmap(index_file.fileno(), 0,
+                                 access=mmap.ACCESS_READ))
+
+    def document(self, doc_id):
+        """
+        Search result fields of a document
+        """
+        return json.loads(self.docs[doc_id])
+
+    def _prefix_terms(self, token):
+        """
+        Ids of the terms starting with token
+        """
+        key = token.encode("utf-8")
+        position = self.terms.lower_bound(key)
+        term_ids = []
+        for term_id in range(position,
+                             min(position + MAX_PREFIX_TERMS, self.num_terms)):
+            if not self.terms[term_id].startswith(key):
+                break
+            term_ids.append(term_id)
+        return term_ids
+
+    def _fuzzy_terms(self, token):
+        """
+        term id -> edit distance of the terms within max_edits of token
+        """
+        limit = max_edits(token)
+        if limit == 0:
+            return {}
+        grams = term_grams(token)
+        shared = {}
+        for gram in grams:
+            gram_id = self.grams.find(gram.encode("utf-8"))
+            if gram_id is not None:
+                for term_id in self.gram_postings[gram_id]:
+                    shared[term_id] = shared.get(term_id, 0) + 1
+
+        # Each edit changes at most GRAM_SIZE trigrams
+        minimum_shared = max(1, len(grams) - GRAM_SIZE * limit)
+        matches = {}
+        for term_id, count in shared.items():
+            if count >= minimum_shared:
+                term = self.terms[term_id].decode("utf-8")
+                distance = edit_distance(token, term, limit)
+                if distance <= limit:
+                    matches[term_id] = distance
+        return matches
+
+    def _token_terms(self, token, fuzzy):
+        """
+        term id -> edits of the terms a query token matches: terms it is
+        a prefix of (0 edits), plus terms within max_edits when fuzzy
+        """
+        terms = dict.fromkeys(self._prefix_terms(token), 0)
+        if fuzzy:
+            for term_id, distance in self._fuzzy_terms(token).items():
+                terms.setdefault(term_id, distance)
+        return terms
+
+    def _docs(self, term_ids):
+        """
+        Doc ids of the terms in ascending (name) order, without repeats
+        """
+        last = None
+        for doc_id in heapq.merge(*(self.postings[term_id]
+                                    for term_id in term_ids)):
+            if doc_id != last:
+                yield doc_id
+                last = doc_id
+
+    def _contains(self, term_id, doc_id):
+        postings = self.postings[term_id]
+        position = bisect.bisect_left(postings, doc_id)
+        return position < len(postings) and postings[position] == doc_id
+
+    def _match(self, tokens, fuzzy, limit, results):
+        """
+        Walk the postings of the most selective token in name order (by
+        edits when fuzzy), keeping docs that every other token matches,
+        until limit results
+        """
+        token_terms = [self._token_terms(token, fuzzy) for token in tokens]
+        if not all(token_terms):
+            return
+        token_terms.sort(key=lambda terms: sum(
+            len(self.postings[term_id]) for term_id in terms))
+        driver, others = token_terms[0], [
+            sorted(terms.items(), key=lambda item: item[1])
+            for terms in token_terms[1:]]
+
+        levels = {}
+        for term_id, distance in driver.items():
+            levels.setdefault(distance, []).append(term_id)
+
+        for distance in sorted(levels):
+            for doc_id in self._docs(levels[distance]):
+                if len(results) >= limit:
+                    return
+                if doc_id in results:
+                    continue
+                cost = distance
+                for terms in others:
+                    token_cost = next((edits for term_id, edits in terms
+                                       if self._contains(term_id, doc_id)),
+                                      None)
+                    if token_cost is None:
+                        break
+                    cost += token_cost
+                else:
+                    results[doc_id] = cost
+
+    def search(self, query, limit=10):
+        """
+        Breweries whose name has a token starting with each query token,
+        completed with typo-tolerant matches when there are fewer than
+        limit; results are ordered by edits, then name
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        results = {}
+        self._match(tokens, False, limit, results)
+        if len(results) < limit:
+            self._match(tokens, True, limit, results)
+
+        ranked = sorted(results.items(), key=lambda item: (item[1], item[0]))
+        return [dict(self.document(doc_id), edits=cost)
+                for doc_id, cost in ranked]
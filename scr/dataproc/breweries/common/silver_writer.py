@@ -0,0 +1,140 @@
+import os
+import math
+import logging
+from pyspark.sql.functions import col
+
+# Target size of each silver Parquet file
+TARGET_FILE_BYTES = 128 * 1024 * 1024
+# Parquet row group size (min/max statistics are kept per row group)
+PARQUET_BLOCK_BYTES = 32 * 1024 * 1024
+# Sort order inside files, matching the BigQuery clustering filters
+SORT_COLUMNS = ["name_state", "type_brewery", "id_brewery"]
+# Approximate size of snappy Parquet relative to the bronze JSON
+PARQUET_TO_JSON_RATIO = 0.25
+# Sibling directory holding a path while replace_path swaps it
+REPLACED_DIR = "_replaced"
+# Scheme of the bucket paths read by Spark (the local harness uses a
+# file:// directory holding one folder per bucket)
+STORAGE_ROOT = os.environ.get("BRWY_STORAGE_ROOT", "gs://")
+
+
+def bucket_path(bucket, path=""):
+    """
+    Spark path of an object or prefix in a bucket
+    """
+    return f"{STORAGE_ROOT}{bucket}/{path}"
+
+
+def get_filesystem(spark, path):
+    """
+    Return the Hadoop FileSystem and Path objects for a path
+    """
+    hadoop_path = spark._jvm.org.apache.hadoop.fs.Path(path)
+    fs = hadoop_path.getFileSystem(spark._jsc.hadoopConfiguration())
+    return fs, hadoop_path
+
+
+def path_size_bytes(spark, path):
+    """
+    Total size in bytes of the files matching a path or glob
+    """
+    fs, hadoop_path = get_filesystem(spark, path)
+    statuses = fs.globStatus(hadoop_path)
+    if not statuses:
+        return 0
+
+    return sum(fs.getContentSummary(status.getPath()).getLength()
+               for status in statuses)
+
+
+def count_files(spark, pattern):
+    """
+    Number of files matching a path or glob
+    """
+    fs, hadoop_path = get_filesystem(spark, pattern)
+    statuses = fs.globStatus(hadoop_path)
+    return len(statuses) if statuses else 0
+
+
+def count_data_files(spark, path):
+    """
+    Number of Parquet data files directly under a path
+    """
+    fs, hadoop_path = get_filesystem(spark, path)
+    if not fs.exists(hadoop_path):
+        return 0
+
+    return sum(1 for status in fs.listStatus(hadoop_path)
+               if status.getPath().getName().endswith(".parquet"))
+
+
+def target_file_count(estimated_bytes, target_file_bytes=TARGET_FILE_BYTES):
+    """
+    Number of output files needed to reach the target file size
+    """
+    return max(1, math.ceil(estimated_bytes / target_file_bytes))
+
+
+def write_silver_parquet(df, output_path, estimated_bytes, mode="overwrite"):
+    """
+    Write silver Parquet range-partitioned and sorted by SORT_COLUMNS, so
+    each file and row group covers a narrow range of state/type/id and
+    readers can prune them using Parquet min/max statistics
+    """
+    num_files = target_file_count(estimated_bytes)
+    logging.info(f"Writing {num_files} Parquet file(s) for an estimated "
+                 f"{estimated_bytes} bytes to: {output_path}")
+
+    df.repartitionByRange(num_files, *[col(c) for c in SORT_COLUMNS]) \
+        .sortWithinPartitions(*SORT_COLUMNS) \
+        .write \
+        .mode(mode) \
+        .option("compression", "snappy") \
+        .option("parquet.block.size", PARQUET_BLOCK_BYTES) \
+        .parquet(output_path)
+
+    return num_files
+
+
+def replace_path(spark, source_path, target_path):
+    """
+    Replace target_path by source_path. The current target is moved to a
+    backup (under _replaced/, which Spark readers skip) and only deleted
+    once the new data is in place; it is moved back if the rename fails
+    """
+    fs, source = get_filesystem(spark, source_path)
+    _, target = get_filesystem(spark, target_path)
+    jvm_path = spark._jvm.org.apache.hadoop.fs.Path
+    backup = jvm_path(jvm_path(target.getParent(), REPLACED_DIR),
+                      target.getName())
+
+    # Leftover of an interrupted replace: the backup is the only copy
+    # when the target is missing
+    if fs.exists(backup):
+        if fs.exists(target):
+            fs.delete(backup, True)
+        elif not fs.rename(backup, target):
+            raise Exception(f"Could not restore {target_path} from "
+                            f"{backup.toString()}")
+
+    has_target = fs.exists(target)
+    if has_target:
+        fs.mkdirs(backup.getParent())
+        if not fs.rename(target, backup):
+            raise Exception(f"Could not move {target_path} to "
+                            f"{backup.toString()}")
+
+    try:
+        renamed = fs.rename(source, target)
+    except Exception:
+        renamed = False
+    if not renamed:
+        if has_target and not fs.rename(backup, target):
+            raise Exception(f"Could not rename {source_path} to "
+                            f"{target_path} nor restore it from "
+                            f"{backup.toString()}")
+        raise Exception(f"Could not rename {source_path} to {target_path}")
+
+    if has_target and not fs.delete(backup, True):
+        logging.warning(f"Could not delete the replaced data at "
+                        f"{backup.toString()}")
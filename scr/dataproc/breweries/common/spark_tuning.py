@@ -0,0 +1,96 @@
+import math
+import logging
+from google.cloud import storage
+
+MB = 1024 * 1024
+
+# Input bytes each shuffle partition should handle
+TARGET_PARTITION_BYTES = 64 * MB
+MIN_SHUFFLE_PARTITIONS = 4
+MAX_SHUFFLE_PARTITIONS = 2000
+
+# Inputs up to this size are treated as a small day
+SMALL_INPUT_BYTES = 256 * MB
+SMALL_BROADCAST_THRESHOLD = 64 * MB
+DEFAULT_BROADCAST_THRESHOLD = 10 * MB
+
+# Executor sizing for dynamic allocation
+CORES_PER_EXECUTOR = 2
+MAX_EXECUTORS = 50
+
+
+def measure_gcs_prefix(bucket_name, prefix, suffix=""):
+    """
+    Total bytes and number of objects under a GCS prefix
+    """
+    client = storage.Client()
+    total_bytes = 0
+    total_files = 0
+    for blob in client.list_blobs(bucket_name, prefix=prefix):
+        if suffix and not blob.name.endswith(suffix):
+            continue
+        total_bytes += blob.size or 0
+        total_files += 1
+
+    return total_bytes, total_files
+
+
+def plan_spark_config(input_bytes, input_files, expansion=1.0):
+    """
+    Choose Spark properties from the input size. expansion scales
+    compressed inputs (e.g. Parquet) to their approximate in-memory size.
+    """
+    effective_bytes = int(input_bytes * expansion)
+
+    shuffle_partitions = min(
+        MAX_SHUFFLE_PARTITIONS,
+        max(MIN_SHUFFLE_PARTITIONS,
+            math.ceil(effective_bytes / TARGET_PARTITION_BYTES)))
+
+    small_input = effective_bytes <= SMALL_INPUT_BYTES
+
+    if small_input:
+        # One executor handles a small day; avoid allocation churn
+        broadcast_threshold = SMALL_BROADCAST_THRESHOLD
+        initial_executors = 1
+        max_executors = 2
+        idle_timeout = "300s"
+    else:
+        broadcast_threshold = DEFAULT_BROADCAST_THRESHOLD
+        max_executors = min(
+            MAX_EXECUTORS,
+            max(2, math.ceil(shuffle_partitions / CORES_PER_EXECUTOR)))
+        initial_executors = max(2, max_executors // 4)
+        idle_timeout = "120s"
+
+    return {
+        "spark.sql.shuffle.partitions": str(shuffle_partitions),
+        "spark.sql.adaptive.advisoryPartitionSizeInBytes":
+            str(TARGET_PARTITION_BYTES),
+        "spark.sql.adaptive.coalescePartitions.initialPartitionNum":
+            str(shuffle_partitions),
+        "spark.sql.autoBroadcastJoinThreshold": str(broadcast_threshold),
+        "spark.dynamicAllocation.minExecutors": "1",
+        "spark.dynamicAllocation.initialExecutors": str(initial_executors),
+        "spark.dynamicAllocation.maxExecutors": str(max_executors),
+        "spark.dynamicAllocation.executorIdleTimeout": idle_timeout,
+        "spark.executor.cores": str(CORES_PER_EXECUTOR),
+        # Larger inputs spill less with bigger shuffle buffers
+        "spark.shuffle.file.buffer": "64k" if small_input else "1m",
+        "spark.sql.files.maxPartitionBytes": str(TARGET_PARTITION_BYTES
+                                                 if not small_input
+                                                 else 32 * MB)
+    }
+
+
+def apply_spark_config(builder, plan, input_bytes, input_files):
+    """
+    Apply a plan to a SparkSession builder and log the chosen values
+    """
+    logging.info(f"Spark plan for {input_files} input files, "
+                 f"{input_bytes} bytes:")
+    for key, value in sorted(plan.items()):
+        logging.info(f"  {key} = {value}")
+        builder = builder.config(key, value)
+
+    return builder
@@ -0,0 +1,156 @@
+import json
+import logging
+import urllib.request
+from datetime import datetime, timezone
+from google.cloud import storage
+
+# Opt-in: gs:// prefix for the profiles, empty disables profiling
+PROFILE_PATH_PROPERTY = "spark.brwy.profilePath"
+
+# Spark settings stored with each profile, to tell runs apart in a diff
+PROFILED_CONF_KEYS = [
+    "spark.sql.shuffle.partitions",
+    "spark.sql.files.maxPartitionBytes",
+    "spark.sql.adaptive.enabled",
+    "spark.sql.adaptive.advisoryPartitionSizeInBytes",
+    "spark.default.parallelism",
+    "spark.executor.instances",
+    "spark.executor.cores",
+    "spark.executor.memory",
+    "spark.dynamicAllocation.enabled"
+]
+
+# Stage fields kept from the Spark status API (/applications/.../stages)
+STAGE_METRICS = {
+    "numTasks": "tasks",
+    "numFailedTasks": "failed_tasks",
+    "executorRunTime": "executor_run_time_ms",
+    "executorCpuTime": "executor_cpu_time_ns",
+    "jvmGcTime": "jvm_gc_time_ms",
+    "inputBytes": "input_bytes",
+    "inputRecords": "input_records",
+    "outputBytes": "output_bytes",
+    "outputRecords": "output_records",
+    "shuffleReadBytes": "shuffle_read_bytes",
+    "shuffleReadRecords": "shuffle_read_records",
+    "shuffleWriteBytes": "shuffle_write_bytes",
+    "shuffleWriteRecords": "shuffle_write_records",
+    "memoryBytesSpilled": "memory_spilled_bytes",
+    "diskBytesSpilled": "disk_spilled_bytes"
+}
+
+TASK_QUANTILES = "0.5,0.95,1.0"
+
+
+def _get_json(url):
+    """
+    GET a Spark status API endpoint
+    """
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def _parse_time(value):
+    """
+    Status API timestamps look like 2024-01-01T10:00:00.000GMT
+    """
+    if not value:
+        return None
+    return datetime.strptime(value.replace("GMT", ""),
+                             "%Y-%m-%dT%H:%M:%S.%f") \
+        .replace(tzinfo=timezone.utc)
+
+
+def _task_summary(api_url, stage):
+    """
+    Task duration, GC and spill quantiles (p50, p95, max) of a stage
+    """
+    try:
+        summary = _get_json(
+            f"{api_url}/stages/{stage['stageId']}/{stage['attemptId']}"
+            f"/taskSummary?quantiles={TASK_QUANTILES}")
+    except Exception as e:
+        logging.warning(f"No task summary for stage {stage['stageId']}: "
+                        f"{str(e)}")
+        return {}
+
+    return {
+        "duration_ms": summary.get("executorRunTime"),
+        "gc_time_ms": summary.get("jvmGcTime"),
+        "memory_spilled_bytes": summary.get("memoryBytesSpilled"),
+        "disk_spilled_bytes": summary.get("diskBytesSpilled")
+    }
+
+
+def capture_stage_metrics(spark):
+    """
+    Per-stage metrics of the current application from the driver's
+    status API (PySpark cannot register a JVM SparkListener itself)
+    """
+    sc = spark.sparkContext
+    api_url = f"{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}"
+
+    stages = []
+    for stage in _get_json(f"{api_url}/stages"):
+        if stage.get("status") not in ("COMPLETE", "FAILED"):
+            continue
+
+        submitted = _parse_time(stage.get("submissionTime"))
+        completed = _parse_time(stage.get("completionTime"))
+        metrics = {
+            "stage_id": stage["stageId"],
+            "attempt_id": stage["attemptId"],
+            "name": stage.get("name"),
+            "status": stage.get("status"),
+            "duration_ms": (int((completed - submitted).total_seconds()
+                                * 1000)
+                            if submitted and completed else None),
+            "task_quantiles": _task_summary(api_url, stage)
+        }
+        for field, key in STAGE_METRICS.items():
+            metrics[key] = stage.get(field)
+        stages.append(metrics)
+
+    return sorted(stages, key=lambda s: (s["stage_id"], s["attempt_id"]))
+
+
+def write_stage_profile(spark, job_name, date_param):
+    """
+    Write the job's stage profile to spark.brwy.profilePath (no-op when
+    the property is unset); must run before spark.stop()
+    """
+    profile_path = spark.sparkContext.getConf().get(
+        PROFILE_PATH_PROPERTY, "")
+    if not profile_path or not spark.sparkContext.uiWebUrl:
+        return None
+
+    try:
+        conf = spark.sparkContext.getConf()
+        stages = capture_stage_metrics(spark)
+        profile = {
+            "job": job_name,
+            "date": date_param,
+            "application_id": spark.sparkContext.applicationId,
+            "captured_at": datetime.now(timezone.utc).isoformat(),
+            "spark_conf": {key: conf.get(key, None)
+                           for key in PROFILED_CONF_KEYS},
+            "stages": stages
+        }
+
+        bucket_name, _, prefix = profile_path.replace("gs://", "") \
+            .partition("/")
+        blob_name = (f"{prefix.rstrip('/')}/{job_name}/date={date_param}/"
+                     f"{spark.sparkContext.applicationId}.json") \
+            .lstrip("/")
+        storage.Client().bucket(bucket_name).blob(blob_name) \
+            .upload_from_string(json.dumps(profile, indent=1),
+                                content_type="application/json")
+
+        logging.info(f"Stage profile ({len(stages)} stages) written to "
+                     f"gs://{bucket_name}/{blob_name}")
+        return f"gs://{bucket_name}/{blob_name}"
+
+    except Exception as e:
+        # Profiling must never fail the job
+        logging.warning(f"Could not write stage profile: {str(e)}")
+        return None
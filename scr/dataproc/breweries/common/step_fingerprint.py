@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from google.cloud import storage
+
+# No Spark imports: trigger-dataproc computes the same fingerprints to
+# skip a workflow whose steps are all current
+FINGERPRINT_PREFIX = "_fingerprints"
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATUS_SUCCEEDED = "succeeded"
+
+
+def gcs_manifest_checksum(bucket_name, prefix):
+    """
+    Checksum of the object names, sizes and CRC32C under a GCS prefix
+    """
+    client = storage.Client()
+    entries = sorted(
+        f"{blob.name}:{blob.size}:{blob.crc32c}"
+        for blob in client.list_blobs(bucket_name, prefix=prefix)
+    )
+    return hashlib.sha256("\n".join(entries).encode("utf-8")).hexdigest()
+
+
+def code_version(*module_names):
+    """
+    Hash of the source files of the modules a step runs, read from the
+    directory of this module (the job's python files, or the copy
+    packaged into trigger-dataproc)
+    """
+    digest = hashlib.sha256()
+    for name in module_names:
+        with open(os.path.join(MODULE_DIR, f"{name}.py"), "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def schema_version(extra_fields=()):
+    """
+    Hash of the registered fields; the fixed bronze and silver schemas
+    are code of brewery_schema, covered by code_version
+    """
+    fields = json.dumps([list(field) for field in extra_fields])
+    return hashlib.sha256(fields.encode("utf-8")).hexdigest()
+
+
+def compute_step_fingerprint(step, input_checksum, code_hash,
+                             extra_fields=()):
+    """
+    Fingerprint of a step run from its input, code and schema versions
+    """
+    components = {
+        "step": step,
+        "input": input_checksum,
+        "code": code_hash,
+        "schema": schema_version(extra_fields)
+    }
+    fingerprint = hashlib.sha256(
+        json.dumps(components, sort_keys=True).encode("utf-8")).hexdigest()
+    return fingerprint, components
+
+
+def _fingerprint_blob(bucket_name, step, date):
+    return storage.Client().bucket(bucket_name).blob(
+        f"{FINGERPRINT_PREFIX}/{step}/date={date}.json")
+
+
+def is_step_current(bucket_name, step, date, fingerprint):
+    """
+    True when the last successful run of the step had this fingerprint
+    """
+    blob = _fingerprint_blob(bucket_name, step, date)
+    if not blob.exists():
+        return False
+
+    record = json.loads(blob.download_as_text())
+    return (record.get("status") == STATUS_SUCCEEDED and
+            record.get("fingerprint") == fingerprint)
+
+
+def record_step_success(bucket_name, step, date, fingerprint, components,
+                        **details):
+    """
+    Store the fingerprint of a successful step run with its output info
+    """
+    record = {
+        "step": step,
+        "date": date,
+        "status": STATUS_SUCCEEDED,
+        "fingerprint": fingerprint,
+        "components": components,
+        "recorded_at": datetime.now().isoformat(),
+        **details
+    }
+    _fingerprint_blob(bucket_name, step, date).upload_from_string(
+        json.dumps(record), content_type="application/json")
+    logging.info(f"Recorded fingerprint for {step} on {date}: "
+                 f"{fingerprint[:12]}")
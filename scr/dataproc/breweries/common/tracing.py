@@ -0,0 +1,92 @@
+import logging
+from contextlib import contextmanager
+
+# OpenTelemetry is installed by the init action when available; without
+# it spans are no-ops and the ledger still records the stages
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (SimpleSpanProcessor,
+                                                ConsoleSpanExporter)
+    from opentelemetry.trace.propagation.tracecontext import (
+        TraceContextTextMapPropagator)
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+# Job properties set by the workflow template / trigger-dataproc
+TRACEPARENT_PROPERTY = "spark.brwy.traceparent"
+TRACE_EXPORTER_PROPERTY = "spark.brwy.traceExporter"
+TRACE_FILE_PROPERTY = "spark.brwy.traceFile"
+
+_tracer = None
+_parent_context = None
+
+
+def _build_exporter(exporter, trace_file):
+    """
+    Span exporter: log (driver output), file or otlp (collector)
+    """
+    if exporter == "log":
+        return ConsoleSpanExporter(
+            formatter=lambda span: span.to_json(indent=None) + "\n")
+    if exporter == "file":
+        return ConsoleSpanExporter(
+            out=open(trace_file, "a"),
+            formatter=lambda span: span.to_json(indent=None) + "\n")
+    if exporter == "otlp":
+        # Endpoint from OTEL_EXPORTER_OTLP_ENDPOINT
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter)
+        return OTLPSpanExporter()
+    return None
+
+
+def configure_tracing(service_name, conf):
+    """
+    Set up the tracer from the job properties (the SparkConf of a started
+    session), continuing the trace started by the functions
+    (spark.brwy.traceparent)
+    """
+    global _tracer, _parent_context
+    if _tracer is not None or not OTEL_AVAILABLE:
+        return
+
+    traceparent = conf.get(TRACEPARENT_PROPERTY, "")
+    exporter_name = conf.get(TRACE_EXPORTER_PROPERTY, "none").lower()
+    trace_file = conf.get(TRACE_FILE_PROPERTY, "/tmp/spans.jsonl")
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}))
+    try:
+        exporter = _build_exporter(exporter_name, trace_file)
+        if exporter:
+            provider.add_span_processor(SimpleSpanProcessor(exporter))
+    except Exception as e:
+        logging.warning(f"Could not configure span exporter: {str(e)}")
+
+    _tracer = provider.get_tracer(service_name)
+    if traceparent:
+        _parent_context = TraceContextTextMapPropagator().extract(
+            carrier={"traceparent": traceparent})
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Span around a block; yields the span (None without OpenTelemetry)
+    """
+    if _tracer is None:
+        yield None
+        return
+
+    # Top-level spans hang from the function span that triggered the job
+    in_span = trace.get_current_span().get_span_context().is_valid
+    parent = None if in_span else _parent_context
+
+    with _tracer.start_as_current_span(name, context=parent) as current:
+        for key, value in attributes.items():
+            if value is not None:
+                current.set_attribute(key, value)
+        yield current
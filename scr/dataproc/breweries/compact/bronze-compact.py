@@ -0,0 +1,157 @@
+import sys
+import logging
+from pyspark.sql import SparkSession
+from datetime import datetime, timedelta
+from google.cloud import storage
+from run_ledger import RunLedger
+from step_fingerprint import gcs_manifest_checksum
+from bronze_archive import (load_index, compress_date_pages,
+                            append_to_archive, delete_raw_pages,
+                            ARCHIVE_PREFIX)
+
+bronze_bucket_arg = sys.argv[1]
+# Days kept as page objects before they are rolled into the archive
+retention_days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+COMPACT_STEP = "bronze-compact"
+
+
+def closed_dates(bronze_bucket, cutoff):
+    """
+    Dates before cutoff that still have page objects in bronze
+    """
+    blobs = storage.Client().list_blobs(bronze_bucket, delimiter="/")
+    list(blobs)  # prefixes are filled while iterating
+
+    dates = []
+    for prefix in blobs.prefixes:
+        date = prefix.rstrip("/")
+        if date.startswith(ARCHIVE_PREFIX):
+            continue
+        try:
+            datetime.strptime(date, '%Y-%m-%d')
+        except ValueError:
+            continue
+        if date < cutoff:
+            dates.append(date)
+    return sorted(dates)
+
+
+def compress_safely(bronze_bucket, date):
+    """
+    compress_date_pages result, or (date, None, error) for a date with an
+    unreadable page, which then stays as page objects
+    """
+    try:
+        return compress_date_pages(bronze_bucket, date)
+    except Exception as e:
+        return date, None, str(e)
+
+
+def compact_month(spark, bronze_bucket, month, dates):
+    """
+    Append the closed dates of a month to its archive, then delete their
+    page objects; returns (archived dates, records, raw bytes)
+    """
+    index, _ = load_index(bronze_bucket, month)
+
+    # Dates archived by an interrupted run only need their pages deleted
+    pending = []
+    for date in dates:
+        entry = index["dates"].get(date)
+        if entry and entry["manifest_checksum"] == gcs_manifest_checksum(
+                bronze_bucket, f"{date}/"):
+            delete_raw_pages(bronze_bucket, date)
+            logging.info(f"{date} already archived, page objects deleted")
+        else:
+            pending.append(date)
+    if not pending:
+        return 0, 0, 0
+
+    # Pages are downloaded and compressed by the executors, one date each
+    results = spark.sparkContext \
+        .parallelize(pending, len(pending)) \
+        .map(lambda date: compress_safely(bronze_bucket, date)) \
+        .collect()
+
+    compressed = []
+    for result in results:
+        if result[1] is None:
+            logging.warning(f"Skipping {result[0]}: {result[2]}")
+        elif result[1]:
+            compressed.append(result)
+    if not compressed:
+        return 0, 0, 0
+
+    try:
+        index = append_to_archive(bronze_bucket, month, compressed)
+    except Exception as e:
+        error_msg = f"Error archiving bronze month {month}: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    # Pages rewritten while the month was compacted are kept
+    for date, _, _, _, checksum in compressed:
+        if gcs_manifest_checksum(bronze_bucket, f"{date}/") == checksum:
+            deleted = delete_raw_pages(bronze_bucket, date)
+            logging.info(f"Archived {date}: {deleted} objects deleted")
+        else:
+            logging.warning(f"{date} changed during compaction, page "
+                            f"objects kept")
+
+    return (len(compressed),
+            sum(index["dates"][c[0]]["records"] for c in compressed),
+            sum(c[3] for c in compressed))
+
+
+def main():
+    """
+    Bronze compaction script: roll closed days into monthly archives
+    """
+    if retention_days < 1:
+        error_msg = "Error: Retention must be at least one day"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    today = datetime.now().strftime('%Y-%m-%d')
+    cutoff = (datetime.now() - timedelta(days=retention_days)) \
+        .strftime('%Y-%m-%d')
+    logging.info(f"Compacting bronze dates before {cutoff}")
+    logging.info(f"Bronze bucket: {bronze_bucket_arg}")
+
+    spark = SparkSession.builder \
+        .appName(f"Breweries Bronze Compact - {today}") \
+        .getOrCreate()
+
+    ledger = RunLedger.from_spark_conf(spark, today, COMPACT_STEP)
+
+    months = {}
+    for date in closed_dates(bronze_bucket_arg, cutoff):
+        months.setdefault(date[:7], []).append(date)
+
+    with ledger.stage("bronze_compact") as stage_metrics:
+        totals = [0, 0, 0]
+        for month, dates in sorted(months.items()):
+            archived = compact_month(spark, bronze_bucket_arg, month, dates)
+            totals = [total + value for total, value
+                      in zip(totals, archived)]
+        stage_metrics["records"] = totals[1]
+        stage_metrics["bytes_processed"] = totals[2]
+        stage_metrics["details"] = {"dates": totals[0],
+                                    "months": len(months)}
+
+    logging.info(f"Bronze compaction completed. Dates archived: "
+                 f"{totals[0]} in {len(months)} month(s)")
+
+    spark.stop()
+    return 'OK'
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import sys
+import logging
+from pyspark.sql import SparkSession
+from datetime import datetime, timedelta
+from silver_writer import (path_size_bytes, count_data_files,
+                           target_file_count, write_silver_parquet,
+                           replace_path)
+
+silver_bucket_arg = sys.argv[1]
+start_date_param = sys.argv[2]
+end_date_param = sys.argv[3] if len(sys.argv) > 3 else start_date_param
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+
+def compact_silver_date(spark, silver_bucket, date_param):
+    """
+    Rewrite one silver date as sorted, right-sized Parquet files when it
+    has more files than its size requires
+    """
+    date_path = f"gs://{silver_bucket}/breweries/date={date_param}"
+    temp_path = (f"gs://{silver_bucket}/breweries/_compaction/"
+                 f"date={date_param}")
+
+    file_count = count_data_files(spark, date_path)
+    if file_count == 0:
+        logging.info(f"No silver data for {date_param}, skipping")
+        return False
+
+    size_bytes = path_size_bytes(spark, date_path)
+    expected_files = target_file_count(size_bytes)
+    if file_count <= expected_files:
+        logging.info(f"{date_param} already compacted "
+                     f"({file_count} files, {size_bytes} bytes)")
+        return False
+
+    logging.info(f"Compacting {date_param}: {file_count} files, "
+                 f"{size_bytes} bytes")
+
+    try:
+        df = spark.read.parquet(date_path)
+        write_silver_parquet(df, temp_path, size_bytes)
+        replace_path(spark, temp_path, date_path)
+
+    except Exception as e:
+        error_msg = f"Error compacting silver date {date_param}: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Compacted {date_param} into "
+                 f"{count_data_files(spark, date_path)} files")
+    return True
+
+
+def main():
+    """
+    Silver compaction script for a date range
+    """
+    try:
+        start_date = datetime.strptime(start_date_param, '%Y-%m-%d')
+        end_date = datetime.strptime(end_date_param, '%Y-%m-%d')
+    except ValueError:
+        error_msg = "Error: Dates must be in YYYY-MM-DD format"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Compacting silver dates from {start_date_param} "
+                 f"to {end_date_param}")
+    logging.info(f"Silver bucket: {silver_bucket_arg}")
+
+    spark = SparkSession.builder \
+        .appName(f"Breweries Silver Compact - {start_date_param}"
+                 f"_{end_date_param}") \
+        .getOrCreate()
+
+    compacted = 0
+    current_date = start_date
+    while current_date <= end_date:
+        if compact_silver_date(spark, silver_bucket_arg,
+                               current_date.strftime('%Y-%m-%d')):
+            compacted += 1
+        current_date += timedelta(days=1)
+
+    logging.info(f"Silver compaction completed. Dates compacted: "
+                 f"{compacted}")
+
+    spark.stop()
+    return 'OK'
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import sys
+import json
+import logging
+from urllib.parse import unquote
+from pyspark import StorageLevel
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, count
+from datetime import datetime, timezone
+from google.cloud import storage
+from run_ledger import RunLedger
+from silver_writer import bucket_path
+from stage_profiler import write_stage_profile
+
+date_param = sys.argv[1]
+silver_bucket_arg = sys.argv[2]
+export_bucket_arg = sys.argv[3]
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+EXPORT_STEP = "bulk-export"
+# Slice columns, in directory order
+SLICE_COLUMNS = ["name_country", "name_state"]
+# Directory name Spark uses for null slice values
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+MANIFEST_VERSION = 1
+
+
+def export_prefix(date):
+    """
+    Object prefix of the export of a date
+    """
+    return f"breweries/date={date}/"
+
+
+def write_slices(df, export_bucket, date):
+    """
+    Write every country/state slice as one Parquet and one gzipped CSV
+    file from a single cached scan of the silver date; returns the row
+    count of each (country, state) slice
+    """
+    # One task per slice, so each slice is one file per format
+    sliced = df \
+        .repartition(*[col(c) for c in SLICE_COLUMNS]) \
+        .sortWithinPartitions(*SLICE_COLUMNS, "id_brewery") \
+        .persist(StorageLevel.MEMORY_AND_DISK)
+
+    # Spark writes empty and null values to the same directory
+    slice_rows = {tuple(row[c] or None for c in SLICE_COLUMNS):
+                  row["rows"]
+                  for row in sliced.groupBy(*SLICE_COLUMNS)
+                  .agg(count("*").alias("rows")).collect()}
+
+    output_path = bucket_path(export_bucket, export_prefix(date))
+    sliced.write \
+        .mode("overwrite") \
+        .partitionBy(*SLICE_COLUMNS) \
+        .option("compression", "snappy") \
+        .parquet(f"{output_path}parquet")
+    sliced.write \
+        .mode("overwrite") \
+        .partitionBy(*SLICE_COLUMNS) \
+        .option("header", True) \
+        .option("escape", '"') \
+        .option("compression", "gzip") \
+        .csv(f"{output_path}csv")
+
+    sliced.unpersist()
+    return slice_rows
+
+
+def slice_values(object_name):
+    """
+    (country, state) of an exported object from its directory names
+    """
+    values = {}
+    for part in object_name.split("/"):
+        name, _, value = part.partition("=")
+        if name in SLICE_COLUMNS:
+            values[name] = None if value == NULL_PARTITION \
+                else unquote(value)
+    return tuple(values.get(c) for c in SLICE_COLUMNS)
+
+
+def build_manifest(export_bucket, date, slice_rows):
+    """
+    Manifest of the exported files with their sizes and the checksums
+    GCS computed on upload (no file is read back)
+    """
+    prefix = export_prefix(date)
+    slices = {key: {"name_country": key[0], "name_state": key[1],
+                    "rows": rows, "files": []}
+              for key, rows in slice_rows.items()}
+
+    for blob in storage.Client().list_blobs(export_bucket, prefix=prefix):
+        file_format = blob.name[len(prefix):].split("/")[0]
+        if file_format not in ("parquet", "csv") or \
+                blob.name.rsplit("/", 1)[-1].startswith(("_", ".")):
+            continue
+        key = slice_values(blob.name)
+        slices.setdefault(key, {"name_country": key[0],
+                                "name_state": key[1], "rows": None,
+                                "files": []})
+        slices[key]["files"].append({
+            "format": file_format,
+            "path": f"gs://{export_bucket}/{blob.name}",
+            "bytes": blob.size,
+            "crc32c": blob.crc32c,
+            "md5": blob.md5_hash
+        })
+
+    ordered = sorted(slices.values(),
+                     key=lambda s: (s["name_country"] or "",
+                                    s["name_state"] or ""))
+    return {
+        "version": MANIFEST_VERSION,
+        "date": date,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "slice_columns": SLICE_COLUMNS,
+        "rows": sum(slice_rows.values()),
+        "files": sum(len(s["files"]) for s in ordered),
+        "bytes": sum(f["bytes"] for s in ordered for f in s["files"]),
+        "slices": ordered
+    }
+
+
+def export_date(spark, silver_bucket, export_bucket, date):
+    """
+    Export a silver date and write its manifest last, so a manifest
+    means a complete export; returns the manifest
+    """
+    input_path = bucket_path(silver_bucket, f"breweries/date={date}")
+    manifest_blob = storage.Client().bucket(export_bucket) \
+        .blob(f"{export_prefix(date)}manifest.json")
+
+    try:
+        # A re-export invalidates the previous manifest before any file
+        # is replaced
+        if manifest_blob.exists():
+            manifest_blob.delete()
+
+        df = spark.read.parquet(input_path)
+        slice_rows = write_slices(df, export_bucket, date)
+        manifest = build_manifest(export_bucket, date, slice_rows)
+
+        manifest_blob.upload_from_string(
+            json.dumps(manifest, ensure_ascii=False),
+            content_type="application/json")
+
+    except Exception as e:
+        error_msg = f"Error exporting silver date {date}: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Exported {manifest['rows']} breweries in "
+                 f"{len(manifest['slices'])} slices, {manifest['files']} "
+                 f"files, {manifest['bytes']} bytes to "
+                 f"gs://{export_bucket}/{export_prefix(date)}")
+    return manifest
+
+
+def main():
+    """
+    Per country/state bulk export script
+    """
+    try:
+        datetime.strptime(date_param, '%Y-%m-%d')
+    except ValueError:
+        error_msg = "Error: Date must be in YYYY-MM-DD format"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Exporting silver date: {date_param}")
+    logging.info(f"Silver bucket: {silver_bucket_arg}")
+    logging.info(f"Export bucket: {export_bucket_arg}")
+
+    spark = SparkSession.builder \
+        .appName(f"Breweries Bulk Export - {date_param}") \
+        .getOrCreate()
+
+    ledger = RunLedger.from_spark_conf(spark, date_param, EXPORT_STEP)
+
+    with ledger.stage("bulk_export") as stage_metrics:
+        manifest = export_date(spark, silver_bucket_arg, export_bucket_arg,
+                               date_param)
+        stage_metrics["records"] = manifest["rows"]
+        stage_metrics["bytes_processed"] = manifest["bytes"]
+        stage_metrics["details"] = {"slices": len(manifest["slices"]),
+                                    "files": manifest["files"]}
+
+    write_stage_profile(spark, EXPORT_STEP, date_param)
+
+    spark.stop()
+    return 'OK'
+
+
+if __name__ == "__main__":
+    main()
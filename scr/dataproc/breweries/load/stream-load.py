@@ -0,0 +1,254 @@
+import sys
+import time
+import logging
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import col, to_date
+from datetime import datetime
+from google.cloud import bigquery
+from google.cloud import firestore
+from google.cloud import storage
+from brewery_schema import (define_brewery_schema, rename_columns_to_standard,
+                            add_processing_metadata)
+from silver_writer import (path_size_bytes, write_silver_parquet,
+                           get_filesystem)
+from spark_tuning import (measure_gcs_prefix, plan_spark_config,
+                          apply_spark_config)
+
+date_param = sys.argv[1]
+bronze_bucket_arg = sys.argv[2]
+silver_bucket_arg = sys.argv[3]
+dataset_id = sys.argv[4]
+temp_bucket = sys.argv[5]
+data_project_id = sys.argv[6]
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+STREAM_TABLE = "breweries_stream"
+# Pages read per micro-batch
+MAX_FILES_PER_TRIGGER = 10
+TRIGGER_INTERVAL = "30 seconds"
+# Interval between Firestore completion checks
+COMPLETION_POLL_SECONDS = 30
+# Maximum time waiting for the extraction to complete
+STREAM_TIMEOUT_SECONDS = 3600
+
+
+def wait_for_first_page(bronze_bucket, date_param):
+    """
+    Block until the bronze date prefix has at least one page, since the
+    file source cannot start on a missing path
+    """
+    client = storage.Client()
+    start_time = time.time()
+
+    while time.time() - start_time < STREAM_TIMEOUT_SECONDS:
+        blobs = client.list_blobs(bronze_bucket, prefix=f"{date_param}/",
+                                  max_results=1)
+        if any(True for _ in blobs):
+            return
+
+        logging.info(f"Waiting for the first bronze page of {date_param}")
+        time.sleep(COMPLETION_POLL_SECONDS)
+
+    error_msg = f"No bronze pages landed for {date_param}"
+    logging.error(error_msg)
+    raise Exception(error_msg)
+
+
+def get_extraction_run_id(job_doc_ref):
+    """
+    Identify the current extraction run by its creation time, so a
+    reprocessing of the same date gets a fresh checkpoint
+    """
+    job_doc = job_doc_ref.get()
+    if not job_doc.exists:
+        error_msg = f"Extraction job document for {date_param} not found"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    return int(job_doc.to_dict()['created_at'].timestamp())
+
+
+def is_extraction_complete(job_doc_ref):
+    """
+    Check the Firestore extraction job for all pages completed
+    """
+    job_doc = job_doc_ref.get()
+    if not job_doc.exists:
+        return False
+
+    job_data = job_doc.to_dict()
+    total_pages = job_data.get('total_pages')
+    completed_pages = job_data.get('completed_pages', {})
+    completed_count = sum(
+        1 for page_data in completed_pages.values()
+        if page_data.get('status') == 'completed'
+    )
+
+    logging.info(f"Extraction progress: {completed_count}/{total_pages}")
+    return total_pages is not None and completed_count == total_pages
+
+
+def delete_stream_partition(data_project_id, dataset_id, source_date):
+    """
+    Delete streamed rows of a date so a rerun starts from a clean slate
+    """
+    client = bigquery.Client(project=data_project_id)
+    delete_query = f"""
+    DELETE FROM `{data_project_id}.{dataset_id}.{STREAM_TABLE}`
+    WHERE source_date = '{source_date}'
+    """
+    client.query(delete_query).result()
+    logging.info(f"Cleared {STREAM_TABLE} rows for {source_date}")
+
+
+def process_micro_batch(batch_df, batch_id, staging_path):
+    """
+    Append one micro-batch of bronze pages to silver staging and to the
+    BigQuery stream table
+    """
+    df = add_processing_metadata(
+        rename_columns_to_standard(batch_df), date_param) \
+        .dropDuplicates(["id_brewery"]) \
+        .cache()
+
+    batch_count = df.count()
+    if batch_count == 0:
+        df.unpersist()
+        return
+
+    df.write \
+        .mode("append") \
+        .option("compression", "snappy") \
+        .parquet(staging_path)
+
+    df.withColumn("source_date", to_date(col("source_date"), "yyyy-MM-dd")) \
+        .write \
+        .format("bigquery") \
+        .option("table",
+                f"{data_project_id}.{dataset_id}.{STREAM_TABLE}") \
+        .option("writeMethod", "direct") \
+        .mode("append") \
+        .save()
+
+    logging.info(f"Micro-batch {batch_id}: {batch_count} records streamed")
+    df.unpersist()
+
+
+def stream_brewery_data(spark, bronze_bucket, silver_bucket, date_param):
+    """
+    Stream bronze pages into silver staging and BigQuery as they land,
+    then commit the final silver partition once Firestore reports that
+    every page was extracted
+    """
+    job_doc_ref = firestore.Client().collection(
+        'extraction_jobs').document(date_param)
+    run_id = get_extraction_run_id(job_doc_ref)
+
+    input_path = f"gs://{bronze_bucket}/{date_param}/"
+    staging_path = (f"gs://{silver_bucket}/breweries_stream/"
+                    f"date={date_param}/run={run_id}")
+    checkpoint_path = (f"gs://{silver_bucket}/_checkpoints/stream-load/"
+                       f"date={date_param}/run={run_id}")
+    output_path = f"gs://{silver_bucket}/breweries/date={date_param}"
+
+    # A new run starts without streamed rows; a restarted driver resumes
+    # from its checkpoint and keeps them
+    fs, checkpoint = get_filesystem(spark, checkpoint_path)
+    if not fs.exists(checkpoint):
+        delete_stream_partition(data_project_id, dataset_id, date_param)
+
+    wait_for_first_page(bronze_bucket, date_param)
+
+    logging.info(f"Streaming JSON pages from: {input_path}")
+
+    try:
+        stream_df = spark.readStream \
+            .option("multiline", "true") \
+            .option("pathGlobFilter", "*.json") \
+            .option("maxFilesPerTrigger", MAX_FILES_PER_TRIGGER) \
+            .schema(define_brewery_schema()) \
+            .json(input_path)
+
+        query = stream_df.writeStream \
+            .foreachBatch(lambda batch_df, batch_id: process_micro_batch(
+                batch_df, batch_id, staging_path)) \
+            .option("checkpointLocation", checkpoint_path) \
+            .trigger(processingTime=TRIGGER_INTERVAL) \
+            .start()
+
+        start_time = time.time()
+        while not is_extraction_complete(job_doc_ref):
+            if query.exception() is not None:
+                raise query.exception()
+            if time.time() - start_time > STREAM_TIMEOUT_SECONDS:
+                raise Exception(f"Extraction for {date_param} did not "
+                                f"complete in {STREAM_TIMEOUT_SECONDS}s")
+            time.sleep(COMPLETION_POLL_SECONDS)
+
+        # Every page is uploaded before it is marked completed, so the
+        # remaining files are already visible to the source
+        query.processAllAvailable()
+        query.stop()
+
+        # Final commit: one deduplicated, right-sized silver partition
+        logging.info(f"Extraction complete, committing silver to: "
+                     f"{output_path}")
+        df_final = spark.read.parquet(staging_path) \
+            .dropDuplicates(["id_brewery"])
+        final_count = df_final.count()
+        write_silver_parquet(df_final, output_path,
+                             path_size_bytes(spark, staging_path))
+
+    except Exception as e:
+        error_msg = f"Error streaming brewery data: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Successfully streamed {final_count} brewery records")
+    return final_count
+
+
+def main():
+    """
+    Brewery data streaming load script
+    """
+    try:
+        datetime.strptime(date_param, '%Y-%m-%d')
+    except ValueError:
+        error_msg = "Error: Date must be in YYYY-MM-DD format"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Streaming data for date: {date_param}")
+    logging.info(f"Bronze bucket: {bronze_bucket_arg}")
+    logging.info(f"Silver bucket: {silver_bucket_arg}")
+
+    # Size the session from the pages that already landed
+    input_bytes, input_files = measure_gcs_prefix(
+        bronze_bucket_arg, f"{date_param}/", suffix=".json")
+    spark_plan = plan_spark_config(input_bytes, input_files)
+
+    builder = SparkSession.builder \
+        .appName(f"Breweries Stream Load - {date_param}")
+    spark = apply_spark_config(builder, spark_plan,
+                               input_bytes, input_files) \
+        .getOrCreate()
+
+    record_count = stream_brewery_data(
+        spark, bronze_bucket_arg, silver_bucket_arg, date_param)
+
+    logging.info(
+        f"Brewery data streaming load completed for {date_param}")
+    logging.info(f"Total records processed: {record_count}")
+
+    spark.stop()
+    return 'OK'
+
+
+if __name__ == "__main__":
+    main()
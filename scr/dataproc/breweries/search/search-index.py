@@ -0,0 +1,97 @@
+import sys
+import logging
+import tempfile
+from pyspark.sql import SparkSession
+from datetime import datetime
+from run_ledger import RunLedger
+from silver_writer import bucket_path, get_filesystem
+from search_index import (build_search_index, SearchIndex,
+                          DOCUMENT_FIELDS)
+from stage_profiler import write_stage_profile
+
+date_param = sys.argv[1]
+silver_bucket_arg = sys.argv[2]
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+SEARCH_STEP = "search-index"
+
+
+def search_index_path(silver_bucket, date):
+    """
+    Path of the search artifact built from a silver date
+    """
+    return bucket_path(silver_bucket, f"search/date={date}/breweries.idx")
+
+
+def build_date_index(spark, silver_bucket, date):
+    """
+    Build the name search artifact of a silver date on the driver and
+    upload it next to the silver data; returns (documents, bytes)
+    """
+    input_path = bucket_path(silver_bucket, f"breweries/date={date}")
+    output_path = search_index_path(silver_bucket, date)
+
+    try:
+        # Only the result columns reach the driver, streamed by partition
+        rows = spark.read.parquet(input_path) \
+            .select(*DOCUMENT_FIELDS) \
+            .toLocalIterator()
+        artifact = build_search_index(row.asDict() for row in rows)
+
+        with tempfile.NamedTemporaryFile(suffix=".idx") as local_file:
+            local_file.write(artifact)
+            local_file.flush()
+            fs, target = get_filesystem(spark, output_path)
+            _, source = get_filesystem(spark, f"file://{local_file.name}")
+            fs.copyFromLocalFile(False, True, source, target)
+
+    except Exception as e:
+        error_msg = f"Error building search index for {date}: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    documents = SearchIndex(artifact).num_docs
+    logging.info(f"Search index for {date}: {documents} breweries, "
+                 f"{len(artifact)} bytes written to {output_path}")
+    return documents, len(artifact)
+
+
+def main():
+    """
+    Brewery name search index script
+    """
+    try:
+        datetime.strptime(date_param, '%Y-%m-%d')
+    except ValueError:
+        error_msg = "Error: Date must be in YYYY-MM-DD format"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Building search index for date: {date_param}")
+    logging.info(f"Silver bucket: {silver_bucket_arg}")
+
+    spark = SparkSession.builder \
+        .appName(f"Breweries Search Index - {date_param}") \
+        .getOrCreate()
+
+    ledger = RunLedger.from_spark_conf(spark, date_param, SEARCH_STEP)
+
+    with ledger.stage("search_index") as stage_metrics:
+        documents, artifact_bytes = build_date_index(
+            spark, silver_bucket_arg, date_param)
+        stage_metrics["records"] = documents
+        stage_metrics["bytes_processed"] = artifact_bytes
+
+    write_stage_profile(spark, SEARCH_STEP, date_param)
+
+    spark.stop()
+    return 'OK'
+
+
+if __name__ == "__main__":
+    main()
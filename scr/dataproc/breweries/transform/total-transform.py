@@ -1,11 +1,14 @@
 import sys
 import logging
 from pyspark.sql import SparkSession
-from pyspark.sql.functions import (
-    col, when, concat_ws, to_date, year, month, dayofmonth
-)
-from datetime import datetime
-from google.cloud import bigquery
+from datetime import datetime, timezone
+from brewery_transform import transform_brewery_data
+from pipeline_steps import transform_step_fingerprint, TRANSFORM_STEP
+from step_fingerprint import is_step_current, record_step_success
+from run_ledger import RunLedger, STATUS_SKIPPED
+from stage_profiler import write_stage_profile
+from spark_tuning import (measure_gcs_prefix, plan_spark_config,
+                          apply_spark_config)
 
 date_param = sys.argv[1]
 silver_bucket_arg = sys.argv[2]
@@ -21,147 +24,8 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-
-def clean_brewery_data(df):
-    """
-    Apply data cleaning and transformations to brewery data
-    """
-    logging.info("Starting data cleaning transformations")
-    
-    # Create full address field
-    df = df \
-        .withColumn("full_address",
-                    concat_ws(", ",
-                              col("address_line_1"),
-                              col("address_line_2"),
-                              col("address_line_3"),
-                              col("name_city"),
-                              col("name_state"),
-                              col("value_postal_code")))
-    
-    # Add date components for partitioning
-    df = df \
-        .withColumn("source_date",
-                    to_date(col("source_date"), "yyyy-MM-dd")) \
-        .withColumn("year", year(col("source_date"))) \
-        .withColumn("month", month(col("source_date"))) \
-        .withColumn("day", dayofmonth(col("source_date")))
-    
-    # Add has_coordinates flag
-    df = df \
-        .withColumn("has_coordinates",
-                    when((col("latitude").isNotNull()) &
-                         (col("longitude").isNotNull()), True)
-                    .otherwise(False))
-    
-    # Add has_contact_info flag
-    df = df \
-        .withColumn("has_contact_info",
-                    when((col("phone").isNotNull()) |
-                         (col("url_website").isNotNull()), True)
-                    .otherwise(False))
-    
-    logging.info("Data cleaning transformations completed")
-    return df
-
-
-def delete_partition(data_project_id, dataset_id, table_name, source_date):
-    """
-    Delete existing partition data for the given date
-    """
-    try:
-        client = bigquery.Client(project=data_project_id)
-        
-        delete_query = f"""
-        DELETE FROM `{data_project_id}.{dataset_id}.{table_name}`
-        WHERE DATE(source_date) = '{source_date}'
-        """
-        
-        logging.info(f"Executing partition deletion for date: {source_date}")
-        job = client.query(delete_query)
-        job.result()  # Wait for the job to complete
-        
-        logging.info(f"Successfully deleted partition data for {source_date}")
-        
-    except Exception as e:
-        error_msg = f"Could not delete partition data: {str(e)}"
-        logging.warning(error_msg)
-        raise Exception(error_msg)
-
-
-def load_to_bigquery(df, data_project_id, dataset_id, table_name, source_date):
-    """
-    Load DataFrame to BigQuery table
-    """
-    logging.info(f"Loading data to BigQuery: "
-                 f"{data_project_id}.{dataset_id}.{table_name}")
-    
-    # Delete existing partition data before loading new data
-    delete_partition(data_project_id, dataset_id, table_name, source_date)
-    
-    try:
-        # Configure BigQuery options for optimized loading
-        df.write \
-            .format("bigquery") \
-            .option("table", f"{data_project_id}.{dataset_id}.{table_name}") \
-            .option("writeMethod", "indirect") \
-            .option("temporaryGcsBucket", temp_bucket) \
-            .option("partitionField", "source_date") \
-            .option("partitionType", "DAY") \
-            .option("clusteredFields", "name_state,type_brewery") \
-            .option("createDisposition", "CREATE_NEVER") \
-            .mode("append") \
-            .save()
-    except Exception as e:
-        error_msg = f"Error loading data to BigQuery: {str(e)}"
-        logging.error(error_msg)
-        raise Exception(error_msg)
-    
-    logging.info("Data successfully loaded to BigQuery table")
-
-
-def transform_brewery_data(spark, silver_bucket,
-                           dataset_id, data_project_id, date_param):
-    """
-    Main transformation function
-    """
-    # Define input path for silver bucket data
-    input_path = f"gs://{silver_bucket}/breweries/date={date_param}"
-    
-    logging.info(f"Reading Parquet files from: {input_path}")
-    
-    try:
-        # Read data from silver bucket
-        df = spark.read.parquet(input_path)
-        
-        logging.info(f"Initial record count: {df.count()}")
-        
-        # Apply data cleaning and transformations
-        df_transformed = clean_brewery_data(df)
-        
-        # Data quality validation
-        final_count = df_transformed.count()
-        logging.info(f"Final record count after transformations: "
-                     f"{final_count}")
-        
-        # Check for required fields
-        null_brewery_ids = df_transformed.filter(
-            col("id_brewery").isNull()).count()
-        if null_brewery_ids > 0:
-            logging.warning(f"Found {null_brewery_ids} records with "
-                            f"null brewery IDs")
-        
-    except Exception as e:
-        error_msg = f"Error during transformation: {str(e)}"
-        logging.error(error_msg)
-        raise Exception(error_msg)
-            
-    # Load to BigQuery
-    load_to_bigquery(df_transformed, data_project_id, dataset_id,
-                     "breweries_all_data", date_param)
-    
-    logging.info("Transformation process completed successfully")
-    return final_count
+# Approximate in-memory expansion of snappy Parquet input
+PARQUET_EXPANSION = 4.0
 
 
 def main():
@@ -183,22 +47,60 @@ def main():
     logging.info(f"Temporary bucket: {temp_bucket}")
     logging.info(f"Data Project ID: {data_project_id}")
 
+    started_at = datetime.now(timezone.utc)
+
+    # Skip the step when silver, code and schema are unchanged since the
+    # last successful run (a default session is only started to read the
+    # run ledger job properties)
+    fingerprint, components = transform_step_fingerprint(
+        silver_bucket_arg, date_param)
+    if is_step_current(silver_bucket_arg, TRANSFORM_STEP, date_param,
+                       fingerprint):
+        logging.info(f"Input unchanged since the last successful transform "
+                     f"({fingerprint[:12]}), skipping")
+        spark = SparkSession.builder \
+            .appName(f"Breweries Transform - {date_param}") \
+            .getOrCreate()
+        RunLedger.from_spark_conf(spark, date_param, TRANSFORM_STEP) \
+            .record("transform", started_at, datetime.now(timezone.utc),
+                    status=STATUS_SKIPPED)
+        spark.stop()
+        return
+
+    # Size the Spark configuration from the silver input
+    input_bytes, input_files = measure_gcs_prefix(
+        silver_bucket_arg, f"breweries/date={date_param}/",
+        suffix=".parquet")
+    spark_plan = plan_spark_config(input_bytes, input_files,
+                                   expansion=PARQUET_EXPANSION)
+
     # Initialize Spark Session
-    spark = SparkSession.builder \
-        .appName(f"Breweries Transform - {date_param}") \
+    startup_at = datetime.now(timezone.utc)
+    builder = SparkSession.builder \
+        .appName(f"Breweries Transform - {date_param}")
+    spark = apply_spark_config(builder, spark_plan,
+                               input_bytes, input_files) \
         .getOrCreate()
 
+    ledger = RunLedger.from_spark_conf(spark, date_param, TRANSFORM_STEP)
+    ledger.record("spark_startup", startup_at, datetime.now(timezone.utc))
+
     logging.info("Starting brewery data transformation process")
     
     # Execute transformation
     record_count = transform_brewery_data(
         spark, silver_bucket_arg, dataset_id,
-        data_project_id, date_param
+        data_project_id, date_param, temp_bucket, ledger
     )
     
     logging.info(f"Transformation completed successfully. "
                  f"Records processed: {record_count}")
 
+    record_step_success(silver_bucket_arg, TRANSFORM_STEP, date_param,
+                        fingerprint, components, records=record_count)
+
+    write_stage_profile(spark, TRANSFORM_STEP, date_param)
+
     spark.stop()
 
 
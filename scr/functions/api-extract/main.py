@@ -3,20 +3,69 @@ import json
 import math
 import base64
 import os
+import io
+import re
+import uuid
+import hashlib
 import logging
 from google.cloud import pubsub_v1
 from google.cloud import storage
 from google.cloud import firestore
-from datetime import datetime
+from datetime import datetime, timezone
+from ledger import record_ledger_stage
+from tracing import (configure_tracing, context_from_attributes,
+                     trace_attributes, span)
 
 
 breweries_per_page = 200
 VALID_EXTRACT_TYPES = ['all', 'by_type', 'by_state']
 
 # Environment variables
+BREWERY_API_URL = os.environ.get(
+    'BREWERY_API_URL', 'https://api.openbrewerydb.org/v1')
 PUBSUB_TOPIC = os.environ.get('PUBSUB_TOPIC')
 GCS_BUCKET_BRONZE = os.environ.get('GCS_BUCKET_BRONZE')
 TRIGGER_DATAPROC_TOPIC = os.environ.get('TRIGGER_DATAPROC_TOPIC')
+# Start the streaming load at fan-out instead of after the last page
+STREAMING_LOAD = os.environ.get('STREAMING_LOAD', 'false').lower() == 'true'
+# Write a typed Parquet fragment next to each bronze JSON page
+WRITE_PARQUET_FRAGMENTS = os.environ.get(
+    'WRITE_PARQUET_FRAGMENTS', 'false').lower() == 'true'
+
+# Run ledger and span component of this function
+COMPONENT = 'api-extract'
+
+# Bronze JSON field -> (silver column, type), same as the total-load schema
+SILVER_COLUMNS = [
+    ("id", "id_brewery", "string"),
+    ("name", "name_brewery", "string"),
+    ("brewery_type", "type_brewery", "string"),
+    ("address_1", "address_line_1", "string"),
+    ("address_2", "address_line_2", "string"),
+    ("address_3", "address_line_3", "string"),
+    ("city", "name_city", "string"),
+    ("state_province", "name_state_province", "string"),
+    ("postal_code", "value_postal_code", "string"),
+    ("country", "name_country", "string"),
+    ("longitude", "longitude", "double"),
+    ("latitude", "latitude", "double"),
+    ("phone", "phone", "string"),
+    ("website_url", "url_website", "string"),
+    ("state", "name_state", "string"),
+    ("street", "name_street", "string")
+]
+
+# JSON types accepted for each schema type (null is always accepted);
+# total-load cannot parse a JSON string into a double column
+EXPECTED_JSON_TYPES = {
+    "string": {"string"},
+    "double": {"number"},
+    "boolean": {"boolean"}
+}
+# Firestore document with the fields added after the fixed schema; read
+# by total-load to add them as nullable silver columns
+SCHEMA_REGISTRY_COLLECTION = 'schema_registry'
+SCHEMA_REGISTRY_DOCUMENT = 'breweries'
 
 # Initialize clients
 publisher = pubsub_v1.PublisherClient()
@@ -24,6 +73,24 @@ storage_client = storage.Client()
 firestore_client = firestore.Client()
 
 logging.getLogger().setLevel(logging.INFO)
+configure_tracing(COMPONENT)
+
+# Registered fields (field -> registry entry), loaded once per instance
+registered_fields = None
+
+def queue_delay_seconds(context) -> float:
+    """Seconds between the Pub/Sub publish time and this invocation"""
+    try:
+        timestamp = context.timestamp.replace('Z', '+00:00')
+        # fromisoformat only accepts up to microseconds
+        if '.' in timestamp:
+            seconds, fraction = timestamp.split('.', 1)
+            timestamp = f"{seconds}.{fraction[:6].ljust(6, '0')}+00:00"
+        published_at = datetime.fromisoformat(timestamp)
+        return (datetime.now(timezone.utc) - published_at).total_seconds()
+    except Exception:
+        return None
+
 
 def main(event, context):
     """
@@ -32,6 +99,8 @@ def main(event, context):
     """
     
     error_msg = None
+    # run_id and W3C trace context travel as message attributes
+    attributes = event.get('attributes') or {}
 
     if 'data' in event:
         try:
@@ -39,6 +108,8 @@ def main(event, context):
             message_data = json.loads(message)
             extract_type = message_data.get('type', '')
             extract_page = message_data.get('extract_page', None)
+            run_id = (message_data.get('run_id')
+                      or attributes.get('run_id'))
 
         except json.JSONDecodeError as e:
             error_msg = (f"Error decoding JSON message: {message}. "
@@ -67,7 +138,12 @@ def main(event, context):
     logging.info(f"Requested extraction type: {extract_type}")
     # Process based on extract type
     if extract_type == 'all':
-        extract_all_breweries(extract_page)
+        queue_delay = queue_delay_seconds(context)
+        with span('extract_page' if extract_page else 'extraction_fanout',
+                  parent=context_from_attributes(attributes),
+                  run_id=run_id, page=extract_page,
+                  queue_delay_seconds=queue_delay):
+            extract_all_breweries(extract_page, run_id, queue_delay)
     elif extract_type == 'by_type':
         pass
     elif extract_type == 'by_state':
@@ -76,16 +152,188 @@ def main(event, context):
     return 'OK'
 
 
-def extract_all_breweries(extract_page: int = None):
+def json_type(value) -> str:
+    """JSON type name of a decoded value"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'boolean'
+    if isinstance(value, (int, float)):
+        return 'number'
+    if isinstance(value, str):
+        return 'string'
+    return 'array' if isinstance(value, list) else 'object'
+
+
+def page_schema(breweries: list) -> dict:
+    """Field -> sorted JSON types seen in a page"""
+    types = {}
+    for brewery in breweries:
+        if isinstance(brewery, dict):
+            for field, value in brewery.items():
+                types.setdefault(field, set()).add(json_type(value))
+    return {field: sorted(seen) for field, seen in types.items()}
+
+
+def schema_fingerprint(schema: dict) -> str:
+    """Short hash of a page key set and types"""
+    return hashlib.sha256(json.dumps(schema, sort_keys=True)
+                          .encode('utf-8')).hexdigest()[:16]
+
+
+def load_registered_fields() -> dict:
+    """Fields already in the schema registry (cached per instance)"""
+    global registered_fields
+    if registered_fields is None:
+        snapshot = firestore_client.collection(
+            SCHEMA_REGISTRY_COLLECTION).document(
+                SCHEMA_REGISTRY_DOCUMENT).get()
+        registered_fields = ((snapshot.to_dict() or {}).get('fields', {})
+                             if snapshot.exists else {})
+    return registered_fields
+
+
+def detect_schema_drift(schema: dict) -> dict:
+    """
+    Fields of a page that are not in the schema (new), have unexpected
+    types (changed) or are absent (missing), with their JSON types
+    """
+    expected = {field: (value_type, EXPECTED_JSON_TYPES[value_type])
+                for field, _, value_type in SILVER_COLUMNS}
+    for field, entry in load_registered_fields().items():
+        # Registered fields also accept the types they were registered with
+        expected[field] = (entry['type'],
+                           EXPECTED_JSON_TYPES.get(entry['type'], set())
+                           | set(entry.get('json_types', [])))
+
+    drift = {}
+    for field, types in schema.items():
+        if field not in expected:
+            drift[field] = {'kind': 'new', 'types': types}
+        elif set(types) - {'null'} - expected[field][1]:
+            drift[field] = {'kind': 'changed', 'types': types,
+                            'expected': expected[field][0]}
+    if schema:
+        for field, _, _ in SILVER_COLUMNS:
+            if field not in schema:
+                drift[field] = {'kind': 'missing', 'types': []}
+    return drift
+
+
+def registry_column(field: str) -> str:
+    """Silver column name of a new field"""
+    column = re.sub(r'[^0-9a-z_]', '_', field.lower())
+    if column in {name for _, name, _ in SILVER_COLUMNS}:
+        column = f"api_{column}"
+    return column
+
+
+def registry_type(json_types) -> str:
+    """Registry type of a field from the JSON types of its values"""
+    types = set(json_types) - {'null'}
+    if types == {'number'}:
+        return 'double'
+    if types == {'boolean'}:
+        return 'boolean'
+    # Mixed types, objects and arrays are kept as their JSON text
+    return 'string'
+
+
+def widen_registry_entry(entry: dict, json_types, date: str,
+                         run_id: str) -> dict:
+    """
+    Registry entry of a field whose values arrived with another type:
+    a typed field moves to a new string column (the previous column
+    keeps its type in silver and BigQuery), a string field only accepts
+    the new JSON types
+    """
+    json_types = sorted(set(entry.get('json_types', [])) | set(json_types))
+    if entry['type'] == 'string':
+        return dict(entry, json_types=json_types)
+    return dict(entry, column=f"{entry['column']}_text", type='string',
+                json_types=json_types, widened_from=entry['type'],
+                widened_on=date, widened_run_id=run_id)
+
+
+@firestore.transactional
+def add_registry_fields(transaction, registry_ref, entries, changed,
+                        date, run_id):
+    """
+    Add the fields not registered yet and widen the registered fields
+    with changed types; returns every registered field
+    """
+    snapshot = registry_ref.get(transaction=transaction)
+    fields = (snapshot.to_dict() or {}).get('fields', {}) \
+        if snapshot.exists else {}
+    updated = {field: entry for field, entry in entries.items()
+               if field not in fields}
+    # Widened from the stored entry, so concurrent pages widen once
+    for field, json_types in changed.items():
+        if field in fields:
+            entry = widen_registry_entry(fields[field], json_types, date,
+                                         run_id)
+            if entry != fields[field]:
+                updated[field] = entry
+    if updated:
+        fields.update(updated)
+        transaction.set(registry_ref, {'fields': fields,
+                                       'updated_at': datetime.now()},
+                        merge=True)
+    return fields
+
+
+def register_new_fields(drift: dict, date: str, run_id: str):
+    """
+    Add the new fields of a page to the schema registry and widen the
+    registered fields whose values changed type, so total-load never
+    reads them as corrupt records
+    """
+    registered = load_registered_fields()
+    entries, changed = {}, {}
+    for field, details in drift.items():
+        if details['kind'] == 'new':
+            entries[field] = {
+                'column': registry_column(field),
+                'type': registry_type(details['types']),
+                'json_types': details['types'],
+                'first_seen': date,
+                'first_run_id': run_id
+            }
+        elif details['kind'] == 'changed' and field in registered:
+            changed[field] = details['types']
+    if not entries and not changed:
+        return
+
+    global registered_fields
+    registry_ref = firestore_client.collection(
+        SCHEMA_REGISTRY_COLLECTION).document(SCHEMA_REGISTRY_DOCUMENT)
+    registered_fields = add_registry_fields(
+        firestore_client.transaction(), registry_ref, entries, changed,
+        date, run_id)
+    if entries:
+        logging.warning(f"Schema drift: registered new fields "
+                        f"{sorted(entries)}")
+    if changed:
+        logging.warning(f"Schema drift: widened registered fields "
+                        f"{sorted(changed)}")
+
+
+def extract_all_breweries(extract_page: int = None, run_id: str = None,
+                          queue_delay: float = None):
     """Extract all breweries from the API"""
     
     date = datetime.now().strftime("%Y-%m-%d")
+    started_at = datetime.now(timezone.utc)
     error_msg = None
+    # Pages from older fan-out messages fall back to the date as run id
+    run_id = run_id or date
 
     if extract_page is None:
+        # New run: every page, trigger and Dataproc job carries this id
+        run_id = f"{date}-{uuid.uuid4().hex[:8]}"
         # Extract metadata from the Open Brewery DB API
         try:
-            meta_url = "https://api.openbrewerydb.org/v1/breweries/meta"
+            meta_url = f"{BREWERY_API_URL}/breweries/meta"
             meta_response = requests.get(meta_url)
             
             if meta_response.status_code == 200:
@@ -109,22 +357,30 @@ def extract_all_breweries(extract_page: int = None):
             logging.error(error_msg)
             raise Exception(error_msg)
         
-        initialize_extraction_job(date, total_extract_pages)
+        initialize_extraction_job(date, total_extract_pages, run_id)
+
+        if STREAMING_LOAD:
+            trigger_dataproc(mode='streaming', run_id=run_id)
         
         try:
 
             # Publish messages to Pub/Sub for each page
-            for page in range(1, total_extract_pages + 1):
-                message_data = {
-                    "type": "all",
-                    "extract_page": page
-                }
-                message_json = json.dumps(message_data)
-                message_bytes = message_json.encode('utf-8')
-                
-                future = publisher.publish(PUBSUB_TOPIC, message_bytes)
-                logging.info(f"Published message for page {page}: "
-                        f"{future.result()}")
+            with span('publish_pages', run_id=run_id,
+                      pages=total_extract_pages):
+                for page in range(1, total_extract_pages + 1):
+                    message_data = {
+                        "type": "all",
+                        "extract_page": page,
+                        "run_id": run_id
+                    }
+                    message_json = json.dumps(message_data)
+                    message_bytes = message_json.encode('utf-8')
+
+                    future = publisher.publish(
+                        PUBSUB_TOPIC, message_bytes, run_id=run_id,
+                        **trace_attributes())
+                    logging.info(f"Published message for page {page}: "
+                            f"{future.result()}")
         
         except Exception as e:
             error_msg = (
@@ -132,6 +388,10 @@ def extract_all_breweries(extract_page: int = None):
             )
             logging.error(error_msg)
             raise Exception(error_msg)
+
+        record_ledger_stage(COMPONENT, run_id, date, 'extraction_fanout',
+                            started_at, records=total_extract_pages,
+                            details={'total_breweries': total_breweries})
         
         return 'OK'
     
@@ -139,10 +399,14 @@ def extract_all_breweries(extract_page: int = None):
 
         error_msg = None
         try:
-            api_url = (f"https://api.openbrewerydb.org/v1/breweries?"
+            api_url = (f"{BREWERY_API_URL}/breweries?"
                        f"page={extract_page}&per_page={breweries_per_page}")
             
-            response = requests.get(api_url)
+            with span('fetch', page=extract_page) as fetch_span:
+                response = requests.get(api_url)
+                if fetch_span is not None:
+                    fetch_span.set_attribute('http.status_code',
+                                             response.status_code)
 
             if response.status_code == 200:
                 breweries = response.json()
@@ -154,8 +418,11 @@ def extract_all_breweries(extract_page: int = None):
                 raise Exception(error_msg)
               
         except Exception as e:
+            record_ledger_stage(COMPONENT, run_id, date, 'page_fetch',
+                                started_at, status='failed',
+                                details={'page': extract_page})
             log_page_save_and_check_completion(
-                    extract_page, date, 'failed')
+                    extract_page, date, 'failed', run_id=run_id)
             
             if error_msg:
                 raise
@@ -166,38 +433,125 @@ def extract_all_breweries(extract_page: int = None):
             logging.error(error_msg)
             raise Exception(error_msg)
         
-        save_to_gcs(breweries, extract_page, date)
+        # Key set and types of the page, compared with the known schema
+        schema = page_schema(breweries)
+        page_fingerprint = schema_fingerprint(schema)
+        try:
+            drift = detect_schema_drift(schema)
+            register_new_fields(drift, date, run_id)
+        except Exception as e:
+            drift = {}
+            logging.warning(f"Could not check schema drift: {str(e)}")
+
+        with span('upload', page=extract_page,
+                  records=len(breweries)) as upload_span:
+            page_bytes = save_to_gcs(breweries, extract_page, date)
+
+            if WRITE_PARQUET_FRAGMENTS:
+                save_parquet_fragment(breweries, extract_page, date)
+
+            if upload_span is not None:
+                upload_span.set_attribute('bytes', page_bytes)
+
+        record_ledger_stage(COMPONENT, run_id, date, 'page_fetch',
+                            started_at, records=len(breweries),
+                            bytes_processed=page_bytes,
+                            details={'page': extract_page,
+                                     'queue_delay_seconds': queue_delay})
             
         # Log successful completion
         log_page_save_and_check_completion(
-            extract_page, date, 'completed')
+            extract_page, date, 'completed', page_bytes, run_id,
+            page_fingerprint, drift)
         
         return 'OK'
 
-def save_to_gcs(data: str, page_number: int, date: str):
-    """Save data to Google Cloud Storage"""
+def save_to_gcs(data: str, page_number: int, date: str) -> int:
+    """Save data to Google Cloud Storage and return the size in bytes"""
     try:
         bucket = storage_client.bucket(GCS_BUCKET_BRONZE)
         
         filename = f"{date}/page_{page_number}.json"
         
         # Create blob and upload
+        content = json.dumps(data, indent=2, ensure_ascii=False)
         blob = bucket.blob(filename)
         blob.upload_from_string(
-            json.dumps(data, indent=2, ensure_ascii=False),
+            content,
             content_type='application/json'
         )
         
         logging.info(f"Data saved to gs://{GCS_BUCKET_BRONZE}/{filename}")
+        return len(content.encode('utf-8'))
             
     except Exception as e:
         error_msg = f"Error saving to GCS: {str(e)}"
         logging.error(error_msg)
         raise Exception(error_msg)
 
+def _coerce_value(value, value_type: str):
+    """Coerce a JSON value to the fragment column type (None if invalid)"""
+    if value is None:
+        return None
+    if value_type == "double":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if value_type == "boolean":
+        return value if isinstance(value, bool) else None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def save_parquet_fragment(data: list, page_number: int, date: str):
+    """Save a page as a typed Parquet fragment with silver column names"""
+    # Imported here so deployments without fragments skip the pyarrow load
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {"double": pa.float64(), "boolean": pa.bool_()}
+    # Registered fields are written too, so total-load keeps reading
+    # fragments after a drift
+    fragment_columns = SILVER_COLUMNS + [
+        (field, entry['column'], entry['type'])
+        for field, entry in sorted((registered_fields or {}).items())]
+
+    try:
+        schema = pa.schema([
+            pa.field(column, arrow_types.get(value_type, pa.string()))
+            for _, column, value_type in fragment_columns
+        ])
+        columns = {
+            column: [_coerce_value(record.get(field), value_type)
+                     for record in data]
+            for field, column, value_type in fragment_columns
+        }
+        table = pa.Table.from_pydict(columns, schema=schema)
+
+        buffer = io.BytesIO()
+        pq.write_table(table, buffer, compression='snappy')
+
+        filename = f"{date}/page_{page_number}.parquet"
+        blob = storage_client.bucket(GCS_BUCKET_BRONZE).blob(filename)
+        blob.upload_from_string(
+            buffer.getvalue(),
+            content_type='application/octet-stream'
+        )
+
+        logging.info(f"Parquet fragment saved to "
+                     f"gs://{GCS_BUCKET_BRONZE}/{filename}")
+
+    except Exception as e:
+        error_msg = f"Error saving Parquet fragment to GCS: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
 # Use transaction to ensure atomicity
 @firestore.transactional
-def update_and_check(transaction, job_doc_ref, page_number, status, date):
+def update_and_check(transaction, job_doc_ref, page_number, status, date,
+                     page_bytes=0, page_fingerprint=None, drift=None):
     try:
         # Get the current job document
         job_doc = job_doc_ref.get(transaction=transaction)
@@ -217,17 +571,22 @@ def update_and_check(transaction, job_doc_ref, page_number, status, date):
 
         # Add current page to completed pages if not already there
         page_key = str(page_number)
+        drift_update = merge_schema_drift(
+            job_data.get('schema_drift', {}), page_number, drift)
         if page_key not in completed_pages:
             completed_pages[page_key] = {
                 'page_number': page_number,
                 'processed_at': datetime.now().isoformat(),
-                'status': status
+                'status': status,
+                'bytes': page_bytes,
+                'schema_fingerprint': page_fingerprint
             }
 
             # Update the document
             transaction.update(job_doc_ref, {
                 'completed_pages': completed_pages,
-                'last_update': datetime.now()
+                'last_update': datetime.now(),
+                **drift_update
             })
 
             logging.info(
@@ -238,13 +597,17 @@ def update_and_check(transaction, job_doc_ref, page_number, status, date):
         elif completed_pages[page_key]['status'] != status:
             # Update status if it has changed
             completed_pages[page_key]['status'] = status
+            completed_pages[page_key]['bytes'] = page_bytes
+            completed_pages[page_key]['schema_fingerprint'] = \
+                page_fingerprint
             completed_pages[page_key]['last_updated'] = (
                 datetime.now().isoformat()
             )
 
             transaction.update(job_doc_ref, {
                 'completed_pages': completed_pages,
-                'last_update': datetime.now()
+                'last_update': datetime.now(),
+                **drift_update
             })
 
             logging.info(f"Page {page_number} status updated to '{status}'")
@@ -275,8 +638,37 @@ def update_and_check(transaction, job_doc_ref, page_number, status, date):
         logging.error(error_msg)
         raise Exception(error_msg)
 
-def log_page_save_and_check_completion(page_number: int, date: str, status='completed'):
+def merge_schema_drift(schema_drift: dict, page_number: int,
+                       drift: dict) -> dict:
+    """
+    Job document update adding a page's drift to the date's schema_drift
+    (field -> kind, JSON types seen, first page, pages); empty when the
+    page has no drift
+    """
+    if not drift:
+        return {}
+
+    for field, details in drift.items():
+        entry = schema_drift.setdefault(field, {
+            'kind': details['kind'],
+            'types': [],
+            'expected': details.get('expected'),
+            'first_page': page_number,
+            'pages': 0
+        })
+        entry['types'] = sorted(set(entry['types']) | set(details['types']))
+        entry['first_page'] = min(entry['first_page'], page_number)
+        entry['pages'] += 1
+    return {'schema_drift': schema_drift}
+
+
+def log_page_save_and_check_completion(page_number: int, date: str,
+                                       status='completed', page_bytes=0,
+                                       run_id: str = None,
+                                       page_fingerprint: str = None,
+                                       drift: dict = None):
     """Log page save to Firestore and check if all pages are completed"""
+    started_at = datetime.now(timezone.utc)
     try:
         # Reference to the extraction job document
         job_doc_ref = firestore_client.collection(
@@ -290,13 +682,26 @@ def log_page_save_and_check_completion(page_number: int, date: str, status='comp
         logging.error(error_msg)
         raise Exception(error_msg)
     
-    should_trigger_dataproc = update_and_check(transaction, job_doc_ref, page_number, status, date)
+    with span('firestore_transaction', page=page_number, status=status):
+        should_trigger_dataproc = update_and_check(
+            transaction, job_doc_ref, page_number, status, date, page_bytes,
+            page_fingerprint, drift)
+
+    record_ledger_stage(COMPONENT, run_id or date, date,
+                        'firestore_completion', started_at,
+                        details={'page': page_number,
+                                 'last_page': should_trigger_dataproc})
 
     if should_trigger_dataproc:
-        trigger_dataproc()
+        if STREAMING_LOAD:
+            logging.info("All pages completed. Streaming load will commit "
+                         "the final batch")
+        else:
+            trigger_dataproc(run_id=run_id)
 
 
-def initialize_extraction_job(date: str, total_pages: int):
+def initialize_extraction_job(date: str, total_pages: int,
+                              run_id: str = None):
     """Initialize the extraction job document in Firestore"""
     try:
         job_doc_ref = firestore_client.collection(
@@ -305,6 +710,8 @@ def initialize_extraction_job(date: str, total_pages: int):
         # Always create/overwrite the document for reprocessing
         job_data = {
             'date': date,
+            'run_id': run_id or date,
+            'trace_context': trace_attributes(),
             'total_pages': total_pages,
             'completed_pages': {},  # Clean dict for reprocessing
             'dataproc_triggered': False,
@@ -322,25 +729,39 @@ def initialize_extraction_job(date: str, total_pages: int):
         raise Exception(error_msg)
 
 
-def trigger_dataproc():
+def trigger_dataproc(mode: str = 'batch', run_id: str = None):
     """Trigger Dataproc workflow via Pub/Sub"""
-    logging.info("Triggering Dataproc job...")
+    logging.info(f"Triggering Dataproc job ({mode})...")
+    started_at = datetime.now(timezone.utc)
     
     try:
         date = datetime.now().strftime("%Y-%m-%d")
+        run_id = run_id or date
         
+        load_step = 'stream-load' if mode == 'streaming' else 'total-load'
+
         # Prepare message for trigger-dataproc function
         message_data = {
-            "steps": ["total-load", "total-transform"],
-            "date": date
+            "steps": [load_step, "total-transform", "search-index",
+                      "bulk-export"],
+            "date": date,
+            "mode": mode,
+            "run_id": run_id
         }
         
         message_json = json.dumps(message_data)
         message_bytes = message_json.encode('utf-8')
         
         # Publish message to trigger-dataproc topic
-        future = publisher.publish(TRIGGER_DATAPROC_TOPIC, message_bytes)
-        logging.info(f"Dataproc trigger message published: {future.result()}")
+        with span('publish_trigger', run_id=run_id, mode=mode):
+            future = publisher.publish(
+                TRIGGER_DATAPROC_TOPIC, message_bytes, run_id=run_id,
+                **trace_attributes())
+            logging.info(
+                f"Dataproc trigger message published: {future.result()}")
+
+        record_ledger_stage(COMPONENT, run_id, date, 'trigger_publish',
+                            started_at, details={'mode': mode})
             
     except Exception as e:
         error_msg = f"Error triggering Dataproc: {str(e)}"
@@ -0,0 +1,158 @@
+import json
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Silver columns served by the lookup (processing metadata is dropped)
+LOOKUP_COLUMNS = [
+    "id_brewery", "name_brewery", "type_brewery", "address_line_1",
+    "address_line_2", "address_line_3", "name_city", "name_state_province",
+    "value_postal_code", "name_country", "longitude", "latitude", "phone",
+    "url_website", "name_state", "name_street"
+]
+# Query parameter -> column with a sorted index
+SORTED_INDEXES = {
+    "state": "name_state",
+    "city": "name_city",
+    "type": "type_brewery"
+}
+
+
+def normalize_key(value):
+    """Case- and whitespace-insensitive index key."""
+    return " ".join(str(value).split()).casefold()
+
+
+class SortedIndex:
+    """
+    Row positions sorted by (normalized value, id) with the position
+    range of each distinct value, so a lookup is one dict access and a
+    slice
+    """
+
+    def __init__(self, column, ids):
+        encoded = pc.dictionary_encode(column).combine_chunks()
+        normalized = [normalize_key(value)
+                      for value in encoded.dictionary.to_pylist()]
+        keys = sorted(set(normalized))
+        rank = {key: position for position, key in enumerate(keys)}
+
+        # Rank of each row's value in key order (null rows sort last)
+        ranks = pc.take(pa.array([rank[key] for key in normalized],
+                                 type=pa.int32()),
+                        encoded.indices)
+        order = pc.sort_indices(
+            pa.table({"rank": pc.fill_null(ranks, len(keys)), "id": ids}),
+            sort_keys=[("rank", "ascending"), ("id", "ascending")])
+        self.positions = order[:len(ranks) - ranks.null_count] \
+            .cast(pa.int32())
+
+        counts = {entry["values"].as_py(): entry["counts"].as_py()
+                  for entry in pc.value_counts(ranks)
+                  if entry["values"].is_valid}
+        self.ranges = {}
+        start = 0
+        for position, key in enumerate(keys):
+            end = start + counts.get(position, 0)
+            self.ranges[key] = (start, end)
+            start = end
+
+    def lookup(self, value):
+        """Positions of the rows whose value equals value."""
+        start, end = self.ranges.get(normalize_key(value), (0, 0))
+        return self.positions[start:end]
+
+
+class BreweryIndex:
+    """
+    Read-only in-memory snapshot of a silver partition: one Arrow column
+    of pre-serialized JSON rows, a hash index on id_brewery and sorted
+    indexes on state/city/type.
+    """
+
+    def __init__(self, table, snapshot):
+        columns = [name for name in LOOKUP_COLUMNS
+                   if name in table.column_names]
+        table = table.select(columns).combine_chunks()
+        ids = table.column("id_brewery")
+
+        self.snapshot = snapshot
+        # Responses are served as stored, without per-field conversion
+        self.documents = pa.array(
+            [json.dumps(row, ensure_ascii=False)
+             for row in table.to_pylist()],
+            type=pa.large_string())
+        self.by_id = {brewery_id: position for position, brewery_id
+                      in enumerate(ids.to_pylist())
+                      if brewery_id is not None}
+        self.sorted_indexes = {
+            param: SortedIndex(table.column(column), ids)
+            for param, column in SORTED_INDEXES.items()
+            if column in columns
+        }
+
+    @property
+    def num_rows(self):
+        return len(self.documents)
+
+    @property
+    def nbytes(self):
+        return self.documents.nbytes + sum(
+            index.positions.nbytes for index in self.sorted_indexes.values())
+
+    def rows_json(self, positions):
+        """JSON documents of the rows at the given positions."""
+        if len(positions) == 0:
+            return []
+        return self.documents.take(positions).to_pylist()
+
+    def rows(self, positions):
+        """Rows at the given positions as dicts."""
+        return [json.loads(document)
+                for document in self.rows_json(positions)]
+
+    def get_json(self, brewery_id):
+        """JSON document of a brewery by id, or None."""
+        position = self.by_id.get(brewery_id)
+        if position is None:
+            return None
+        return self.documents[position].as_py()
+
+    def get(self, brewery_id):
+        """Brewery by id as a dict, or None."""
+        document = self.get_json(brewery_id)
+        return None if document is None else json.loads(document)
+
+    def find_json(self, filters, limit=100, offset=0):
+        """
+        JSON documents of the breweries matching every filter (state,
+        city, type), in index order. Returns (total matches, page);
+        raises ValueError for a filter whose column is not in the snapshot.
+        """
+        missing = sorted(set(filters) - set(self.sorted_indexes))
+        if missing:
+            raise ValueError(f"no index for filter(s): {', '.join(missing)}")
+
+        matches = None
+        for param, value in sorted(
+                filters.items(),
+                key=lambda item: len(
+                    self.sorted_indexes[item[0]].lookup(item[1]))):
+            positions = self.sorted_indexes[param].lookup(value)
+            if matches is None:
+                matches = positions
+            else:
+                matches = pc.filter(
+                    matches, pc.is_in(matches, value_set=positions))
+            if len(matches) == 0:
+                break
+
+        if matches is None:
+            end = min(offset + limit, self.num_rows)
+            return self.num_rows, self.rows_json(
+                pa.array(range(offset, end), type=pa.int32()))
+        return len(matches), self.rows_json(matches[offset:offset + limit])
+
+    def find(self, filters, limit=100, offset=0):
+        """Same as find_json with the rows as dicts."""
+        total, documents = self.find_json(filters, limit, offset)
+        return total, [json.loads(document) for document in documents]
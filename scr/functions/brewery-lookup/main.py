@@ -0,0 +1,217 @@
+import io
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.cloud import storage
+from brewery_index import BreweryIndex, LOOKUP_COLUMNS, SORTED_INDEXES
+from search_index import SearchIndex
+
+
+# Environment variables
+GCS_BUCKET_SILVER = os.environ.get('GCS_BUCKET_SILVER')
+SILVER_PREFIX = os.environ.get('SILVER_PREFIX', 'breweries/')
+# Name search artifacts written by the search-index job
+SEARCH_PREFIX = os.environ.get('SEARCH_PREFIX', 'search/')
+# Seconds between checks for a newer silver partition
+RELOAD_CHECK_SECONDS = int(os.environ.get('RELOAD_CHECK_SECONDS', '60'))
+MAX_LIMIT = 1000
+
+# Initialize clients
+storage_client = storage.Client()
+
+# Index of the latest silver partition, shared by the requests of one
+# instance and swapped in one assignment when a new partition lands
+index = None
+# (date, generation, SearchIndex) of the newest search artifact loaded
+search = None
+last_check = 0.0
+reload_lock = threading.Lock()
+
+
+def latest_snapshot(bucket):
+    """
+    (date, generation) of the newest silver partition with a _SUCCESS
+    marker, or None
+    """
+    blobs = storage_client.list_blobs(bucket, prefix=SILVER_PREFIX,
+                                      delimiter='/')
+    list(blobs)  # prefixes are filled while iterating
+    dates = sorted((prefix[len(SILVER_PREFIX):].rstrip('/')
+                    for prefix in blobs.prefixes
+                    if prefix[len(SILVER_PREFIX):].startswith('date=')),
+                   reverse=True)
+
+    for date_dir in dates:
+        marker = storage_client.bucket(bucket).get_blob(
+            f"{SILVER_PREFIX}{date_dir}/_SUCCESS")
+        if marker is not None:
+            return date_dir[len('date='):], marker.generation
+    return None
+
+
+def load_snapshot(bucket, snapshot):
+    """Download the Parquet files of a silver partition into an index."""
+    date, generation = snapshot
+    started = time.time()
+    tables = []
+    for blob in storage_client.list_blobs(
+            bucket, prefix=f"{SILVER_PREFIX}date={date}/"):
+        if blob.name.endswith('.parquet'):
+            parquet_file = pq.ParquetFile(io.BytesIO(blob.download_as_bytes()))
+            columns = [name for name in LOOKUP_COLUMNS
+                       if name in parquet_file.schema_arrow.names]
+            tables.append(parquet_file.read(columns=columns))
+
+    if not tables:
+        raise Exception(f"No Parquet files found for silver date {date}")
+
+    new_index = BreweryIndex(pa.concat_tables(tables), snapshot)
+    logging.info(f"Loaded silver {date} (generation {generation}): "
+                 f"{new_index.num_rows} breweries, "
+                 f"{new_index.nbytes / 2**20:.1f} MB in "
+                 f"{time.time() - started:.2f}s")
+    return new_index
+
+
+def load_search(bucket, date):
+    """
+    Download the search artifact of a date to local disk and map it;
+    returns (date, generation, SearchIndex) or None when not built yet
+    """
+    blob = storage_client.bucket(bucket).get_blob(
+        f"{SEARCH_PREFIX}date={date}/breweries.idx")
+    if blob is None:
+        return None
+    if search and search[:2] == (date, blob.generation):
+        return search
+
+    local_path = os.path.join(tempfile.gettempdir(),
+                              f"breweries-{date}-{blob.generation}.idx")
+    blob.download_to_filename(local_path)
+    search_index = SearchIndex.open(local_path)
+    # The mapping keeps the data readable after the file is unlinked
+    os.remove(local_path)
+    logging.info(f"Loaded search index {date} (generation "
+                 f"{blob.generation}): {search_index.num_docs} breweries, "
+                 f"{search_index.num_terms} terms")
+    return date, blob.generation, search_index
+
+
+def refresh_index():
+    """
+    Load the latest partition on the first request and re-check for a
+    newer one every RELOAD_CHECK_SECONDS. Requests keep being served
+    from the current index while a reload runs.
+    """
+    global index, search, last_check
+
+    if index is not None and time.time() - last_check < RELOAD_CHECK_SECONDS:
+        return index
+    if not reload_lock.acquire(blocking=index is None):
+        return index
+
+    try:
+        if index is None or time.time() - last_check >= RELOAD_CHECK_SECONDS:
+            snapshot = latest_snapshot(GCS_BUCKET_SILVER)
+            if snapshot is None:
+                raise Exception(f"No silver partition found in "
+                                f"gs://{GCS_BUCKET_SILVER}/{SILVER_PREFIX}")
+            if index is None or snapshot != index.snapshot:
+                index = load_snapshot(GCS_BUCKET_SILVER, snapshot)
+            # The artifact lands after the silver data: keep serving the
+            # previous one until it does
+            try:
+                search = load_search(GCS_BUCKET_SILVER, snapshot[0]) \
+                    or search
+            except Exception as e:
+                logging.warning(f"Could not load search index: {str(e)}")
+            last_check = time.time()
+    finally:
+        reload_lock.release()
+    return index
+
+
+def json_response(body, status, started, current):
+    """JSON response with the lookup time and snapshot headers."""
+    if not isinstance(body, str):
+        body = json.dumps(body, ensure_ascii=False)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return body, status, {
+        'Content-Type': 'application/json; charset=utf-8',
+        'Server-Timing': f"lookup;dur={elapsed_ms:.3f}",
+        'X-Snapshot-Date': current.snapshot[0]
+    }
+
+
+def main(request):
+    """
+    HTTP lookup of the latest silver snapshot:
+    ?id=<id_brewery> returns one brewery; ?state=, ?city= and ?type=
+    (combinable, with limit/offset) return matching breweries; ?q=
+    searches names by prefix, tolerating typos
+    """
+    try:
+        current = refresh_index()
+    except Exception as e:
+        error_msg = f"Error loading silver snapshot: {str(e)}"
+        logging.error(error_msg)
+        return json.dumps({'error': error_msg}), 503, \
+            {'Content-Type': 'application/json'}
+
+    started = time.perf_counter()
+    args = request.args
+
+    if 'q' in args:
+        if search is None:
+            return json_response({'error': 'search index not available'},
+                                 503, started, current)
+        try:
+            limit = int(args.get('limit', 10))
+        except ValueError:
+            return json_response({'error': 'limit must be an integer'},
+                                 400, started, current)
+        if limit < 1:
+            return json_response({'error': 'limit must be at least 1'},
+                                 400, started, current)
+        limit = min(limit, MAX_LIMIT)
+        return json_response({'search_date': search[0],
+                              'breweries': search[2].search(args['q'],
+                                                            limit)},
+                             200, started, current)
+
+    if 'id' in args:
+        brewery = current.get_json(args['id'])
+        if brewery is None:
+            return json_response({'error': 'brewery not found'}, 404,
+                                 started, current)
+        return json_response(brewery, 200, started, current)
+
+    try:
+        limit = int(args.get('limit', 100))
+        offset = max(int(args.get('offset', 0)), 0)
+    except ValueError:
+        return json_response({'error': 'limit and offset must be integers'},
+                             400, started, current)
+    if limit < 1:
+        return json_response({'error': 'limit must be at least 1'},
+                             400, started, current)
+    limit = min(limit, MAX_LIMIT)
+
+    filters = {param: args[param] for param in SORTED_INDEXES
+               if param in args}
+    try:
+        total, breweries = current.find_json(filters, limit, offset)
+    except ValueError as e:
+        return json_response({'error': str(e)}, 400, started, current)
+    # Documents are already JSON: only the envelope is serialized
+    envelope = json.dumps({'snapshot_date': current.snapshot[0],
+                           'total': total, 'limit': limit,
+                           'offset': offset})
+    return json_response(
+        f"{envelope[:-1]}, \"breweries\": [{', '.join(breweries)}]}}",
+        200, started, current)
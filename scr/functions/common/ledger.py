@@ -0,0 +1,46 @@
+import os
+import json
+import logging
+from datetime import datetime, timezone
+from google.cloud import bigquery
+
+# BigQuery run ledger table (project.dataset.table); empty disables it
+LEDGER_TABLE = os.environ.get('LEDGER_TABLE', '')
+
+_bigquery_client = None
+
+
+def record_ledger_stage(component: str, run_id: str, date: str, stage: str,
+                        started_at: datetime, status: str = 'succeeded',
+                        records: int = None, bytes_processed: int = None,
+                        details: dict = None, finished_at: datetime = None):
+    """Append a stage record to the run ledger (never fails the caller)"""
+    global _bigquery_client
+    if not LEDGER_TABLE:
+        return
+
+    recorded_at = datetime.now(timezone.utc)
+    finished_at = finished_at or recorded_at
+    row = {
+        'run_id': run_id,
+        'run_date': date,
+        'component': component,
+        'stage': stage,
+        'started_at': started_at.isoformat(),
+        'finished_at': finished_at.isoformat(),
+        'duration_seconds': (finished_at - started_at).total_seconds(),
+        'status': status,
+        'records': records,
+        'bytes': bytes_processed,
+        'details': json.dumps(details or {}),
+        'recorded_at': recorded_at.isoformat()
+    }
+
+    try:
+        if _bigquery_client is None:
+            _bigquery_client = bigquery.Client()
+        errors = _bigquery_client.insert_rows_json(LEDGER_TABLE, [row])
+        if errors:
+            logging.warning(f"Run ledger insert errors: {errors}")
+    except Exception as e:
+        logging.warning(f"Could not write run ledger record: {str(e)}")
@@ -0,0 +1,88 @@
+import os
+import logging
+from contextlib import contextmanager
+
+# OpenTelemetry is optional: without it spans are no-ops and only the
+# run id travels with the messages
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (SimpleSpanProcessor,
+                                                ConsoleSpanExporter)
+    from opentelemetry.trace.propagation.tracecontext import (
+        TraceContextTextMapPropagator)
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+
+# none | log (stdout, i.e. Cloud Logging) | file | otlp (collector)
+TRACE_EXPORTER = os.environ.get('TRACE_EXPORTER', 'none').lower()
+TRACE_FILE = os.environ.get('TRACE_FILE', '/tmp/spans.jsonl')
+
+_tracer = None
+
+
+def _build_exporter():
+    """Span exporter selected by TRACE_EXPORTER"""
+    if TRACE_EXPORTER == 'log':
+        return ConsoleSpanExporter(
+            formatter=lambda span: span.to_json(indent=None) + '\n')
+    if TRACE_EXPORTER == 'file':
+        return ConsoleSpanExporter(
+            out=open(TRACE_FILE, 'a'),
+            formatter=lambda span: span.to_json(indent=None) + '\n')
+    if TRACE_EXPORTER == 'otlp':
+        # Endpoint from OTEL_EXPORTER_OTLP_ENDPOINT
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter)
+        return OTLPSpanExporter()
+    return None
+
+
+def configure_tracing(service_name: str):
+    """Set up the tracer once per instance"""
+    global _tracer
+    if _tracer is not None or not OTEL_AVAILABLE:
+        return
+
+    provider = TracerProvider(
+        resource=Resource.create({'service.name': service_name}))
+    try:
+        exporter = _build_exporter()
+        if exporter:
+            # Export synchronously: the instance may be frozen after return
+            provider.add_span_processor(SimpleSpanProcessor(exporter))
+    except Exception as e:
+        logging.warning(f"Could not configure span exporter: {str(e)}")
+
+    _tracer = provider.get_tracer(service_name)
+
+
+def context_from_attributes(attributes: dict):
+    """Extract the parent trace context from Pub/Sub message attributes"""
+    if not OTEL_AVAILABLE or not attributes:
+        return None
+    return TraceContextTextMapPropagator().extract(carrier=attributes)
+
+
+def trace_attributes() -> dict:
+    """W3C trace context of the current span, as Pub/Sub attributes"""
+    carrier = {}
+    if OTEL_AVAILABLE:
+        TraceContextTextMapPropagator().inject(carrier)
+    return carrier
+
+
+@contextmanager
+def span(name: str, parent=None, **attributes):
+    """Span around a block; yields the span (None without OpenTelemetry)"""
+    if _tracer is None:
+        yield None
+        return
+
+    with _tracer.start_as_current_span(name, context=parent) as current:
+        for key, value in attributes.items():
+            if value is not None:
+                current.set_attribute(key, value)
+        yield current
@@ -1,28 +1,226 @@
 from google.cloud import dataproc_v1 as dataproc
+from google.cloud import firestore
+from datetime import datetime, timezone
+from concurrent.futures import TimeoutError as WaitTimeoutError
 import json
+import math
 import os
+import re
+import time
 import logging
 import base64
+import sys
+from ledger import record_ledger_stage
+from tracing import (configure_tracing, context_from_attributes,
+                     trace_attributes, span)
+
+# Dataproc common modules packaged under breweries/ (functions.tf), for
+# the step fingerprints; appended so this function's tracing.py wins
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             'breweries'))
+from pipeline_steps import current_steps, LOAD_STEP, TRANSFORM_STEP
 
 
 project_id = os.environ.get('GCP_PROJECT')
 region = os.environ.get('REGION')
 template_name = os.environ.get('DATAPROC_TEMPLATE_NAME')
+stream_template_name = os.environ.get('DATAPROC_STREAM_TEMPLATE_NAME')
+# Size the managed cluster from the extraction volume
+DYNAMIC_CLUSTER_SIZING = os.environ.get(
+    'DYNAMIC_CLUSTER_SIZING', 'true').lower() == 'true'
+# Buckets of the step fingerprints (both set enables skipping)
+GCS_BUCKET_BRONZE = os.environ.get('GCS_BUCKET_BRONZE', '')
+GCS_BUCKET_SILVER = os.environ.get('GCS_BUCKET_SILVER', '')
+# Run ledger and span component of this function
+COMPONENT = 'trigger-dataproc'
+# (component, stage) of the template jobs, recorded as skipped when the
+# workflow is not started
+TEMPLATE_JOB_STAGES = [
+    (LOAD_STEP, 'load'),
+    (TRANSFORM_STEP, 'transform'),
+    ('search-index', 'search_index'),
+    ('bulk-export', 'bulk_export')
+]
+# Time spent waiting on the workflow, below the 540s function timeout;
+# a longer workflow keeps running and its jobs record their own stages
+WORKFLOW_WAIT_SECONDS = int(os.environ.get('WORKFLOW_WAIT_SECONDS', '480'))
+CLUSTER_POLL_SECONDS = 2
+RUN_ID_PROPERTY = 'spark.brwy.runId'
+TRACEPARENT_PROPERTY = 'spark.brwy.traceparent'
+
+MB = 1024 * 1024
+# Estimate for pages without a recorded size (200 breweries per page)
+ESTIMATED_PAGE_BYTES = 150 * 1024
+# Bronze volume handled by each preemptible secondary worker
+BYTES_PER_SECONDARY_WORKER = 2 * 1024 * MB
+MAX_SECONDARY_WORKERS = 20
 
 logging.getLogger().setLevel(logging.INFO)
+configure_tracing(COMPONENT)
+
+
+def label_value(value):
+    """Dataproc label value: lowercase letters, digits, - and _"""
+    return re.sub(r'[^a-z0-9_-]', '-', str(value).lower())[:63]
+
+
+def workflow_is_current(date):
+    """
+    True when load and transform of the date are current, so the whole
+    workflow (cluster included) would only skip its steps
+    """
+    if not (GCS_BUCKET_BRONZE and GCS_BUCKET_SILVER):
+        return False
+    try:
+        return current_steps(GCS_BUCKET_BRONZE, GCS_BUCKET_SILVER, date)
+    except Exception as e:
+        logging.warning(f"Could not check the step fingerprints, starting "
+                        f"the workflow: {str(e)}")
+        return False
+
+
+def wait_for_cluster(operation, deadline):
+    """
+    Poll the workflow operation until its managed cluster is created.
+    Returns (ready time, cluster name, creation error), or None when the
+    deadline (time.monotonic()) passes first
+    """
+    while time.monotonic() < deadline:
+        finished = operation.done()
+        metadata = operation.metadata
+        create_cluster = getattr(metadata, 'create_cluster', None)
+        if finished or (create_cluster is not None and create_cluster.done):
+            return (datetime.now(timezone.utc),
+                    getattr(metadata, 'cluster_name', None),
+                    getattr(create_cluster, 'error', ''))
+        time.sleep(CLUSTER_POLL_SECONDS)
+    return None
+
+
+def record_workflow_operation(date, operation_name, workflow_template):
+    """Store the workflow operation on the extraction job document"""
+    try:
+        firestore.Client().collection('extraction_jobs').document(date).set({
+            'dataproc_operation': operation_name,
+            'dataproc_workflow_template': workflow_template,
+            'dataproc_started_at': datetime.now(timezone.utc)
+        }, merge=True)
+    except Exception as e:
+        logging.warning(f"Could not record workflow operation: {str(e)}")
+
+
+def get_extraction_volume(date):
+    """Read total pages and bronze bytes from the extraction job document"""
+    job_doc = firestore.Client().collection(
+        'extraction_jobs').document(date).get()
+
+    if not job_doc.exists:
+        return None, None
+
+    job_data = job_doc.to_dict()
+    total_pages = job_data.get('total_pages') or 0
+    completed_pages = job_data.get('completed_pages', {})
+
+    recorded_bytes = [page.get('bytes') for page in completed_pages.values()
+                      if page.get('bytes')]
+    average_page_bytes = (sum(recorded_bytes) / len(recorded_bytes)
+                          if recorded_bytes else ESTIMATED_PAGE_BYTES)
+
+    return total_pages, int(total_pages * average_page_bytes)
+
+
+def choose_cluster_size(total_bytes):
+    """Pick worker count, machine type and secondary workers by volume"""
+    if total_bytes <= 64 * MB:
+        # A normal day fits a single-node cluster
+        return {'workers': 0, 'machine_type': 'e2-standard-4',
+                'secondary_workers': 0}
+    if total_bytes <= 1024 * MB:
+        return {'workers': 2, 'machine_type': 'e2-standard-2',
+                'secondary_workers': 0}
+    if total_bytes <= 10 * 1024 * MB:
+        return {'workers': 2, 'machine_type': 'e2-standard-4',
+                'secondary_workers': min(
+                    MAX_SECONDARY_WORKERS,
+                    math.ceil(total_bytes / BYTES_PER_SECONDARY_WORKER))}
+    return {'workers': 4, 'machine_type': 'n2-standard-4',
+            'secondary_workers': min(
+                MAX_SECONDARY_WORKERS,
+                math.ceil(total_bytes / BYTES_PER_SECONDARY_WORKER))}
+
+
+def build_sized_workflow(template, date, cluster_size, run_id,
+                         traceparent=''):
+    """
+    Copy a workflow template with the DATE parameter resolved and the
+    managed cluster resized, to be instantiated inline
+    """
+    placement = template.placement
+    cluster_config = placement.managed_cluster.config
+
+    cluster_config.worker_config.num_instances = cluster_size['workers']
+    if cluster_size['workers'] == 0:
+        cluster_config.software_config.properties[
+            'dataproc:dataproc.allow.zero.workers'] = 'true'
+        cluster_config.master_config.machine_type_uri = (
+            cluster_size['machine_type'])
+    else:
+        cluster_config.worker_config.machine_type_uri = (
+            cluster_size['machine_type'])
+
+    if cluster_size['secondary_workers'] > 0:
+        cluster_config.secondary_worker_config = dataproc.InstanceGroupConfig(
+            num_instances=cluster_size['secondary_workers'],
+            preemptibility=(
+                dataproc.InstanceGroupConfig.Preemptibility.PREEMPTIBLE)
+        )
+
+    # Inline workflows take no parameters: resolve DATE in the job args
+    # and RUN_ID / TRACEPARENT in the job properties
+    jobs = []
+    for job in template.jobs:
+        if job.pyspark_job.args:
+            job.pyspark_job.args = [
+                date if arg == 'DATE' else arg
+                for arg in job.pyspark_job.args
+            ]
+        job.pyspark_job.properties[RUN_ID_PROPERTY] = run_id
+        job.pyspark_job.properties[TRACEPARENT_PROPERTY] = traceparent
+        job.labels['run_id'] = label_value(run_id)
+        jobs.append(job)
+
+    labels = dict(template.labels)
+    labels['run_id'] = label_value(run_id)
+
+    return dataproc.WorkflowTemplate(
+        placement=placement,
+        jobs=jobs,
+        labels=labels
+    )
+
 
 def main(event, context):
     """
     Cloud Function to trigger Dataproc Workflow Template via Pub/Sub
-    Receives parameters: steps (list of steps) and date (date for processing)
+    Receives parameters: steps (list of steps), date (date for processing),
+    mode ('batch' or 'streaming') and run_id (run ledger id)
     """
 
+    started_at = datetime.now(timezone.utc)
+    deadline = time.monotonic() + WORKFLOW_WAIT_SECONDS
+
+    # run_id and W3C trace context travel as message attributes
+    attributes = event.get('attributes') or {}
+
     if 'data' in event:
         try:
             message = base64.b64decode(event['data']).decode('utf-8')
             message_data = json.loads(message)
             steps = message_data.get('steps')
             date = message_data.get('date')
+            mode = message_data.get('mode', 'batch')
+            run_id = (message_data.get('run_id')
+                      or attributes.get('run_id') or date)
 
         except json.JSONDecodeError as e:
             error_msg = (f"Error decoding JSON message: {message}. "
@@ -38,41 +236,139 @@ def main(event, context):
         logging.error(error_msg)
         raise Exception(error_msg)
     
-    logging.info(f"Received steps: {steps}, date: {date}")
+    logging.info(f"Received steps: {steps}, date: {date}, mode: {mode}, "
+                 f"run_id: {run_id}")
+
+    # A re-trigger with unchanged input, code and schema costs nothing:
+    # no cluster is provisioned and the jobs are recorded as skipped
+    if mode != 'streaming' and workflow_is_current(date):
+        logging.info(f"Load and transform of {date} are current, "
+                     f"workflow not started")
+        for component, stage in TEMPLATE_JOB_STAGES:
+            record_ledger_stage(component, run_id, date, stage, started_at,
+                                status='skipped')
+        record_ledger_stage(COMPONENT, run_id, date, 'trigger', started_at,
+                            status='skipped', details={'mode': mode})
+        return 'OK'
+
+    # Streaming runs use the template whose load step watches bronze
+    workflow_template = (
+        stream_template_name if mode == 'streaming' else template_name
+    )
     
     try:
-        # Dataproc client with regional endpoint
-        endpoint = f"{region}-dataproc.googleapis.com:443"
-        client_options = {"api_endpoint": endpoint}
-        client = dataproc.WorkflowTemplateServiceClient(
-            client_options=client_options
-        )
-        
-        # Configure workflow job
-        workflow_template_name = (
-            f"projects/{project_id}/regions/{region}/"
-            f"workflowTemplates/{template_name}"
-        )
+        with span('trigger_workflow',
+                  parent=context_from_attributes(attributes),
+                  run_id=run_id, mode=mode):
+            # Dataproc jobs continue the trace from this span
+            traceparent = trace_attributes().get('traceparent', '')
+
+            # Dataproc client with regional endpoint
+            endpoint = f"{region}-dataproc.googleapis.com:443"
+            client_options = {"api_endpoint": endpoint}
+            client = dataproc.WorkflowTemplateServiceClient(
+                client_options=client_options
+            )
         
-        # Parameters for template
-        parameters = {
-            'DATE': date
-        }
+            # Configure workflow job
+            workflow_template_name = (
+                f"projects/{project_id}/regions/{region}/"
+                f"workflowTemplates/{workflow_template}"
+            )
         
-        # Submit workflow
-        operation = client.instantiate_workflow_template(
-            request={
-                "name": workflow_template_name,
-                "parameters": parameters
+            # Parameters for template
+            parameters = {
+                'DATE': date,
+                'RUN_ID': run_id,
+                'TRACEPARENT': traceparent
             }
-        )
+
+            total_pages, total_bytes = (
+                get_extraction_volume(date) if DYNAMIC_CLUSTER_SIZING
+                else (None, None)
+            )
+
+            if total_pages:
+                cluster_size = choose_cluster_size(total_bytes)
+                logging.info(f"Extraction volume: {total_pages} pages, "
+                             f"~{total_bytes} bytes. Cluster: {cluster_size}")
+
+                template = client.get_workflow_template(
+                    request={"name": workflow_template_name}
+                )
+
+                # Submit resized workflow
+                operation = client.instantiate_inline_workflow_template(
+                    request={
+                        "parent": f"projects/{project_id}/regions/{region}",
+                        "template": build_sized_workflow(
+                            template, date, cluster_size, run_id,
+                            traceparent)
+                    }
+                )
+            else:
+                logging.info("No extraction volume available, using the "
+                             "template cluster")
+
+                # Submit workflow
+                operation = client.instantiate_workflow_template(
+                    request={
+                        "name": workflow_template_name,
+                        "parameters": parameters
+                    }
+                )
         
-        logging.info(f"Workflow started successfully: {operation.result()}")
+            # Lets callers wait on the operation instead of polling logs
+            record_workflow_operation(date, operation.operation.name,
+                                      workflow_template)
         
     except Exception as e:
         error_msg = (f"Error starting workflow: {str(e)}")
         logging.error(error_msg)
+        record_ledger_stage(COMPONENT, run_id, date, 'trigger', started_at,
+                            status='failed', details={'error': str(e)})
         raise Exception(error_msg)
-    
+
+    # The trigger stage ends at submission; cluster creation and the jobs
+    # follow as their own stages
+    submitted_at = datetime.now(timezone.utc)
+    record_ledger_stage(COMPONENT, run_id, date, 'trigger', started_at,
+                        finished_at=submitted_at,
+                        details={'mode': mode, 'template': workflow_template,
+                                 'total_pages': total_pages})
+
+    if mode == 'streaming':
+        # The streaming workflow outlives the function timeout
+        logging.info(f"Streaming workflow started: {operation.metadata}")
+        return 'OK'
+
+    cluster = wait_for_cluster(operation, deadline)
+    if cluster is None:
+        logging.info(f"Cluster still provisioning after "
+                     f"{WORKFLOW_WAIT_SECONDS}s: {operation.operation.name}")
+        return 'OK'
+
+    ready_at, cluster_name, cluster_error = cluster
+    details = {'cluster': cluster_name}
+    if cluster_error:
+        details['error'] = cluster_error
+    record_ledger_stage(COMPONENT, run_id, date, 'cluster_provisioning',
+                        submitted_at, finished_at=ready_at,
+                        status='failed' if cluster_error else 'succeeded',
+                        details=details)
+
+    try:
+        result = operation.result(
+            timeout=max(0, deadline - time.monotonic()))
+    except WaitTimeoutError:
+        logging.info(f"Workflow still running after "
+                     f"{WORKFLOW_WAIT_SECONDS}s: {operation.operation.name}")
+        return 'OK'
+    except Exception as e:
+        error_msg = f"Workflow failed: {str(e)}"
+        logging.error(error_msg)
+        raise Exception(error_msg)
+
+    logging.info(f"Workflow finished successfully: {result}")
     return 'OK'
 
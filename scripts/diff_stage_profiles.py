@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Compare two stage profiles written by common/stage_profiler.py (local
+files or gs:// URIs): Spark settings, job totals and per-stage deltas.
+"""
+
+import argparse
+import json
+import logging
+from collections import defaultdict
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Metrics summed over the job and compared per stage
+COMPARED_METRICS = [
+    "duration_ms",
+    "executor_run_time_ms",
+    "jvm_gc_time_ms",
+    "input_bytes",
+    "input_records",
+    "shuffle_read_bytes",
+    "shuffle_write_bytes",
+    "memory_spilled_bytes",
+    "disk_spilled_bytes",
+    "tasks"
+]
+
+
+def load_profile(path):
+    """Read a profile from a local path or gs:// URI"""
+    if path.startswith("gs://"):
+        from google.cloud import storage
+        bucket_name, _, blob_name = path[len("gs://"):].partition("/")
+        content = storage.Client().bucket(bucket_name) \
+            .blob(blob_name).download_as_text()
+        return json.loads(content)
+
+    with open(path) as profile_file:
+        return json.load(profile_file)
+
+
+def stage_keys(profile):
+    """
+    Key stages by call site and occurrence, since stage ids shift when
+    the plan changes
+    """
+    seen = defaultdict(int)
+    keyed = {}
+    for stage in profile["stages"]:
+        name = stage.get("name") or f"stage {stage['stage_id']}"
+        seen[name] += 1
+        keyed[f"{name} #{seen[name]}"] = stage
+    return keyed
+
+
+def totals(profile):
+    """Sum of each compared metric over all stages"""
+    return {
+        metric: sum(stage.get(metric) or 0 for stage in profile["stages"])
+        for metric in COMPARED_METRICS
+    }
+
+
+def format_delta(before, after):
+    """Absolute and relative change between two values"""
+    delta = after - before
+    if before:
+        return f"{before:>14,} -> {after:>14,} ({delta / before:+.1%})"
+    return f"{before:>14,} -> {after:>14,}"
+
+
+def diff_profiles(before, after, min_change):
+    """Log the differences between two profiles"""
+    logger.info(f"Before: {before['job']} {before['date']} "
+                f"({before['application_id']})")
+    logger.info(f"After:  {after['job']} {after['date']} "
+                f"({after['application_id']})")
+
+    logger.info("\nSpark settings:")
+    for key in sorted(set(before["spark_conf"]) | set(after["spark_conf"])):
+        old_value = before["spark_conf"].get(key)
+        new_value = after["spark_conf"].get(key)
+        marker = "  " if old_value == new_value else "* "
+        logger.info(f"{marker}{key}: {old_value} -> {new_value}")
+
+    logger.info("\nJob totals:")
+    before_totals, after_totals = totals(before), totals(after)
+    for metric in COMPARED_METRICS:
+        change = format_delta(before_totals[metric], after_totals[metric])
+        logger.info(f"  {metric:<22} {change}")
+
+    logger.info(f"\nStages (run time change >= {min_change:.0%}):")
+    before_stages, after_stages = stage_keys(before), stage_keys(after)
+    for key in list(before_stages) + [k for k in after_stages
+                                      if k not in before_stages]:
+        old_stage = before_stages.get(key)
+        new_stage = after_stages.get(key)
+        if old_stage is None or new_stage is None:
+            state = ("only in after" if old_stage is None
+                     else "only in before")
+            logger.info(f"  {key}: {state}")
+            continue
+
+        old_time = old_stage.get("executor_run_time_ms") or 0
+        new_time = new_stage.get("executor_run_time_ms") or 0
+        if old_time and abs(new_time - old_time) / old_time < min_change:
+            continue
+
+        logger.info(f"  {key}:")
+        for metric in COMPARED_METRICS:
+            old_value = old_stage.get(metric) or 0
+            new_value = new_stage.get(metric) or 0
+            if old_value != new_value:
+                logger.info(f"    {metric:<22} "
+                            f"{format_delta(old_value, new_value)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff two stage profiles')
+    parser.add_argument('before', help='Baseline profile (path or gs://)')
+    parser.add_argument('after', help='Profile to compare (path or gs://)')
+    parser.add_argument('--min-change', type=float, default=0.1,
+                        help='Hide stages whose run time changed less '
+                             'than this fraction')
+    args = parser.parse_args()
+
+    diff_profiles(load_profile(args.before), load_profile(args.after),
+                  args.min_change)
+
+
+if __name__ == "__main__":
+    main()
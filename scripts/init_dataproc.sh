@@ -29,6 +29,9 @@ fi
 
 # Install additional Python packages if needed
 # These packages are usually already available in Dataproc images
-pip3 install --upgrade google-cloud-bigquery google-cloud-storage || echo "Warning: Failed to upgrade some packages, using pre-installed versions"
+pip3 install --upgrade google-cloud-bigquery google-cloud-storage google-cloud-firestore google-cloud-pubsub || echo "Warning: Failed to upgrade some packages, using pre-installed versions"
+
+# Optional: spans around pipeline stages (common/tracing.py)
+pip3 install opentelemetry-sdk opentelemetry-exporter-otlp-proto-http || echo "Warning: OpenTelemetry not installed, tracing disabled"
 
 echo "Dataproc initialization completed successfully"
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Run ledger report: per-stage latency percentiles and the critical path of
+recent pipeline runs, read from the pipeline_run_ledger table.
+"""
+
+import argparse
+import logging
+from google.cloud import bigquery
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+STAGE_PERCENTILES_SQL = """
+SELECT
+  component,
+  stage,
+  COUNT(*) AS executions,
+  APPROX_QUANTILES(duration_seconds, 100)[OFFSET(50)] AS p50_seconds,
+  APPROX_QUANTILES(duration_seconds, 100)[OFFSET(95)] AS p95_seconds,
+  MAX(duration_seconds) AS max_seconds,
+  SUM(records) AS records,
+  SUM(bytes) AS bytes
+FROM `{table}`
+WHERE run_date >= DATE_SUB(CURRENT_DATE(), INTERVAL @days DAY)
+  AND status = 'succeeded'
+GROUP BY component, stage
+ORDER BY p95_seconds DESC
+"""
+
+# Pub/Sub delivery delay of each page message (publish -> invocation)
+QUEUE_DELAY_SQL = """
+SELECT
+  run_id,
+  COUNT(*) AS pages,
+  APPROX_QUANTILES(delay, 100)[OFFSET(50)] AS p50_seconds,
+  APPROX_QUANTILES(delay, 100)[OFFSET(95)] AS p95_seconds,
+  MAX(delay) AS max_seconds
+FROM (
+  SELECT
+    run_id,
+    started_at,
+    CAST(JSON_VALUE(details, '$.queue_delay_seconds') AS FLOAT64) AS delay
+  FROM `{table}`
+  WHERE run_date >= DATE_SUB(CURRENT_DATE(), INTERVAL @days DAY)
+    AND component = 'api-extract'
+    AND stage = 'page_fetch'
+)
+WHERE delay IS NOT NULL
+GROUP BY run_id
+ORDER BY MIN(started_at) DESC
+LIMIT @runs
+"""
+
+# The pages run in parallel, so only the slowest page of a run is on the
+# critical path; the other stages run one after the other
+CRITICAL_PATH_SQL = """
+WITH stages AS (
+  SELECT
+    run_id,
+    component,
+    stage,
+    MIN(started_at) AS started_at,
+    MAX(finished_at) AS finished_at,
+    MAX(duration_seconds) AS duration_seconds
+  FROM `{table}`
+  WHERE run_date >= DATE_SUB(CURRENT_DATE(), INTERVAL @days DAY)
+  GROUP BY run_id, component, stage
+),
+recent_runs AS (
+  SELECT run_id
+  FROM stages
+  GROUP BY run_id
+  ORDER BY MIN(started_at) DESC
+  LIMIT @runs
+)
+SELECT
+  run_id,
+  component,
+  stage,
+  started_at,
+  finished_at,
+  duration_seconds,
+  TIMESTAMP_DIFF(
+    started_at,
+    LAG(finished_at) OVER (PARTITION BY run_id ORDER BY started_at),
+    MILLISECOND) / 1000 AS gap_seconds
+FROM stages
+JOIN recent_runs USING (run_id)
+ORDER BY run_id DESC, started_at
+"""
+
+
+def stage_percentiles(client, table, days):
+    """Print p50/p95 per component and stage"""
+    job_config = bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter("days", "INT64", days)
+    ])
+    rows = client.query(STAGE_PERCENTILES_SQL.format(table=table),
+                        job_config=job_config).result()
+
+    logger.info(f"Stage latency over the last {days} days:")
+    logger.info(f"{'component':<18} {'stage':<22} {'runs':>6} "
+                f"{'p50 (s)':>9} {'p95 (s)':>9} {'max (s)':>9}")
+    for row in rows:
+        logger.info(f"{row.component:<18} {row.stage:<22} "
+                    f"{row.executions:>6} {row.p50_seconds:>9.1f} "
+                    f"{row.p95_seconds:>9.1f} {row.max_seconds:>9.1f}")
+
+
+def queue_delays(client, table, days, runs):
+    """Print the page message queueing delay of the most recent runs"""
+    job_config = bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter("days", "INT64", days),
+        bigquery.ScalarQueryParameter("runs", "INT64", runs)
+    ])
+    rows = client.query(QUEUE_DELAY_SQL.format(table=table),
+                        job_config=job_config).result()
+
+    logger.info("Page queueing delay (Pub/Sub publish -> invocation):")
+    for row in rows:
+        logger.info(f"  {row.run_id}: {row.pages} pages, "
+                    f"p50 {row.p50_seconds:.1f}s, "
+                    f"p95 {row.p95_seconds:.1f}s, "
+                    f"max {row.max_seconds:.1f}s")
+
+
+def critical_path(client, table, days, runs):
+    """Print the stage sequence of the most recent runs with idle gaps"""
+    job_config = bigquery.QueryJobConfig(query_parameters=[
+        bigquery.ScalarQueryParameter("days", "INT64", days),
+        bigquery.ScalarQueryParameter("runs", "INT64", runs)
+    ])
+    rows = client.query(CRITICAL_PATH_SQL.format(table=table),
+                        job_config=job_config).result()
+
+    current_run = None
+    run_start = None
+    for row in rows:
+        if row.run_id != current_run:
+            current_run = row.run_id
+            run_start = row.started_at
+            logger.info(f"\nRun {current_run}:")
+
+        offset = (row.started_at - run_start).total_seconds()
+        gap = (f" (waited {row.gap_seconds:.1f}s)"
+               if row.gap_seconds and row.gap_seconds > 0 else "")
+        logger.info(f"  +{offset:>8.1f}s {row.component}/{row.stage}: "
+                    f"{row.duration_seconds:.1f}s{gap}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run ledger report')
+    parser.add_argument('--table', required=True,
+                        help='Ledger table (project.dataset.table)')
+    parser.add_argument('--days', type=int, default=30,
+                        help='Days of history for the percentiles')
+    parser.add_argument('--runs', type=int, default=3,
+                        help='Recent runs shown in the critical path')
+    args = parser.parse_args()
+
+    client = bigquery.Client()
+    stage_percentiles(client, args.table, args.days)
+    queue_delays(client, args.table, args.days, args.runs)
+    critical_path(client, args.table, args.days, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,9 @@ import os
 import json
 import time
 import logging
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional
 from google.oauth2 import service_account
 from google.auth import default
 from .config import TestConfig
@@ -87,3 +88,77 @@ class BaseIntegrationTest(ABC):
     def log_info(self, message: str):
         """Log an info message."""
         logger.info(f"  📝 {message}")
+
+    def wait_for(self, check: Callable[[], Any], description: str,
+                 timeout: float, initial_interval: float = 2,
+                 max_interval: float = 30, backoff: float = 2.0) -> Any:
+        """
+        Call check() with exponential backoff until it returns a truthy
+        value, which is returned. Returns None on timeout. Exceptions
+        from check() are logged and retried.
+        """
+        self.log_info(f"Waiting for {description} (timeout {timeout:.0f}s)")
+        deadline = time.time() + timeout
+        interval = initial_interval
+        started = time.time()
+
+        while True:
+            try:
+                result = check()
+                if result:
+                    self.log_info(f"{description} after "
+                                  f"{time.time() - started:.1f}s")
+                    return result
+            except Exception as e:
+                self.log_warning(f"Check for {description} failed: {e}")
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.log_error(f"Timeout waiting for {description}")
+                return None
+            time.sleep(min(interval, remaining))
+            interval = min(interval * backoff, max_interval)
+
+    def wait_for_document(self, document_ref,
+                          predicate: Callable[[Dict[str, Any]], Any],
+                          description: str,
+                          timeout: float) -> Optional[Dict[str, Any]]:
+        """
+        Wait until a Firestore document satisfies predicate(data), using
+        a snapshot listener (falls back to polling if it cannot attach).
+        Returns the matching document data, or None on timeout.
+        """
+        matched = threading.Event()
+        state = {}
+
+        def on_snapshot(snapshots, changes, read_time):
+            for snapshot in snapshots:
+                data = snapshot.to_dict() if snapshot.exists else None
+                if data is not None and predicate(data):
+                    state['data'] = data
+                    matched.set()
+
+        self.log_info(f"Waiting for {description} (timeout {timeout:.0f}s)")
+        started = time.time()
+        try:
+            watch = document_ref.on_snapshot(on_snapshot)
+        except Exception as e:
+            self.log_warning(f"Snapshot listener unavailable ({e}), "
+                             f"polling instead")
+
+            def check():
+                snapshot = document_ref.get()
+                data = snapshot.to_dict() if snapshot.exists else None
+                return data if data is not None and predicate(data) else None
+
+            return self.wait_for(check, description, timeout)
+
+        try:
+            if not matched.wait(timeout):
+                self.log_error(f"Timeout waiting for {description}")
+                return None
+        finally:
+            watch.unsubscribe()
+
+        self.log_info(f"{description} after {time.time() - started:.1f}s")
+        return state['data']
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Single-scan validation of one source_date partition of the breweries
+table, shared by BigQueryTester and validate_bigquery_data.py.
+"""
+
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List
+from google.cloud import bigquery
+
+logger = logging.getLogger(__name__)
+
+# A day of breweries is a few MB; anything near this means the partition
+# filter stopped pruning
+DEFAULT_MAXIMUM_BYTES_BILLED = 1024 ** 3
+# Minimum share of records with an id and a name
+QUALITY_THRESHOLD = 0.9
+
+# Every metric comes from one partition-pruned scan; distributions use
+# APPROX_TOP_COUNT so they don't need another pass over the table
+VALIDATION_QUERY = """
+SELECT
+    COUNT(*) AS total_records,
+    COUNT(DISTINCT id_brewery) AS unique_breweries,
+    COUNT(DISTINCT type_brewery) AS brewery_types,
+    COUNT(DISTINCT name_state) AS states_count,
+    COUNTIF(id_brewery IS NULL) AS null_ids,
+    COUNTIF(name_brewery IS NULL OR name_brewery = '') AS null_names,
+    COUNTIF(type_brewery IS NULL) AS null_types,
+    COUNTIF(name_state IS NULL) AS null_states,
+    MIN(processing_timestamp) AS min_processing_timestamp,
+    MAX(processing_timestamp) AS max_processing_timestamp,
+    APPROX_TOP_COUNT(type_brewery, 20) AS type_distribution,
+    APPROX_TOP_COUNT(name_state, 10) AS top_states
+FROM `{table_id}`
+WHERE source_date = @test_date
+"""
+
+RECENT_VALIDATIONS_QUERY = """
+SELECT
+    source_date,
+    total_records,
+    unique_breweries,
+    quality_score,
+    bytes_billed
+FROM `{history_table}`
+WHERE source_date >= DATE_SUB(@test_date, INTERVAL @days DAY)
+    AND table_id = @table_id
+QUALIFY ROW_NUMBER() OVER (
+    PARTITION BY source_date ORDER BY validated_at DESC) = 1
+ORDER BY source_date DESC
+"""
+
+
+def _job_config(params: List[bigquery.ScalarQueryParameter],
+                **kwargs) -> bigquery.QueryJobConfig:
+    return bigquery.QueryJobConfig(query_parameters=params, **kwargs)
+
+
+def estimate_bytes(client: bigquery.Client, query: str,
+                   params: List[bigquery.ScalarQueryParameter]) -> int:
+    """Bytes a query would process, from a dry run."""
+    job = client.query(query, job_config=_job_config(
+        params, dry_run=True, use_query_cache=False))
+    return job.total_bytes_processed
+
+
+def validate_partition(client: bigquery.Client, table_id: str,
+                       test_date: str,
+                       maximum_bytes_billed: int =
+                       DEFAULT_MAXIMUM_BYTES_BILLED) -> Dict[str, Any]:
+    """
+    Compute all metrics of a source_date partition in one scan. Raises
+    if the dry-run estimate is over maximum_bytes_billed.
+    """
+    query = VALIDATION_QUERY.format(table_id=table_id)
+    params = [bigquery.ScalarQueryParameter('test_date', 'DATE', test_date)]
+
+    bytes_estimated = estimate_bytes(client, query, params)
+    logger.info(f"Validation scan estimate: "
+                f"{bytes_estimated / 2**20:.1f} MB "
+                f"(limit {maximum_bytes_billed / 2**20:.0f} MB)")
+    if bytes_estimated > maximum_bytes_billed:
+        raise Exception(f"Validation would scan {bytes_estimated} bytes, "
+                        f"over the {maximum_bytes_billed} bytes limit")
+
+    job = client.query(query, job_config=_job_config(
+        params, maximum_bytes_billed=maximum_bytes_billed))
+    row = list(job.result())[0]
+
+    metrics = {
+        'table_id': table_id,
+        'source_date': test_date,
+        'total_records': row.total_records,
+        'unique_breweries': row.unique_breweries,
+        'brewery_types': row.brewery_types,
+        'states_count': row.states_count,
+        'null_ids': row.null_ids,
+        'null_names': row.null_names,
+        'null_types': row.null_types,
+        'null_states': row.null_states,
+        'min_processing_timestamp': row.min_processing_timestamp,
+        'max_processing_timestamp': row.max_processing_timestamp,
+        'type_distribution': {entry['value']: entry['count']
+                              for entry in row.type_distribution
+                              if entry['value'] is not None},
+        'top_states': {entry['value']: entry['count']
+                       for entry in row.top_states
+                       if entry['value'] is not None},
+        'bytes_estimated': bytes_estimated,
+        'bytes_processed': job.total_bytes_processed,
+        'bytes_billed': job.total_bytes_billed,
+        'cache_hit': job.cache_hit
+    }
+
+    total = metrics['total_records']
+    issues = metrics['null_ids'] + metrics['null_names']
+    metrics['quality_score'] = 1 - (issues / total) if total else 0
+    metrics['passed'] = (total > 0
+                         and metrics['quality_score'] >= QUALITY_THRESHOLD)
+    return metrics
+
+
+def record_validation(client: bigquery.Client, history_table: str,
+                      metrics: Dict[str, Any], source: str) -> bool:
+    """Append a validation result to the history table."""
+    row = {
+        'validated_at': datetime.now(timezone.utc).isoformat(),
+        'source': source,
+        'details': json.dumps({
+            'type_distribution': metrics['type_distribution'],
+            'top_states': metrics['top_states']
+        }),
+        **{key: metrics[key] for key in (
+            'table_id', 'source_date', 'total_records', 'unique_breweries',
+            'brewery_types', 'states_count', 'null_ids', 'null_names',
+            'null_types', 'null_states', 'quality_score', 'passed',
+            'bytes_estimated', 'bytes_processed', 'bytes_billed',
+            'cache_hit')}
+    }
+    try:
+        errors = client.insert_rows_json(history_table, [row])
+        if errors:
+            logger.warning(f"Validation history insert failed: {errors}")
+            return False
+        return True
+    except Exception as e:
+        logger.warning(f"Could not record validation history: {e}")
+        return False
+
+
+def recent_validations(client: bigquery.Client, history_table: str,
+                       table_id: str, test_date: str,
+                       days: int = 7) -> List[Dict[str, Any]]:
+    """Latest validation per source_date over the previous days."""
+    query = RECENT_VALIDATIONS_QUERY.format(history_table=history_table)
+    params = [
+        bigquery.ScalarQueryParameter('test_date', 'DATE', test_date),
+        bigquery.ScalarQueryParameter('days', 'INT64', days),
+        bigquery.ScalarQueryParameter('table_id', 'STRING', table_id)
+    ]
+    rows = client.query(query, job_config=_job_config(params)).result()
+    return [dict(row.items()) for row in rows]
@@ -29,6 +29,7 @@ class TestConfig:
             'test_date': args.test_date,
             'timeout': args.timeout,
             'continue_on_failure': args.continue_on_failure,
+            'max_bytes_billed': args.max_bytes_billed,
             'verbose': args.verbose
         }
     
@@ -42,6 +43,7 @@ class TestConfig:
             'test_date': os.getenv('TEST_DATE', datetime.now().strftime('%Y-%m-%d')),
             'timeout': int(os.getenv('TIMEOUT', '1800')),
             'continue_on_failure': os.getenv('CONTINUE_ON_FAILURE', 'false').lower() == 'true',
+            'max_bytes_billed': int(os.getenv('MAX_BYTES_BILLED', str(1024 ** 3))),
             'verbose': os.getenv('VERBOSE', 'false').lower() == 'true'
         }
     
@@ -67,6 +69,10 @@ class TestConfig:
             'bigquery_table': (
                 f"{data_project}.breweries_foundation{branch_hash_underscore}"
                 f".breweries_all_data"
+            ),
+            'validation_history_table': (
+                f"{data_project}.breweries_foundation{branch_hash_underscore}"
+                f".validation_history"
             )
         }
         return names.get(resource_type, f"unknown-{resource_type}")
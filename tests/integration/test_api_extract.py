@@ -4,16 +4,18 @@ API Extract function tests for the brewery data pipeline.
 """
 
 import json
-import time
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from google.cloud import pubsub_v1
-from google.cloud import logging as cloud_logging
+from google.cloud import firestore
 from google.cloud import storage
 from .base_test import BaseIntegrationTest
 
 logger = logging.getLogger(__name__)
 
+# Tolerance between the runner clock and the function's created_at
+CLOCK_SKEW = timedelta(minutes=1)
+
 
 class ApiExtractTester(BaseIntegrationTest):
     """Tests the api-extract Cloud Function."""
@@ -28,9 +30,10 @@ class ApiExtractTester(BaseIntegrationTest):
         
         # Initialize clients
         self.publisher = pubsub_v1.PublisherClient(credentials=credentials)
-        self.logging_client = cloud_logging.Client(
+        self.firestore_client = firestore.Client(
             project=project, credentials=credentials
         )
+        self.triggered_at = None
         self.storage_client = storage.Client(
             project=project, credentials=credentials
         )
@@ -61,6 +64,7 @@ class ApiExtractTester(BaseIntegrationTest):
             message_data = {"type": "all", "extract_page": None}
             message = json.dumps(message_data).encode('utf-8')
             
+            self.triggered_at = datetime.now(timezone.utc)
             future = self.publisher.publish(topic_path, message)
             message_id = future.result()
             
@@ -73,44 +77,43 @@ class ApiExtractTester(BaseIntegrationTest):
             return False
 
     def _monitor_function(self) -> bool:
-        """Monitor function logs for completion."""
-        self.log_info("Monitoring function logs...")
-        
-        function_name = self.config.get_resource_name('api_extract_function')
-        start_time = datetime.utcnow()
-        timeout = timedelta(minutes=10)
-        
-        while datetime.utcnow() - start_time < timeout:
-            filter_str = f'''
-            resource.type="cloud_function"
-            resource.labels.function_name="{function_name}"
-            timestamp>="{start_time.isoformat()}Z"
-            '''
-            
-            try:
-                entries = list(self.logging_client.list_entries(
-                    filter_=filter_str,
-                    order_by='timestamp desc',
-                    max_results=20
-                ))
-                
-                for entry in entries:
-                    log_text = str(entry.payload)
-                    
-                    if "Triggering Dataproc" in log_text:
-                        self.log_success("Function completed successfully")
-                        return True
-                    elif "Error" in log_text:
-                        self.log_error(f"Function error: {log_text}")
-                        return False
-                
-            except Exception as e:
-                self.log_warning(f"Error reading logs: {e}")
-            
-            time.sleep(30)
-        
-        self.log_error("Timeout waiting for function completion")
-        return False
+        """Wait for the extraction job document to report completion."""
+        self.log_info("Waiting for the extraction to complete...")
+
+        test_date = self.config.get('test_date')
+        job_ref = self.firestore_client.collection(
+            'extraction_jobs').document(test_date)
+        started_after = self.triggered_at - CLOCK_SKEW
+
+        def finished(job):
+            # Ignore the document left by an earlier run on the same date
+            created_at = job.get('created_at')
+            if not created_at or created_at < started_after:
+                return False
+            failed = [page for page in job.get('completed_pages', {})
+                      .values() if page.get('status') == 'failed']
+            return job.get('dataproc_triggered') or failed
+
+        job = self.wait_for_document(
+            job_ref, finished, f"extraction job {test_date}",
+            timeout=timedelta(minutes=10).total_seconds()
+        )
+        if job is None:
+            return False
+
+        pages = job.get('completed_pages', {})
+        failed = sorted(int(number) for number, page in pages.items()
+                        if page.get('status') == 'failed')
+        self.results['total_pages'] = job.get('total_pages')
+        self.results['run_id'] = job.get('run_id')
+
+        if failed:
+            self.log_error(f"Extraction failed for pages: {failed}")
+            return False
+
+        self.log_success(f"Function completed successfully: "
+                         f"{len(pages)}/{job.get('total_pages')} pages")
+        return True
 
     def _verify_files(self) -> bool:
         """Verify files were created in bronze bucket."""
@@ -3,10 +3,13 @@
 BigQuery validation tests for the brewery data pipeline.
 """
 
-import time
 import logging
 from google.cloud import bigquery
 from .base_test import BaseIntegrationTest
+from .bigquery_validation import (
+    validate_partition, record_validation, DEFAULT_MAXIMUM_BYTES_BILLED,
+    QUALITY_THRESHOLD
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,15 +28,14 @@ class BigQueryTester(BaseIntegrationTest):
         self.bigquery_client = bigquery.Client(
             project=config.get('data_project'), credentials=credentials
         )
+        self.metrics = None
 
     def _execute_tests(self) -> bool:
         """Run all BigQuery validation tests."""
-        # Wait for data processing
-        self.log_info("Waiting for data processing...")
-        time.sleep(120)
-        
         tests = [
             self._validate_table_exists,
+            self._wait_for_partition,
+            self._run_validation,
             self._validate_data_loaded,
             self._validate_data_quality
         ]
@@ -64,93 +66,94 @@ class BigQueryTester(BaseIntegrationTest):
             self.results['table_exists'] = False
             return False
 
-    def _validate_data_loaded(self) -> bool:
-        """Validate that data was loaded for the test date."""
-        self.log_info("Checking data for test date...")
-        
+    def _wait_for_partition(self) -> bool:
+        """Wait for the partition of the test date to be written."""
         table_id = self.config.get_resource_name('bigquery_table')
-        test_date = self.config.get('test_date')
-        
-        query = f"""
-        SELECT
-            COUNT(*) as record_count,
-            COUNT(DISTINCT id_brewery) as unique_breweries
-        FROM `{table_id}`
-        WHERE DATE(source_date) = '{test_date}'
-        """
-        
+        partition_id = self.config.get('test_date').replace('-', '')
+
+        def partition_exists():
+            return partition_id in self.bigquery_client.list_partitions(
+                table_id)
+
+        if not self.wait_for(partition_exists, f"partition {partition_id}",
+                             timeout=self.config.get('timeout', 1800),
+                             initial_interval=5, max_interval=60):
+            self.log_error(f"Partition {partition_id} was not written")
+            return False
+
+        self.log_success(f"Partition {partition_id} is available")
+        return True
+
+    def _run_validation(self) -> bool:
+        """Compute all partition metrics in one scan and record them."""
+        self.log_info("Validating the test date partition...")
+
+        table_id = self.config.get_resource_name('bigquery_table')
+
         try:
-            query_job = self.bigquery_client.query(query)
-            results = query_job.result()
-            
-            for row in results:
-                record_count = row.record_count
-                unique_breweries = row.unique_breweries
-                
-                self.log_info(f"Records: {record_count}")
-                self.log_info(f"Unique breweries: {unique_breweries}")
-                
-                self.results['records_for_date'] = record_count
-                self.results['unique_breweries'] = unique_breweries
-                
-                if record_count > 0:
-                    self.log_success("Data loaded successfully!")
-                    return True
-                else:
-                    self.log_error(f"No records found for {test_date}")
-                    return False
-                    
+            self.metrics = validate_partition(
+                self.bigquery_client, table_id, self.config.get('test_date'),
+                self.config.get('max_bytes_billed',
+                                DEFAULT_MAXIMUM_BYTES_BILLED)
+            )
         except Exception as e:
             self.log_error(f"Error querying data: {e}")
             return False
 
+        self.log_info(f"Scanned {self.metrics['bytes_processed']} bytes "
+                      f"(estimated {self.metrics['bytes_estimated']}, "
+                      f"billed {self.metrics['bytes_billed']})")
+        self.results['bytes_billed'] = self.metrics['bytes_billed']
+
+        record_validation(
+            self.bigquery_client,
+            self.config.get_resource_name('validation_history_table'),
+            self.metrics, source='integration-test'
+        )
+        return True
+
+    def _validate_data_loaded(self) -> bool:
+        """Validate that data was loaded for the test date."""
+        self.log_info("Checking data for test date...")
+
+        if self.metrics is None:
+            return False
+
+        record_count = self.metrics['total_records']
+        unique_breweries = self.metrics['unique_breweries']
+
+        self.log_info(f"Records: {record_count}")
+        self.log_info(f"Unique breweries: {unique_breweries}")
+
+        self.results['records_for_date'] = record_count
+        self.results['unique_breweries'] = unique_breweries
+
+        if record_count > 0:
+            self.log_success("Data loaded successfully!")
+            return True
+        else:
+            self.log_error(f"No records found for "
+                           f"{self.config.get('test_date')}")
+            return False
+
     def _validate_data_quality(self) -> bool:
         """Validate data quality metrics."""
         self.log_info("Checking data quality...")
-        
-        table_id = self.config.get_resource_name('bigquery_table')
-        test_date = self.config.get('test_date')
-        
-        query = f"""
-        SELECT
-            COUNT(*) as total_records,
-            COUNT(CASE WHEN id_brewery IS NULL THEN 1 END) as null_ids,
-            COUNT(CASE WHEN name_brewery IS NULL OR name_brewery = ''
-                  THEN 1 END) as null_names
-        FROM `{table_id}`
-        WHERE DATE(source_date) = '{test_date}'
-        """
-        
-        try:
-            query_job = self.bigquery_client.query(query)
-            results = query_job.result()
-            
-            for row in results:
-                total = row.total_records
-                null_ids = row.null_ids
-                null_names = row.null_names
-                
-                self.log_info(f"Total records: {total}")
-                self.log_info(f"Null IDs: {null_ids}")
-                self.log_info(f"Null names: {null_names}")
-                
-                # Quality score
-                quality_issues = null_ids + null_names
-                if total > 0:
-                    quality_score = 1 - (quality_issues / total)
-                else:
-                    quality_score = 0
-                
-                self.log_info(f"Quality score: {quality_score:.2%}")
-                self.results['quality_score'] = quality_score
-                
-                if quality_score >= 0.9:  # 90% threshold
-                    self.log_success("Data quality check passed!")
-                    return True
-                else:
-                    self.log_warning("Data quality below threshold")
-                    return False
-                    
-        except Exception as e:
-            self.log_error(f"Error checking data quality: {e}")
+
+        if self.metrics is None:
+            return False
+
+        self.log_info(f"Total records: {self.metrics['total_records']}")
+        self.log_info(f"Null IDs: {self.metrics['null_ids']}")
+        self.log_info(f"Null names: {self.metrics['null_names']}")
+
+        quality_score = self.metrics['quality_score']
+        self.log_info(f"Quality score: {quality_score:.2%}")
+        self.results['quality_score'] = quality_score
+
+        if quality_score >= QUALITY_THRESHOLD:
+            self.log_success("Data quality check passed!")
+            return True
+        else:
+            self.log_warning("Data quality below threshold")
             return False
@@ -3,15 +3,17 @@
 Dataproc workflow tests for the brewery data pipeline.
 """
 
-import time
 import logging
-from datetime import datetime, timedelta
-from google.cloud import logging as cloud_logging
+from datetime import datetime, timedelta, timezone
+from google.cloud import firestore
 from google.cloud import dataproc_v1 as dataproc
 from .base_test import BaseIntegrationTest
 
 logger = logging.getLogger(__name__)
 
+# Tolerance between the runner clock and the function timestamps
+CLOCK_SKEW = timedelta(minutes=1)
+
 
 class DataprocTester(BaseIntegrationTest):
     """Tests the trigger-dataproc function and Dataproc job execution."""
@@ -26,16 +28,17 @@ class DataprocTester(BaseIntegrationTest):
         region = config.get('region')
         
         # Initialize clients
-        self.logging_client = cloud_logging.Client(
+        self.firestore_client = firestore.Client(
             project=project, credentials=credentials
         )
         
         # Dataproc client
         endpoint = f"{region}-dataproc.googleapis.com:443"
         client_options = {"api_endpoint": endpoint}
-        self.dataproc_client = dataproc.JobControllerClient(
+        self.workflow_client = dataproc.WorkflowTemplateServiceClient(
             client_options=client_options, credentials=credentials
         )
+        self.started_at = datetime.now(timezone.utc)
 
     def _execute_tests(self) -> bool:
         """Run all Dataproc tests."""
@@ -51,110 +54,71 @@ class DataprocTester(BaseIntegrationTest):
         return True
 
     def _monitor_trigger_function(self) -> bool:
-        """Monitor trigger-dataproc function execution."""
-        self.log_info("Monitoring trigger-dataproc function...")
-        
-        function_name = self.config.get_resource_name(
-            'trigger_dataproc_function'
+        """Wait for trigger-dataproc to record the workflow operation."""
+        self.log_info("Waiting for trigger-dataproc to start the workflow...")
+
+        test_date = self.config.get('test_date')
+        job_ref = self.firestore_client.collection(
+            'extraction_jobs').document(test_date)
+        started_after = self.started_at - CLOCK_SKEW
+
+        def workflow_started(job):
+            started = job.get('dataproc_started_at')
+            return (job.get('dataproc_operation') and started
+                    and started >= started_after)
+
+        job = self.wait_for_document(
+            job_ref, workflow_started, "Dataproc workflow start",
+            timeout=timedelta(minutes=15).total_seconds()
         )
-        start_time = datetime.utcnow()
-        timeout = timedelta(minutes=15)
-        
-        while datetime.utcnow() - start_time < timeout:
-            filter_str = f'''
-            resource.type="cloud_function"
-            resource.labels.function_name="{function_name}"
-            timestamp>="{start_time.isoformat()}Z"
-            '''
-            
-            try:
-                entries = list(self.logging_client.list_entries(
-                    filter_=filter_str,
-                    order_by='timestamp desc',
-                    max_results=20
-                ))
-                
-                for entry in entries:
-                    log_text = str(entry.payload)
-                    
-                    if "job" in log_text.lower():
-                        self.log_success("Dataproc job triggered")
-                        self.results['trigger_executed'] = True
-                        return True
-                    
-                    if "Error" in log_text or entry.severity_name == "ERROR":
-                        self.log_error(f"Trigger function error: {log_text}")
-                        return False
-                
-            except Exception as e:
-                self.log_warning(f"Error reading trigger logs: {e}")
-            
-            time.sleep(30)
-        
-        # Fallback: check for running jobs
-        self.log_info("Checking for active Dataproc jobs...")
-        try:
-            jobs = self.dataproc_client.list_jobs(
-                request={
-                    "project_id": self.config.get('project'),
-                    "region": self.config.get('region')
-                }
-            )
-            
-            for job in jobs:
-                if job.status.state in [
-                    dataproc.JobStatus.State.PENDING,
-                    dataproc.JobStatus.State.RUNNING,
-                    dataproc.JobStatus.State.DONE
-                ]:
-                    self.log_success(
-                        f"Found active job: {job.reference.job_id}"
-                    )
-                    self.results['job_id'] = job.reference.job_id
-                    return True
-                    
-        except Exception as e:
-            self.log_warning(f"Could not list jobs: {e}")
-        
-        self.log_error("Could not verify trigger-dataproc execution")
-        return False
+        if job is None:
+            return False
+
+        self.results['trigger_executed'] = True
+        self.results['operation'] = job['dataproc_operation']
+        self.log_success(f"Dataproc workflow started: "
+                         f"{job['dataproc_operation']}")
+        return True
+
+    def _workflow_metadata(self, operation):
+        """Decode the WorkflowMetadata of a workflow operation."""
+        return dataproc.WorkflowMetadata.deserialize(
+            operation.metadata.value)
 
     def _monitor_dataproc_job(self) -> bool:
-        """Monitor Dataproc job completion."""
-        self.log_info("Monitoring Dataproc job...")
-        
-        job_id = self.results.get('job_id')
-        if not job_id:
-            self.log_warning("No job ID available, skipping job monitoring")
+        """Wait for the workflow operation to complete."""
+        self.log_info("Waiting for the Dataproc workflow...")
+
+        operation_name = self.results.get('operation')
+        if not operation_name:
+            self.log_warning("No workflow operation available, skipping")
             return True  # Don't fail the test
-        
-        start_time = datetime.utcnow()
-        timeout = timedelta(minutes=15)
-        
-        while datetime.utcnow() - start_time < timeout:
-            try:
-                job = self.dataproc_client.get_job(
-                    request={
-                        "project_id": self.config.get('project'),
-                        "region": self.config.get('region'),
-                        "job_id": job_id
-                    }
-                )
-                
-                state = job.status.state
-                self.log_info(f"Job state: {state.name}")
-                
-                if state == dataproc.JobStatus.State.DONE:
-                    self.log_success("Dataproc job completed successfully")
-                    return True
-                elif state == dataproc.JobStatus.State.ERROR:
-                    self.log_error(f"Job failed: {job.status.details}")
-                    return False
-                
-            except Exception as e:
-                self.log_warning(f"Error checking job status: {e}")
-            
-            time.sleep(60)
-        
-        self.log_warning("Job monitoring timeout, continuing...")
-        return True  # Don't fail the test, continue to BigQuery validation
+
+        def operation_done():
+            operation = self.workflow_client.get_operation(
+                request={"name": operation_name}
+            )
+            return operation if operation.done else None
+
+        operation = self.wait_for(
+            operation_done, "Dataproc workflow completion",
+            timeout=self.config.get('timeout', 1800),
+            initial_interval=10, max_interval=60
+        )
+        if operation is None:
+            self.log_warning("Workflow monitoring timeout, continuing...")
+            return True  # Don't fail the test, continue to BigQuery
+
+        metadata = self._workflow_metadata(operation)
+        for node in metadata.graph.nodes:
+            self.log_info(f"Step {node.step_id}: {node.state.name} "
+                          f"(job {node.job_id})")
+        self.results['job_ids'] = [node.job_id
+                                   for node in metadata.graph.nodes]
+
+        if operation.error.message:
+            self.log_error(f"Workflow failed: {operation.error.message}")
+            return False
+
+        self.log_success("Dataproc workflow completed successfully")
+        return True
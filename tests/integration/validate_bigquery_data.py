@@ -1,172 +1,98 @@
 #!/usr/bin/env python3
 """
 Script para validação detalhada dos dados do BigQuery após teste de integração.
-Uso: python scripts/validate_bigquery_data.py [data-project] [test-date]
+Uso: python tests/integration/validate_bigquery_data.py <data-project> [test-date] [branch-hash]
 """
 
+import os
 import sys
 from datetime import date
 from google.cloud import bigquery
 
+# Add the tests directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
 
-def validate_brewery_data(data_project, test_date=None):
+from integration.bigquery_validation import (
+    validate_partition, record_validation, recent_validations,
+    DEFAULT_MAXIMUM_BYTES_BILLED
+)
+
+
+def validate_brewery_data(data_project, test_date=None, branch_hash='',
+                          maximum_bytes_billed=DEFAULT_MAXIMUM_BYTES_BILLED):
     """Valida os dados carregados no BigQuery"""
     
     if test_date is None:
         test_date = date.today().strftime('%Y-%m-%d')
     
     client = bigquery.Client(project=data_project)
-    table_id = f"{data_project}.brwy_data.breweries"
+    dataset_id = f"{data_project}.breweries_foundation" \
+        f"{branch_hash.replace('-', '_')}"
+    table_id = f"{dataset_id}.breweries_all_data"
+    history_table = f"{dataset_id}.validation_history"
     
     print(f"🔍 Validating BigQuery data for date: {test_date}")
     print(f"📊 Table: {table_id}")
     print("=" * 50)
     
-    # Query 1: Basic record count for the test date
-    query1 = f"""
-    SELECT
-        COUNT(*) as total_records,
-        COUNT(DISTINCT id) as unique_breweries,
-        COUNT(DISTINCT brewery_type) as brewery_types,
-        COUNT(DISTINCT state) as states_count
-    FROM `{table_id}`
-    WHERE DATE(processed_date) = '{test_date}'
-    """
-    
     try:
-        print("📈 Query 1: Basic statistics")
-        results = client.query(query1).result()
-        
-        for row in results:
-            print(f"  ✅ Total records: {row.total_records}")
-            print(f"  ✅ Unique breweries: {row.unique_breweries}")
-            print(f"  ✅ Brewery types: {row.brewery_types}")
-            print(f"  ✅ States represented: {row.states_count}")
-            
-            if row.total_records == 0:
-                print(f"  ❌ No records found for date {test_date}")
-                return False
-            else:
-                print("  ✅ Data validation passed!")
-                
+        metrics = validate_partition(client, table_id, test_date,
+                                     maximum_bytes_billed)
     except Exception as e:
-        print(f"  ❌ Error executing query 1: {e}")
+        print(f"  ❌ Error executing validation query: {e}")
         return False
-    
-    # Query 2: Data quality checks
-    query2 = f"""
-    SELECT
-        COUNT(*) as total_records,
-        COUNT(CASE WHEN id IS NULL THEN 1 END) as null_ids,
-        COUNT(CASE WHEN name IS NULL OR name = '' THEN 1 END) as null_names,
-        COUNT(CASE WHEN brewery_type IS NULL THEN 1 END) as null_types,
-        COUNT(CASE WHEN state IS NULL THEN 1 END) as null_states,
-        MIN(processed_date) as min_processed_date,
-        MAX(processed_date) as max_processed_date
-    FROM `{table_id}`
-    WHERE DATE(processed_date) = '{test_date}'
-    """
-    
-    try:
-        print("\n🔍 Query 2: Data quality checks")
-        results = client.query(query2).result()
-        
-        for row in results:
-            print(f"  📊 Total records: {row.total_records}")
-            print(f"  🔍 Null IDs: {row.null_ids}")
-            print(f"  🔍 Null names: {row.null_names}")
-            print(f"  🔍 Null types: {row.null_types}")
-            print(f"  🔍 Null states: {row.null_states}")
-            print(f"  📅 Min processed date: {row.min_processed_date}")
-            print(f"  📅 Max processed date: {row.max_processed_date}")
-            
-            # Validate data quality
-            quality_issues = row.null_ids + row.null_names
-            # More than 10% issues
-            if quality_issues > row.total_records * 0.1:
-                msg = f"  ⚠️ Data quality warning: {quality_issues} issues"
-                print(msg)
-            else:
-                print("  ✅ Data quality check passed!")
 
-    except Exception as e:
-        print(f"  ❌ Error executing query 2: {e}")
-        return False
+    print(f"💰 Bytes: estimated {metrics['bytes_estimated']}, "
+          f"processed {metrics['bytes_processed']}, "
+          f"billed {metrics['bytes_billed']}")
 
-    # Query 3: Brewery type distribution
-    query3 = f"""
-    SELECT
-        brewery_type,
-        COUNT(*) as count,
-        ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER(), 2) as percentage
-    FROM `{table_id}`
-    WHERE DATE(processed_date) = '{test_date}'
-        AND brewery_type IS NOT NULL
-    GROUP BY brewery_type
-    ORDER BY count DESC
-    """
-    
-    try:
-        print("\n📊 Query 3: Brewery type distribution")
-        results = client.query(query3).result()
-        
-        for row in results:
-            print(f"  🍺 {row.brewery_type}: {row.count} ({row.percentage}%)")
-            
-    except Exception as e:
-        print(f"  ❌ Error executing query 3: {e}")
-        return False
-    
-    # Query 4: State distribution (top 10)
-    query4 = f"""
-    SELECT
-        state,
-        COUNT(*) as count
-    FROM `{table_id}`
-    WHERE DATE(processed_date) = '{test_date}'
-        AND state IS NOT NULL
-    GROUP BY state
-    ORDER BY count DESC
-    LIMIT 10
-    """
-    
-    try:
-        print("\n🗺️ Query 4: Top 10 states by brewery count")
-        results = client.query(query4).result()
-        
-        for row in results:
-            print(f"  📍 {row.state}: {row.count} breweries")
-            
-    except Exception as e:
-        print(f"  ❌ Error executing query 4: {e}")
-        return False
-    
-    # Query 5: Recent processing history
-    query5 = f"""
-    SELECT
-        DATE(processed_date) as process_date,
-        COUNT(*) as record_count,
-        COUNT(DISTINCT id) as unique_breweries
-    FROM `{table_id}`
-    WHERE DATE(processed_date) >= DATE_SUB('{test_date}', INTERVAL 7 DAY)
-    GROUP BY DATE(processed_date)
-    ORDER BY process_date DESC
-    """
+    print("\n📈 Basic statistics")
+    print(f"  ✅ Total records: {metrics['total_records']}")
+    print(f"  ✅ Unique breweries: {metrics['unique_breweries']}")
+    print(f"  ✅ Brewery types: {metrics['brewery_types']}")
+    print(f"  ✅ States represented: {metrics['states_count']}")
 
-    try:
-        print("\n📅 Query 5: Processing history (last 7 days)")
-        results = client.query(query5).result()
+    print("\n🔍 Data quality checks")
+    print(f"  🔍 Null IDs: {metrics['null_ids']}")
+    print(f"  🔍 Null names: {metrics['null_names']}")
+    print(f"  🔍 Null types: {metrics['null_types']}")
+    print(f"  🔍 Null states: {metrics['null_states']}")
+    print(f"  📅 Min processing timestamp: "
+          f"{metrics['min_processing_timestamp']}")
+    print(f"  📅 Max processing timestamp: "
+          f"{metrics['max_processing_timestamp']}")
+
+    total = metrics['total_records']
+    print("\n📊 Brewery type distribution")
+    for brewery_type, count in metrics['type_distribution'].items():
+        print(f"  🍺 {brewery_type}: {count} ({count * 100 / total:.2f}%)")
+
+    print("\n🗺️ Top 10 states by brewery count")
+    for state, count in metrics['top_states'].items():
+        print(f"  📍 {state}: {count} breweries")
 
-        for row in results:
-            msg = f"  📅 {row.process_date}: {row.record_count} records, "
-            msg += f"{row.unique_breweries} unique breweries"
-            print(msg)
+    record_validation(client, history_table, metrics, source='cli')
 
+    # History comes from previous validations, not from another scan
+    try:
+        print("\n📅 Validation history (last 7 days)")
+        for row in recent_validations(client, history_table, table_id,
+                                      test_date):
+            print(f"  📅 {row['source_date']}: {row['total_records']} "
+                  f"records, {row['unique_breweries']} unique breweries, "
+                  f"quality {row['quality_score']:.2%}")
     except Exception as e:
-        print(f"  ❌ Error executing query 5: {e}")
+        print(f"  ⚠️ Could not read validation history: {e}")
+
+    if total == 0:
+        print(f"\n  ❌ No records found for date {test_date}")
         return False
+    if not metrics['passed']:
+        print(f"  ⚠️ Data quality warning: "
+              f"{metrics['null_ids'] + metrics['null_names']} issues")
 
-    print("\n🎉 All validation queries completed successfully!")
+    print("\n🎉 Validation completed successfully!")
     return True
 
 
@@ -174,16 +100,17 @@ def main():
     """Main function"""
     if len(sys.argv) < 2:
         print("Usage: python validate_bigquery_data.py <data-project> "
-              "[test-date]")
+              "[test-date] [branch-hash]")
         print("Example: python validate_bigquery_data.py "
               "my-project-data-dev 2025-08-05")
         sys.exit(1)
 
     data_project = sys.argv[1]
     test_date = sys.argv[2] if len(sys.argv) > 2 else None
+    branch_hash = sys.argv[3] if len(sys.argv) > 3 else ''
 
     try:
-        success = validate_brewery_data(data_project, test_date)
+        success = validate_brewery_data(data_project, test_date, branch_hash)
         if success:
             print("\n✅ BigQuery validation completed successfully!")
             sys.exit(0)
@@ -5,8 +5,13 @@ Simplified main test runner for integration tests.
 
 import sys
 import os
+import json
+import time
 import argparse
 import logging
+import threading
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 
 # Add the tests directory to Python path
@@ -18,55 +23,179 @@ from integration.test_api_extract import ApiExtractTester
 from integration.test_dataproc import DataprocTester
 from integration.test_bigquery import BigQueryTester
 
-# Configure logging
+# Configure logging (thread name = test step, steps run concurrently)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s'
 )
 logger = logging.getLogger(__name__)
 
-def run_integration_tests(config: TestConfig) -> bool:
+# Test steps and the steps they depend on. Infrastructure checks don't
+# depend on the pipeline run and run alongside it.
+TEST_STEPS = [
+    (InfrastructureTester, []),
+    (ApiExtractTester, []),
+    (DataprocTester, [ApiExtractTester]),
+    (BigQueryTester, [DataprocTester])
+]
+
+
+def step_name(test_class) -> str:
+    """Step name of a tester class (same as its test_name)."""
+    return test_class.__name__.replace('Tester', '').lower()
+
+
+def run_step(tester, suite_start: float) -> dict:
+    """Run one tester in a worker thread and time it."""
+    threading.current_thread().name = tester.test_name
+    started = time.time()
+    success = tester.run_tests()
+
+    return {
+        'status': 'passed' if success else 'failed',
+        'success': success,
+        'started_at': started - suite_start,
+        'duration': tester.get_duration(),
+        'details': tester.get_results()
+    }
+
+
+def run_step_graph(testers: dict, dependencies: dict, max_workers: int,
+                   continue_on_failure: bool, suite_start: float) -> dict:
+    """
+    Run steps as soon as their dependencies passed, streaming results as
+    they finish. Dependents of a failed step are skipped; without
+    continue_on_failure no new step starts after a failure.
+    """
+    results = {}
+    pending = list(testers)
+    running = {}
+    stop = False
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name in list(pending):
+                failed = [dependency for dependency in dependencies[name]
+                          if dependency in results
+                          and not results[dependency]['success']]
+                if stop or failed:
+                    reason = (f"dependency failed: {', '.join(failed)}"
+                              if failed else "stopped after a failure")
+                    logger.warning(f"⏭️  Skipping {name} tests ({reason})")
+                    results[name] = {'status': 'skipped', 'success': False,
+                                     'started_at': None, 'duration': 0,
+                                     'details': {'skipped': reason}}
+                    pending.remove(name)
+                elif all(dependency in results
+                         for dependency in dependencies[name]):
+                    logger.info(f"🧪 Running {name} tests...")
+                    future = executor.submit(run_step, testers[name],
+                                             suite_start)
+                    running[future] = name
+                    pending.remove(name)
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                duration = results[name]['duration']
+
+                if results[name]['success']:
+                    logger.info(f"✅ {name} tests passed! "
+                                f"({duration:.2f}s)")
+                else:
+                    logger.error(f"❌ {name} tests failed! "
+                                 f"({duration:.2f}s)")
+                    if not continue_on_failure:
+                        logger.error("🛑 Stopping tests due to failure")
+                        stop = True
+
+    return results
+
+
+def build_report(config: TestConfig, results: dict, dependencies: dict,
+                 total_duration: float) -> dict:
+    """Machine-readable timing report of the run."""
+    executed = [name for name in results
+                if results[name]['status'] != 'skipped']
+    return {
+        'created_at': datetime.now().isoformat(),
+        'test_date': config.get('test_date'),
+        'project': config.get('project'),
+        'branch_hash': config.get('branch_hash'),
+        'success': all(r['success'] for r in results.values()),
+        'total_duration': total_duration,
+        'slowest_step': max(executed, key=lambda n: results[n]['duration'],
+                            default=None),
+        'steps': [dict(name=name, depends_on=dependencies[name], **result)
+                  for name, result in results.items()]
+    }
+
+
+def write_junit(report: dict, path: str):
+    """Write the report as a JUnit XML test suite (one case per step)."""
+    steps = report['steps']
+    suite = ET.Element('testsuite', {
+        'name': 'integration',
+        'tests': str(len(steps)),
+        'failures': str(sum(s['status'] == 'failed' for s in steps)),
+        'skipped': str(sum(s['status'] == 'skipped' for s in steps)),
+        'time': f"{report['total_duration']:.3f}",
+        'timestamp': report['created_at']
+    })
+
+    for step in steps:
+        case = ET.SubElement(suite, 'testcase', {
+            'classname': 'integration',
+            'name': step['name'],
+            'time': f"{step['duration']:.3f}"
+        })
+        if step['status'] == 'failed':
+            ET.SubElement(case, 'failure', {
+                'message': str(step['details'].get('error',
+                                                   'step failed'))
+            })
+        elif step['status'] == 'skipped':
+            ET.SubElement(case, 'skipped', {
+                'message': step['details']['skipped']
+            })
+        ET.SubElement(case, 'system-out').text = json.dumps(
+            step['details'], indent=2, default=str)
+
+    ET.ElementTree(suite).write(path, encoding='utf-8',
+                                xml_declaration=True)
+
+
+def run_integration_tests(config: TestConfig, max_workers: int = 4,
+                          report_path: str = None,
+                          junit_path: str = None) -> bool:
     """Run all integration tests."""
     logger.info("🚀 Starting integration test suite...")
     logger.info(f"📋 Config: {config}")
     
-    # Test components in order
-    test_classes = [
-        InfrastructureTester,
-        ApiExtractTester,
-        DataprocTester,
-        BigQueryTester
-    ]
-    
-    results = {}
     start_time = datetime.now()
-    
-    for test_class in test_classes:
-        test_name = test_class.__name__.replace('Tester', '').lower()
-        logger.info(f"\n{'='*50}")
-        logger.info(f"🧪 Running {test_name} tests...")
-        logger.info(f"{'='*50}")
-        
-        tester = test_class(config)
-        success = tester.run_tests()
-        
-        results[test_name] = {
-            'success': success,
-            'duration': tester.get_duration(),
-            'details': tester.get_results()
-        }
-        
-        if success:
-            logger.info(f"✅ {test_name} tests passed!")
-        else:
-            logger.error(f"❌ {test_name} tests failed!")
-            if not config.get('continue_on_failure', False):
-                logger.error("🛑 Stopping tests due to failure")
-                break
+    suite_start = time.time()
+
+    # Testers are created up front: the Dataproc tester only accepts a
+    # workflow started after it was created
+    testers = {}
+    dependencies = {}
+    for test_class, depends_on in TEST_STEPS:
+        name = step_name(test_class)
+        testers[name] = test_class(config)
+        dependencies[name] = [step_name(d) for d in depends_on]
+
+    results = run_step_graph(testers, dependencies, max_workers,
+                             config.get('continue_on_failure', False),
+                             suite_start)
     
     # Print summary
     total_duration = (datetime.now() - start_time).total_seconds()
-    overall_success = all(r['success'] for r in results.values())
+    report = build_report(config, results, dependencies, total_duration)
+    overall_success = report['success']
     
     logger.info(f"\n{'='*60}")
     logger.info("📊 INTEGRATION TEST SUMMARY")
@@ -76,10 +205,24 @@ def run_integration_tests(config: TestConfig) -> bool:
     logger.info(f"🏗️  Project: {config.get('project')}")
     
     logger.info("\n📋 Results:")
-    for name, result in results.items():
-        status = "✅ PASS" if result['success'] else "❌ FAIL"
-        duration = result['duration']
-        logger.info(f"  {name}: {status} ({duration:.2f}s)")
+    status_labels = {'passed': "✅ PASS", 'failed': "❌ FAIL",
+                     'skipped': "⏭️  SKIP"}
+    for step in report['steps']:
+        status = status_labels[step['status']]
+        started = ('-' if step['started_at'] is None
+                   else f"+{step['started_at']:.2f}s")
+        logger.info(f"  {step['name']}: {status} "
+                    f"({step['duration']:.2f}s, started {started})")
+    if report['slowest_step']:
+        logger.info(f"🐢 Slowest step: {report['slowest_step']}")
+
+    if report_path:
+        with open(report_path, 'w') as report_file:
+            json.dump(report, report_file, indent=2, default=str)
+        logger.info(f"📄 JSON report written to {report_path}")
+    if junit_path:
+        write_junit(report, junit_path)
+        logger.info(f"📄 JUnit report written to {junit_path}")
     
     status = "✅ SUCCESS" if overall_success else "❌ FAILED"
     logger.info(f"\n🎯 Final Result: {status}")
@@ -99,6 +242,10 @@ def parse_arguments():
     parser.add_argument('--timeout', type=int, default=1800, help='Timeout in seconds')
     parser.add_argument('--continue-on-failure', action='store_true', help='Continue on failure')
     parser.add_argument('--verbose', action='store_true', help='Verbose logging')
+    parser.add_argument('--max-bytes-billed', type=int, default=1024 ** 3, help='BigQuery validation scan limit in bytes')
+    parser.add_argument('--max-workers', type=int, default=4, help='Test steps run concurrently')
+    parser.add_argument('--report', default=None, help='JSON timing report path')
+    parser.add_argument('--junit', default=None, help='JUnit XML report path')
 
     return parser.parse_args()
 
@@ -116,7 +263,8 @@ def main():
         sys.exit(1)
     
     try:
-        success = run_integration_tests(config)
+        success = run_integration_tests(config, args.max_workers,
+                                        args.report, args.junit)
         sys.exit(0 if success else 1)
     except KeyboardInterrupt:
         logger.error("🛑 Tests interrupted")
@@ -0,0 +1,7 @@
+"""
+Offline harness: runs the whole pipeline on one machine with local
+stand-ins for the Open Brewery DB API, Pub/Sub, Firestore, GCS and
+BigQuery.
+"""
+
+__version__ = "1.0.0"
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark: load_brewery_data and transform_brewery_data in
+local-mode Spark over synthetic bronze data at a multiple of today's
+volume. Each scale runs in its own process (python -m local.benchmark)
+so peak memory is not carried over between scales.
+"""
+
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+import logging
+from typing import Dict, Any
+
+from . import fakes
+from .synthetic import SyntheticBreweries, BASE_BREWERIES
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                         '..', '..'))
+DATAPROC_COMMON_DIR = os.path.join(REPO_ROOT, 'scr', 'dataproc',
+                                   'breweries', 'common')
+BENCHMARK_DATE = '2025-01-01'
+
+
+def directory_bytes(path: str) -> int:
+    """Total size of the files under a directory."""
+    total = 0
+    for directory, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(directory, name))
+                     for name in files)
+    return total
+
+
+def process_peak_rss_mb(pid: int) -> float:
+    """Peak resident memory of a process (Linux /proc), in MB."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def run_scale(scale: float, workdir: str, seed: int = 0,
+              spark_master: str = 'local[*]') -> Dict[str, Any]:
+    """Generate bronze data at a scale and time the load and transform."""
+    storage_dir = os.path.join(workdir, f"scale-{scale:g}", 'gcs')
+    fakes.install(storage_dir)
+    os.environ['BRWY_STORAGE_ROOT'] = f"file://{storage_dir}/"
+
+    if DATAPROC_COMMON_DIR not in sys.path:
+        sys.path.insert(0, DATAPROC_COMMON_DIR)
+
+    from pyspark.sql import SparkSession
+    import brewery_transform
+    from brewery_load import load_brewery_data
+    from brewery_transform import transform_brewery_data
+    from spark_tuning import plan_spark_config, apply_spark_config
+
+    records = int(BASE_BREWERIES * scale)
+    started = time.time()
+    bronze_bytes = SyntheticBreweries(seed=seed).write_bronze(
+        os.path.join(storage_dir, 'bronze'), BENCHMARK_DATE, records)
+    generate_seconds = time.time() - started
+    bronze_files = len(os.listdir(
+        os.path.join(storage_dir, 'bronze', BENCHMARK_DATE)))
+
+    sink_dir = os.path.join(storage_dir, '_bigquery')
+
+    def local_bigquery_sink(df, data_project_id, dataset_id, table_name,
+                            source_date, temp_bucket):
+        df.write.mode('overwrite').parquet(
+            f"file://{sink_dir}/{table_name}/source_date={source_date}")
+
+    brewery_transform.load_to_bigquery = local_bigquery_sink
+
+    builder = SparkSession.builder \
+        .master(spark_master) \
+        .appName(f"Breweries Scaling Benchmark - x{scale:g}") \
+        .config('spark.ui.showConsoleProgress', 'false')
+    spark = apply_spark_config(
+        builder, plan_spark_config(bronze_bytes, bronze_files),
+        bronze_bytes, bronze_files).getOrCreate()
+
+    try:
+        started = time.time()
+        load_count = load_brewery_data(spark, 'bronze', 'silver',
+                                       BENCHMARK_DATE)
+        load_seconds = time.time() - started
+
+        started = time.time()
+        transform_count = transform_brewery_data(
+            spark, 'silver', 'breweries_foundation', 'local',
+            BENCHMARK_DATE, 'bigquery-temp')
+        transform_seconds = time.time() - started
+
+        jvm_pid = spark.sparkContext._gateway.proc.pid \
+            if spark.sparkContext._gateway.proc else None
+        jvm_peak_mb = process_peak_rss_mb(jvm_pid) if jvm_pid else None
+    finally:
+        spark.stop()
+
+    return {
+        'scale': scale,
+        'records': records,
+        'bronze_bytes': bronze_bytes,
+        'bronze_files': bronze_files,
+        'generate_seconds': generate_seconds,
+        'load_records': load_count,
+        'load_seconds': load_seconds,
+        'silver_bytes': directory_bytes(os.path.join(storage_dir, 'silver')),
+        'transform_records': transform_count,
+        'transform_seconds': transform_seconds,
+        'output_bytes': directory_bytes(sink_dir),
+        # ru_maxrss is in KB on Linux
+        'python_peak_rss_mb':
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'jvm_peak_rss_mb': jvm_peak_mb
+    }
+
+
+def main():
+    """Run one scale and write its result as JSON (child process)."""
+    parser = argparse.ArgumentParser(description='Run one benchmark scale')
+    parser.add_argument('--scale', type=float, required=True)
+    parser.add_argument('--workdir', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--spark-master', default='local[*]')
+    parser.add_argument('--output', required=True,
+                        help='JSON file for the result')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    result = run_scale(args.scale, args.workdir, args.seed,
+                       args.spark_master)
+    with open(args.output, 'w') as output_file:
+        json.dump(result, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Fake Open Brewery DB server serving synthetic pages.
+"""
+
+import json
+import math
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, Any, List
+
+from .synthetic import SyntheticBreweries
+
+
+class FakeBreweryApi:
+    """Serves /breweries/meta and paged /breweries from a record source."""
+
+    def __init__(self, total_breweries: int, seed: int = 0,
+                 record_source=None, latency: float = 0.0):
+        self.total_breweries = total_breweries
+        # record_source(index) -> brewery dict
+        self.record_source = (record_source
+                              or SyntheticBreweries(seed=seed).record)
+        self.latency = latency
+        self.requests_served = 0
+        self._server = None
+        self._thread = None
+
+    def page(self, page: int, per_page: int) -> List[Dict[str, Any]]:
+        """Records of one page (empty past the last page)."""
+        start = (page - 1) * per_page
+        end = min(start + per_page, self.total_breweries)
+        return [self.record_source(index) for index in range(start, end)]
+
+    def start(self) -> str:
+        """Start the server on a free port and return its base URL."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = parse_qs(parsed.query)
+
+                if api.latency:
+                    threading.Event().wait(api.latency)
+
+                if parsed.path == '/v1/breweries/meta':
+                    per_page = int(params.get('per_page', ['50'])[0])
+                    body = {
+                        'total': api.total_breweries,
+                        'page': 1,
+                        'per_page': per_page,
+                        'pages': math.ceil(api.total_breweries / per_page)
+                    }
+                elif parsed.path == '/v1/breweries':
+                    body = api.page(int(params.get('page', ['1'])[0]),
+                                    int(params.get('per_page', ['50'])[0]))
+                else:
+                    self.send_error(404)
+                    return
+
+                api.requests_served += 1
+                content = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def stop(self):
+        """Stop the server."""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+"""
+In-memory / local-directory stand-ins for the Google Cloud clients used
+by the pipeline (Pub/Sub, Firestore, Cloud Storage, BigQuery and the
+Dataproc workflow client).
+
+install() registers them as google.cloud.* modules, so the Cloud
+Function and Dataproc code runs unchanged against local state.
+"""
+
+import base64
+import copy
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+import types
+import zlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+# --------------------------------------------------------------------------
+# Pub/Sub
+# --------------------------------------------------------------------------
+
+class LocalPubSub:
+    """Topic broker delivering messages to subscribed functions."""
+
+    def __init__(self, max_workers: int = 8):
+        self._subscribers: Dict[str, Callable] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='pubsub')
+        self._ids = itertools.count(1)
+        self._pending = 0
+        self._idle = threading.Condition()
+        self.published: Dict[str, int] = {}
+        self.errors: List[str] = []
+
+    def subscribe(self, topic: str, callback: Callable):
+        """Deliver messages of a topic to callback(event, context)."""
+        self._subscribers[topic] = callback
+
+    def publish(self, topic: str, data: bytes, **attributes) -> str:
+        """Queue a message for asynchronous delivery."""
+        message_id = str(next(self._ids))
+        self.published[topic] = self.published.get(topic, 0) + 1
+
+        callback = self._subscribers.get(topic)
+        if callback is None:
+            return message_id
+
+        event = {'data': base64.b64encode(data).decode('utf-8'),
+                 'attributes': dict(attributes)}
+        context = SimpleNamespace(
+            event_id=message_id,
+            timestamp=datetime.now(timezone.utc).strftime(
+                '%Y-%m-%dT%H:%M:%S.%fZ'),
+            resource={'name': topic})
+
+        with self._idle:
+            self._pending += 1
+        self._executor.submit(self._deliver, callback, event, context)
+        return message_id
+
+    def _deliver(self, callback, event, context):
+        try:
+            callback(event, context)
+        except Exception as e:
+            self.errors.append(f"{context.resource['name']}: {e}")
+            logger.error(f"Delivery to {context.resource['name']} "
+                         f"failed: {e}")
+        finally:
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Block until every published message has been handled."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+class _PublishFuture:
+    def __init__(self, message_id: str):
+        self._message_id = message_id
+
+    def result(self, timeout=None) -> str:
+        return self._message_id
+
+
+class FakePublisherClient:
+    """pubsub_v1.PublisherClient backed by the LocalPubSub broker."""
+
+    def publish(self, topic, data, **attributes):
+        return _PublishFuture(BROKER.publish(topic, data, **attributes))
+
+
+# --------------------------------------------------------------------------
+# Firestore
+# --------------------------------------------------------------------------
+
+_FIRESTORE_DATA: Dict[str, Dict[str, dict]] = {}
+_FIRESTORE_LOCK = threading.RLock()
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class FakeDocumentReference:
+    def __init__(self, collection: str, document_id: str):
+        self.collection_name = collection
+        self.id = document_id
+
+    def _docs(self):
+        return _FIRESTORE_DATA.setdefault(self.collection_name, {})
+
+    def get(self, transaction=None):
+        with _FIRESTORE_LOCK:
+            return FakeSnapshot(copy.deepcopy(self._docs().get(self.id)))
+
+    def set(self, data, merge=False):
+        with _FIRESTORE_LOCK:
+            current = self._docs().get(self.id) if merge else None
+            self._docs()[self.id] = {**(current or {}),
+                                     **copy.deepcopy(data)}
+
+    def update(self, data):
+        with _FIRESTORE_LOCK:
+            if self.id not in self._docs():
+                raise Exception(f"No document to update: {self.id}")
+            self._docs()[self.id].update(copy.deepcopy(data))
+
+
+class FakeCollectionReference:
+    def __init__(self, name: str):
+        self.name = name
+
+    def document(self, document_id: str):
+        return FakeDocumentReference(self.name, document_id)
+
+
+class FakeTransaction:
+    """Buffers writes until the transactional function returns."""
+
+    def __init__(self, max_attempts: int = 5):
+        self.max_attempts = max_attempts
+        self._writes = []
+
+    def update(self, reference, data):
+        self._writes.append((reference.update, data))
+
+    def set(self, reference, data, merge=False):
+        self._writes.append(
+            (lambda d: reference.set(d, merge=merge), data))
+
+    def _commit(self):
+        for write, data in self._writes:
+            write(data)
+        self._writes = []
+
+
+def fake_transactional(func):
+    """firestore.transactional: serialize the function and commit."""
+    def wrapper(transaction, *args, **kwargs):
+        with _FIRESTORE_LOCK:
+            result = func(transaction, *args, **kwargs)
+            transaction._commit()
+            return result
+    return wrapper
+
+
+class FakeFirestoreClient:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def collection(self, name: str):
+        return FakeCollectionReference(name)
+
+    def transaction(self, max_attempts: int = 5):
+        return FakeTransaction(max_attempts)
+
+
+def firestore_document(collection: str, document_id: str) -> dict:
+    """Current content of a fake Firestore document (or None)."""
+    with _FIRESTORE_LOCK:
+        return copy.deepcopy(
+            _FIRESTORE_DATA.get(collection, {}).get(document_id))
+
+
+def save_firestore(path: str):
+    """Write the fake Firestore to a file, for the Spark job processes."""
+    with _FIRESTORE_LOCK:
+        with open(path, 'w') as firestore_file:
+            json.dump(_FIRESTORE_DATA, firestore_file, default=str)
+
+
+def load_firestore(path: str):
+    """Replace the fake Firestore with a save_firestore() file."""
+    with open(path) as firestore_file:
+        data = json.load(firestore_file)
+    with _FIRESTORE_LOCK:
+        _FIRESTORE_DATA.clear()
+        _FIRESTORE_DATA.update(data)
+
+
+# --------------------------------------------------------------------------
+# Cloud Storage (one directory per bucket)
+# --------------------------------------------------------------------------
+
+STORAGE_DIR = None
+
+
+class FakeBlob:
+    def __init__(self, bucket, name: str):
+        self.bucket = bucket
+        self.name = name
+
+    @property
+    def _path(self):
+        return os.path.join(self.bucket.path, self.name)
+
+    @property
+    def size(self):
+        return os.path.getsize(self._path) if self.exists() else None
+
+    @property
+    def generation(self):
+        # Changes on every write, like a GCS object generation
+        return os.stat(self._path).st_mtime_ns if self.exists() else None
+
+    @property
+    def crc32c(self):
+        # CRC32 of the content stands in for CRC32C: the pipeline only
+        # compares checksums, so any content checksum behaves the same
+        if not self.exists():
+            return None
+        with open(self._path, 'rb') as blob_file:
+            digest = zlib.crc32(blob_file.read()).to_bytes(4, 'big')
+        return base64.b64encode(digest).decode('utf-8')
+
+    @property
+    def md5_hash(self):
+        if not self.exists():
+            return None
+        with open(self._path, 'rb') as blob_file:
+            digest = hashlib.md5(blob_file.read()).digest()
+        return base64.b64encode(digest).decode('utf-8')
+
+    @property
+    def updated(self):
+        if not self.exists():
+            return None
+        return datetime.fromtimestamp(os.path.getmtime(self._path),
+                                      tz=timezone.utc)
+
+    def exists(self, client=None):
+        return os.path.isfile(self._path)
+
+    def reload(self, client=None):
+        pass
+
+    def _check_generation(self, if_generation_match):
+        """Precondition of a write (0: the object must not exist)."""
+        if if_generation_match is None:
+            return
+        if (self.generation or 0) != if_generation_match:
+            raise Exception(f"412 Precondition failed: {self.name} is at "
+                            f"generation {self.generation}, expected "
+                            f"{if_generation_match}")
+
+    def upload_from_string(self, data, content_type=None,
+                           if_generation_match=None, **kwargs):
+        self._check_generation(if_generation_match)
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        # Write then rename so readers never see a partial object
+        temp_path = f"{self._path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as blob_file:
+            blob_file.write(data)
+        os.replace(temp_path, self._path)
+
+    def upload_from_filename(self, filename, content_type=None, **kwargs):
+        with open(filename, 'rb') as source:
+            self.upload_from_string(source.read())
+
+    def download_as_bytes(self, start=None, end=None, **kwargs):
+        # start and end are inclusive byte offsets, as in GCS
+        with open(self._path, 'rb') as blob_file:
+            blob_file.seek(start or 0)
+            if end is None:
+                return blob_file.read()
+            return blob_file.read(end - (start or 0) + 1)
+
+    def download_as_text(self, encoding='utf-8', **kwargs):
+        return self.download_as_bytes().decode(encoding)
+
+    def download_to_filename(self, filename, **kwargs):
+        with open(filename, 'wb') as target:
+            target.write(self.download_as_bytes())
+
+    def compose(self, sources, if_generation_match=None, **kwargs):
+        self._check_generation(if_generation_match)
+        self.upload_from_string(b''.join(source.download_as_bytes()
+                                         for source in sources))
+
+    def delete(self, **kwargs):
+        os.remove(self._path)
+
+
+class FakeBucket:
+    def __init__(self, name: str):
+        self.name = name
+        self.path = os.path.join(STORAGE_DIR, name)
+
+    def blob(self, name: str):
+        return FakeBlob(self, name)
+
+    def get_blob(self, name: str):
+        blob = FakeBlob(self, name)
+        return blob if blob.exists() else None
+
+    def exists(self, client=None):
+        return os.path.isdir(self.path)
+
+    def list_blobs(self, prefix: str = None, **kwargs):
+        blobs = []
+        for directory, _, files in os.walk(self.path):
+            for file_name in files:
+                if file_name.endswith('.tmp'):
+                    continue
+                name = os.path.relpath(os.path.join(directory, file_name),
+                                       self.path).replace(os.sep, '/')
+                if prefix is None or name.startswith(prefix):
+                    blobs.append(FakeBlob(self, name))
+        return sorted(blobs, key=lambda blob: blob.name)
+
+
+class FakeStorageClient:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def bucket(self, name: str):
+        return FakeBucket(name)
+
+    def get_bucket(self, name: str):
+        return FakeBucket(name)
+
+    def list_blobs(self, bucket_or_name, prefix: str = None, **kwargs):
+        bucket = (bucket_or_name if isinstance(bucket_or_name, FakeBucket)
+                  else FakeBucket(bucket_or_name))
+        return bucket.list_blobs(prefix=prefix)
+
+
+# --------------------------------------------------------------------------
+# BigQuery (streaming inserts kept in memory and in JSONL files)
+# --------------------------------------------------------------------------
+
+BIGQUERY_ROWS: Dict[str, List[dict]] = {}
+_BIGQUERY_LOCK = threading.Lock()
+
+
+class FakeBigQueryClient:
+    def __init__(self, project=None, *args, **kwargs):
+        self.project = project
+
+    def insert_rows_json(self, table, rows, **kwargs):
+        table_id = str(table)
+        with _BIGQUERY_LOCK:
+            BIGQUERY_ROWS.setdefault(table_id, []).extend(
+                copy.deepcopy(rows))
+            path = os.path.join(STORAGE_DIR, '_bigquery',
+                                f"{table_id}.jsonl")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'a') as table_file:
+                for row in rows:
+                    table_file.write(json.dumps(row, default=str) + '\n')
+        return []
+
+
+class _Parameters:
+    """Accepts any constructor arguments (query configuration objects)."""
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+def bigquery_rows(table_id: str) -> List[dict]:
+    """
+    Rows streamed to a table by every process sharing the storage
+    directory (functions in this process, Spark jobs in their own)
+    """
+    path = os.path.join(STORAGE_DIR, '_bigquery', f"{table_id}.jsonl")
+    if not os.path.isfile(path):
+        return []
+    with _BIGQUERY_LOCK, open(path) as table_file:
+        return [json.loads(line) for line in table_file if line.strip()]
+
+
+# --------------------------------------------------------------------------
+# Dataproc (workflow instantiations are recorded, not run)
+# --------------------------------------------------------------------------
+
+WORKFLOWS: List[dict] = []
+
+
+class FakeWorkflowTemplateServiceClient:
+    """
+    Records template instantiations; the harness runs the template jobs
+    in local Spark with the recorded parameters.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def instantiate_workflow_template(self, request):
+        WORKFLOWS.append(copy.deepcopy(request))
+        name = f"{request['name']}/operations/{len(WORKFLOWS)}"
+        # Reported as done with its cluster created: the harness runs
+        # the jobs after the function returns
+        metadata = SimpleNamespace(
+            template=request['name'], cluster_name='local',
+            create_cluster=SimpleNamespace(done=True, error=''))
+        return SimpleNamespace(operation=SimpleNamespace(name=name),
+                               metadata=metadata,
+                               done=lambda: True,
+                               result=lambda timeout=None: name)
+
+
+# --------------------------------------------------------------------------
+# Registration
+# --------------------------------------------------------------------------
+
+BROKER = None
+
+
+def _module(name: str, **attributes):
+    module = types.ModuleType(name)
+    for key, value in attributes.items():
+        setattr(module, key, value)
+    return module
+
+
+def install(storage_dir: str, max_workers: int = 8) -> LocalPubSub:
+    """
+    Register the fakes as google.cloud.{pubsub_v1,firestore,storage,
+    bigquery,dataproc_v1} and return the Pub/Sub broker
+    """
+    global BROKER, STORAGE_DIR
+    STORAGE_DIR = storage_dir
+    os.makedirs(storage_dir, exist_ok=True)
+    BROKER = LocalPubSub(max_workers=max_workers)
+    WORKFLOWS.clear()
+
+    modules = {
+        'pubsub_v1': _module('google.cloud.pubsub_v1',
+                             PublisherClient=FakePublisherClient),
+        'firestore': _module('google.cloud.firestore',
+                             Client=FakeFirestoreClient,
+                             transactional=fake_transactional),
+        'storage': _module('google.cloud.storage',
+                           Client=FakeStorageClient),
+        'bigquery': _module('google.cloud.bigquery',
+                            Client=FakeBigQueryClient,
+                            QueryJobConfig=_Parameters,
+                            ScalarQueryParameter=_Parameters,
+                            LoadJobConfig=_Parameters),
+        'dataproc_v1': _module(
+            'google.cloud.dataproc_v1',
+            WorkflowTemplateServiceClient=FakeWorkflowTemplateServiceClient)
+    }
+
+    google = sys.modules.get('google') or _module('google')
+    google_cloud = sys.modules.get('google.cloud') or _module('google.cloud')
+    if not hasattr(google, '__path__'):
+        google.__path__ = []
+    if not hasattr(google_cloud, '__path__'):
+        google_cloud.__path__ = []
+    google.cloud = google_cloud
+    sys.modules['google'] = google
+    sys.modules['google.cloud'] = google_cloud
+
+    for name, module in modules.items():
+        setattr(google_cloud, name, module)
+        sys.modules[f"google.cloud.{name}"] = module
+
+    return BROKER
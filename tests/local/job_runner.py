@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+spark-submit entry point of the local harness: installs the fakes over
+the shared storage directory and runs a Dataproc job script unchanged,
+as its __main__, with the remaining arguments.
+
+    spark-submit --conf spark.brwy.runId=... job_runner.py \
+        <storage_dir> <firestore_file> <job.py> [job args...]
+"""
+
+import os
+import runpy
+import sys
+
+from local import fakes
+
+
+def local_bigquery_sink(df, data_project_id, dataset_id, table_name,
+                        source_date, temp_bucket):
+    """Stand-in for load_to_bigquery: Parquet per source_date."""
+    df.write.mode('overwrite').parquet(
+        f"file://{fakes.STORAGE_DIR}/_bigquery/{table_name}/"
+        f"source_date={source_date}")
+
+
+def main():
+    """Run one job script against the fakes."""
+    storage_dir, firestore_file, script = sys.argv[1:4]
+    fakes.install(storage_dir)
+    if os.path.isfile(firestore_file):
+        fakes.load_firestore(firestore_file)
+
+    import brewery_transform
+    brewery_transform.load_to_bigquery = local_bigquery_sink
+
+    sys.argv = [script] + sys.argv[4:]
+    runpy.run_path(script, run_name='__main__')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Local end-to-end pipeline: scheduler message -> api-extract fan-out ->
+page invocations -> Firestore completion -> trigger-dataproc -> the
+total-load and total-transform job scripts, submitted to local-mode
+Spark with the template's job properties -> local BigQuery sink.
+"""
+
+import base64
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+import logging
+from types import SimpleNamespace
+from typing import Dict, Any, List
+
+from . import fakes
+from .fake_api import FakeBreweryApi
+
+logger = logging.getLogger(__name__)
+
+TESTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+REPO_ROOT = os.path.dirname(TESTS_DIR)
+FUNCTIONS_DIR = os.path.join(REPO_ROOT, 'scr', 'functions')
+# Packaged into each function archive next to its main.py (functions.tf)
+FUNCTIONS_COMMON_DIR = os.path.join(FUNCTIONS_DIR, 'common')
+DATAPROC_DIR = os.path.join(REPO_ROOT, 'scr', 'dataproc', 'breweries')
+DATAPROC_COMMON_DIR = os.path.join(DATAPROC_DIR, 'common')
+JOB_RUNNER = os.path.join(os.path.dirname(__file__), 'job_runner.py')
+
+BRONZE_BUCKET = 'bronze'
+SILVER_BUCKET = 'silver'
+PAGE_TOPIC = 'projects/local/topics/api-extract'
+TRIGGER_TOPIC = 'projects/local/topics/trigger-dataproc'
+LEDGER_TABLE = 'local.breweries_foundation.pipeline_run_ledger'
+BIGQUERY_TABLE = 'breweries_all_data'
+TEMPLATE_NAME = 'brwy-pipeline-template-local'
+
+# Jobs of the brwy_pipeline workflow template (dataproc.tf), in order
+TEMPLATE_JOBS = [
+    ('total-load', os.path.join(DATAPROC_DIR, 'load', 'total-load.py'),
+     ['DATE', BRONZE_BUCKET, SILVER_BUCKET]),
+    ('total-transform',
+     os.path.join(DATAPROC_DIR, 'transform', 'total-transform.py'),
+     ['DATE', SILVER_BUCKET, 'local', 'breweries_foundation',
+      'bigquery-temp', 'local'])
+]
+# local.dataproc_job_properties (dataproc.tf) without the GCP-only ones
+JOB_PROPERTIES = {
+    'spark.brwy.ledgerTable': LEDGER_TABLE,
+    'spark.brwy.runId': '',
+    'spark.brwy.traceparent': '',
+    'spark.brwy.traceExporter': 'none'
+}
+# Workflow template parameter -> job property it fills
+PROPERTY_PARAMETERS = {
+    'RUN_ID': 'spark.brwy.runId',
+    'TRACEPARENT': 'spark.brwy.traceparent'
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1,
+                       int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LocalPipeline:
+    """Runs the pipeline once against local stand-ins and reports timings."""
+
+    def __init__(self, workdir: str, total_breweries: int,
+                 page_workers: int = 8, seed: int = 0,
+                 record_source=None, api_latency: float = 0.0,
+                 parquet_fragments: bool = False,
+                 spark_master: str = 'local[*]',
+                 timeout: float = 600):
+        self.workdir = os.path.abspath(workdir)
+        self.storage_dir = os.path.join(self.workdir, 'gcs')
+        self.total_breweries = total_breweries
+        self.page_workers = page_workers
+        self.parquet_fragments = parquet_fragments
+        self.spark_master = spark_master
+        self.timeout = timeout
+        self.api = FakeBreweryApi(total_breweries, seed=seed,
+                                  record_source=record_source,
+                                  latency=api_latency)
+        self.firestore_file = os.path.join(self.workdir, 'firestore.json')
+
+    def _configure_environment(self, api_url: str):
+        """Environment read by the function and the Dataproc modules."""
+        os.environ.update({
+            'BREWERY_API_URL': api_url,
+            'PUBSUB_TOPIC': PAGE_TOPIC,
+            'TRIGGER_DATAPROC_TOPIC': TRIGGER_TOPIC,
+            'GCP_PROJECT': 'local',
+            'REGION': 'local',
+            'DATAPROC_TEMPLATE_NAME': TEMPLATE_NAME,
+            'DYNAMIC_CLUSTER_SIZING': 'false',
+            'GCS_BUCKET_BRONZE': BRONZE_BUCKET,
+            'GCS_BUCKET_SILVER': SILVER_BUCKET,
+            'LEDGER_TABLE': LEDGER_TABLE,
+            'STREAMING_LOAD': 'false',
+            'WRITE_PARQUET_FRAGMENTS': str(self.parquet_fragments).lower(),
+            'TRACE_EXPORTER': 'none',
+            'BRWY_STORAGE_ROOT': f"file://{self.storage_dir}/"
+        })
+
+    def _load_function(self, name: str):
+        """Import a Cloud Function's main.py as a fresh module."""
+        function_dir = os.path.join(FUNCTIONS_DIR, name)
+        for path in [FUNCTIONS_COMMON_DIR, function_dir]:
+            if path not in sys.path:
+                sys.path.insert(0, path)
+        # trigger-dataproc's breweries/ package directory
+        if DATAPROC_COMMON_DIR not in sys.path:
+            sys.path.append(DATAPROC_COMMON_DIR)
+        spec = importlib.util.spec_from_file_location(
+            f"{name.replace('-', '_')}_main",
+            os.path.join(function_dir, 'main.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def _run_extraction(self, broker) -> Dict[str, Any]:
+        """Scheduler message through every page until the trigger."""
+        api_extract = self._load_function('api-extract')
+        trigger_dataproc = self._load_function('trigger-dataproc')
+        broker.subscribe(PAGE_TOPIC, api_extract.main)
+        broker.subscribe(TRIGGER_TOPIC, trigger_dataproc.main)
+
+        scheduler_event = {
+            'data': base64.b64encode(
+                json.dumps({'type': 'all'}).encode('utf-8')).decode('utf-8'),
+            'attributes': {}
+        }
+        started = time.time()
+        api_extract.main(scheduler_event,
+                         SimpleNamespace(event_id='0', timestamp=None))
+
+        if not broker.wait_idle(timeout=self.timeout):
+            raise Exception(f"Extraction did not finish within "
+                            f"{self.timeout}s")
+        elapsed = time.time() - started
+
+        if not fakes.WORKFLOWS:
+            raise Exception(f"Dataproc was never triggered. Delivery "
+                            f"errors: {broker.errors[:5]}")
+
+        parameters = fakes.WORKFLOWS[-1]['parameters']
+        date = parameters['DATE']
+        job = fakes.firestore_document('extraction_jobs', date)
+        completed = [page for page in job['completed_pages'].values()
+                     if page['status'] == 'completed']
+
+        return {
+            'date': date,
+            'run_id': parameters['RUN_ID'],
+            'parameters': parameters,
+            'pages': len(completed),
+            'records': self.total_breweries,
+            'bronze_bytes': sum(page.get('bytes', 0) for page in completed),
+            'seconds': elapsed,
+            'pages_per_second': len(completed) / elapsed,
+            'records_per_second': self.total_breweries / elapsed,
+            'delivery_errors': list(broker.errors)
+        }
+
+    def _submit_job(self, script: str, args: List[str],
+                    properties: Dict[str, str]) -> float:
+        """
+        spark-submit a job script in local mode with --conf job
+        properties, as Dataproc does; returns the wall time
+        """
+        import pyspark
+
+        command = [os.path.join(os.path.dirname(pyspark.__file__), 'bin',
+                                'spark-submit'),
+                   '--master', self.spark_master,
+                   '--conf', 'spark.ui.showConsoleProgress=false']
+        for key, value in sorted(properties.items()):
+            if value:
+                command += ['--conf', f"{key}={value}"]
+        command += [JOB_RUNNER, self.storage_dir, self.firestore_file,
+                    script] + args
+
+        env = dict(os.environ,
+                   PYSPARK_PYTHON=sys.executable,
+                   PYSPARK_DRIVER_PYTHON=sys.executable,
+                   PYTHONPATH=os.pathsep.join(
+                       [TESTS_DIR, DATAPROC_COMMON_DIR] +
+                       [path for path in [os.environ.get('PYTHONPATH')]
+                        if path]))
+        started = time.time()
+        subprocess.run(command, check=True, env=env)
+        return time.time() - started
+
+    def _run_spark_jobs(self, parameters: Dict[str, str]) -> Dict[str, Any]:
+        """
+        The template jobs with the parameters trigger-dataproc sent,
+        resolved like the template parameter fields
+        """
+        # The jobs read the schema registry from the fake Firestore
+        fakes.save_firestore(self.firestore_file)
+
+        properties = dict(JOB_PROPERTIES)
+        for parameter, name in PROPERTY_PARAMETERS.items():
+            properties[name] = parameters.get(parameter, '')
+
+        job_seconds = {}
+        for step_id, script, args in TEMPLATE_JOBS:
+            logger.info(f"Submitting {step_id} to local Spark")
+            job_seconds[step_id] = self._submit_job(
+                script,
+                [parameters['DATE'] if arg == 'DATE' else arg
+                 for arg in args],
+                properties)
+
+        # Records and stage times come from the jobs' own ledger rows
+        stages = {(row['component'], row['stage']): row
+                  for row in fakes.bigquery_rows(LEDGER_TABLE)
+                  if row['run_id'] == parameters['RUN_ID']}
+        for key in [('total-load', 'load'),
+                    ('total-transform', 'transform')]:
+            if key not in stages:
+                raise Exception(f"No run ledger record for {key[0]} "
+                                f"{key[1]}: the job did not read its "
+                                f"job properties")
+        load = stages[('total-load', 'load')]
+        transform = stages[('total-transform', 'transform')]
+
+        return {
+            'load_records': load['records'],
+            'load_seconds': load['duration_seconds'],
+            'load_records_per_second':
+                load['records'] / load['duration_seconds'],
+            'load_job_seconds': job_seconds['total-load'],
+            'transform_records': transform['records'],
+            'transform_seconds': transform['duration_seconds'],
+            'transform_records_per_second':
+                transform['records'] / transform['duration_seconds'],
+            'transform_job_seconds': job_seconds['total-transform']
+        }
+
+    def stage_latency(self, run_id: str) -> List[Dict[str, Any]]:
+        """p50/p95/max per component and stage from the run ledger."""
+        durations = {}
+        for row in fakes.bigquery_rows(LEDGER_TABLE):
+            if row['run_id'] != run_id:
+                continue
+            key = (row['component'], row['stage'])
+            durations.setdefault(key, []).append(row['duration_seconds'])
+
+        return [
+            {
+                'component': component,
+                'stage': stage,
+                'count': len(values),
+                'p50_seconds': percentile(values, 0.5),
+                'p95_seconds': percentile(values, 0.95),
+                'max_seconds': max(values)
+            }
+            for (component, stage), values in sorted(durations.items())
+        ]
+
+    def run(self) -> Dict[str, Any]:
+        """Run the pipeline once and return the timing report."""
+        broker = fakes.install(self.storage_dir,
+                               max_workers=self.page_workers)
+        api_url = self.api.start()
+        self._configure_environment(api_url)
+
+        try:
+            started = time.time()
+            extraction = self._run_extraction(broker)
+            spark_jobs = self._run_spark_jobs(extraction['parameters'])
+            total_seconds = time.time() - started
+        finally:
+            self.api.stop()
+            broker.shutdown()
+
+        report = {
+            'total_breweries': self.total_breweries,
+            'page_workers': self.page_workers,
+            'parquet_fragments': self.parquet_fragments,
+            'total_seconds': total_seconds,
+            'extraction': extraction,
+            'spark': spark_jobs,
+            'stages': self.stage_latency(extraction['run_id'])
+        }
+
+        report_path = os.path.join(self.workdir, 'report.json')
+        with open(report_path, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+        logger.info(f"Report written to {report_path}")
+
+        return report
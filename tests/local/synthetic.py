@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Synthetic brewery generator modelled on the Open Brewery DB pages in
+test/bronze: same fields, realistic type/country mix and null rates,
+unicode names and a controlled share of duplicates.
+"""
+
+import json
+import os
+import random
+import uuid
+from typing import Dict, Any, Iterator, List
+
+# Approximate size of a full daily extraction (~43 pages of 200)
+BASE_BREWERIES = 8500
+BREWERIES_PER_PAGE = 200
+
+BREWERY_TYPES = [
+    ('micro', 0.53), ('brewpub', 0.30), ('planning', 0.06),
+    ('closed', 0.03), ('regional', 0.03), ('contract', 0.02),
+    ('large', 0.01), ('proprietor', 0.01), ('nano', 0.01)
+]
+
+# Share of records with each field empty
+NULL_RATES = {
+    'address_1': 0.10,
+    'address_2': 0.97,
+    'address_3': 0.995,
+    'coordinates': 0.25,
+    'phone': 0.10,
+    'website_url': 0.25
+}
+
+# (country, state, city, latitude, longitude, weight)
+LOCATIONS = [
+    ('United States', 'California', 'San Diego', 32.72, -117.16, 0.10),
+    ('United States', 'Colorado', 'Denver', 39.74, -104.99, 0.07),
+    ('United States', 'Washington', 'Seattle', 47.61, -122.33, 0.06),
+    ('United States', 'Oregon', 'Portland', 45.52, -122.68, 0.06),
+    ('United States', 'New York', 'Brooklyn', 40.68, -73.94, 0.06),
+    ('United States', 'Michigan', 'Grand Rapids', 42.96, -85.67, 0.05),
+    ('United States', 'Pennsylvania', 'Philadelphia', 39.95, -75.17, 0.05),
+    ('United States', 'Texas', 'Austin', 30.27, -97.74, 0.05),
+    ('United States', 'North Carolina', 'Asheville', 35.60, -82.55, 0.05),
+    ('United States', 'Ohio', 'Columbus', 39.96, -83.00, 0.04),
+    ('United States', 'Illinois', 'Chicago', 41.88, -87.63, 0.04),
+    ('United States', 'Florida', 'Tampa', 27.95, -82.46, 0.04),
+    ('United States', 'Wisconsin', 'Milwaukee', 43.04, -87.91, 0.04),
+    ('United States', 'Vermont', 'Burlington', 44.48, -73.21, 0.03),
+    ('United States', 'Massachusetts', 'Boston', 42.36, -71.06, 0.03),
+    ('United States', 'Virginia', 'Richmond', 37.54, -77.44, 0.03),
+    ('United States', 'Minnesota', 'Minneapolis', 44.98, -93.27, 0.02),
+    ('United States', 'Maine', 'Portland', 43.66, -70.26, 0.02),
+    ('Ireland', 'Dublin', 'Dublin', 53.35, -6.26, 0.015),
+    ('England', 'Greater London', 'London', 51.50, -0.09, 0.015),
+    ('Scotland', 'Edinburgh', 'Edinburgh', 55.95, -3.19, 0.01),
+    ('Germany', 'Bayern', 'München', 48.14, 11.58, 0.01),
+    ('France', 'Île-de-France', 'Paris', 48.86, 2.35, 0.01),
+    ('Poland', 'Małopolskie', 'Kraków', 50.06, 19.94, 0.01),
+    ('Portugal', 'Lisboa', 'Lisboa', 38.72, -9.14, 0.01),
+    ('South Korea', 'Gyeonggido', 'Suwon-si', 37.26, 127.07, 0.01),
+    ('South Korea', 'Busan', 'Suyeong-gu', 35.18, 129.12, 0.01),
+    ('Austria', 'Wien', 'Wien', 48.21, 16.37, 0.005),
+    ('Australia', 'Victoria', 'Melbourne', -37.81, 144.96, 0.005),
+    ('Singapore', 'Singapore', 'Singapore', 1.35, 103.82, 0.005),
+    ('Isle of Man', 'Isle of Man', 'Douglas', 54.15, -4.48, 0.005)
+]
+
+NAME_FIRST = ['Red', 'Iron', 'Lost', 'Old', 'Golden', 'Black', 'Copper',
+              'River', 'Mountain', 'Wild', 'Stone', 'Hidden', 'Lucky',
+              'Broken', 'Twin', 'North', 'Salty', 'Rusty', 'Blue',
+              'Little']
+NAME_SECOND = ['Fox', 'Anchor', 'Barrel', 'Hop', 'Oak', 'Bear', 'Owl',
+               'Harbor', 'Creek', 'Pine', 'Crow', 'Ridge', 'Mill',
+               'Bridge', 'Lantern', 'Goat', 'Wolf', 'Kettle', 'Dog',
+               'Tide']
+NAME_SUFFIX = ['Brewing Company', 'Brewing Co.', 'Brewery', 'Beer Co.',
+               'Brewpub', 'Craft Brewery', 'Ales', 'Brewing',
+               'Taproom', 'Brewhouse']
+LOCAL_NAMES = {
+    'Germany': ['Brauerei {w}', '{w} Bräu', 'Brauhaus {w}'],
+    'Austria': ['Brauerei {w}', '{w} Bräu'],
+    'France': ['Brasserie {w}', 'Brasserie de l\'{w}'],
+    'Poland': ['Browar {w}', 'Browar Łódź {w}'],
+    'Portugal': ['Cervejaria {w}', 'Fábrica {w}'],
+    'South Korea': ['{h}브루어리({w} Brewery)', '{h} 브루잉({w} Brewing)'],
+}
+HANGUL = ['파머스', '펜더멘탈', '프라하', '플레이그라운드', '핸드앤몰트',
+          '허심청', '헤이스탁', '화이트크로우']
+STREETS = ['Main St', 'Market St', 'Broadway', 'Water St', '1st Ave',
+           'Oak St', 'Industrial Blvd', 'Harbor Rd', 'Mill St',
+           'Commerce Dr']
+
+
+def _weighted(rng: random.Random, choices):
+    total = sum(weight for *_, weight in choices)
+    point = rng.random() * total
+    for choice in choices:
+        point -= choice[-1]
+        if point <= 0:
+            return choice
+    return choices[-1]
+
+
+def _postal_code(rng: random.Random, country: str) -> str:
+    if country == 'United States':
+        zip_code = f"{rng.randint(1000, 99999):05d}"
+        return (f"{zip_code}-{rng.randint(0, 9999):04d}"
+                if rng.random() < 0.6 else zip_code)
+    if country in ('England', 'Scotland', 'Isle of Man'):
+        letters = 'ABCDEFGHJKLMNPRSTUWXY'
+        return (f"{rng.choice(letters)}{rng.choice(letters)}"
+                f"{rng.randint(1, 20)} {rng.randint(1, 9)}"
+                f"{rng.choice(letters)}{rng.choice(letters)}")
+    if country == 'Ireland':
+        return f"D{rng.randint(1, 24):02d} X{rng.randint(100, 999)}"
+    return f"{rng.randint(1000, 99999):05d}"
+
+
+def _phone(rng: random.Random, country: str) -> str:
+    if country == 'United States':
+        return f"{rng.randint(201, 989)}{rng.randint(2000000, 9999999)}"
+    if country == 'South Korea':
+        return (f"0{rng.randint(31, 70)}-{rng.randint(100, 9999)}-"
+                f"{rng.randint(1000, 9999)}")
+    if country in ('England', 'Scotland'):
+        return f"+44 {rng.randint(20, 29)} {rng.randint(1000, 9999)} " \
+               f"{rng.randint(1000, 9999)}"
+    return f"+{rng.randint(30, 65)} {rng.randint(100000000, 999999999)}"
+
+
+def _name(rng: random.Random, country: str) -> str:
+    words = f"{rng.choice(NAME_FIRST)} {rng.choice(NAME_SECOND)}"
+    if country in LOCAL_NAMES and rng.random() < 0.7:
+        return rng.choice(LOCAL_NAMES[country]).format(
+            w=words, h=rng.choice(HANGUL))
+    return f"{words} {rng.choice(NAME_SUFFIX)}"
+
+
+def _name_variant(rng: random.Random, name: str) -> str:
+    """Spelling variant of a name as seen in duplicate listings."""
+    variants = [
+        name.upper(),
+        name.replace('Company', 'Co.').replace('Brewing Co.', 'Brewing'),
+        name.replace(' ', '  '),
+        f"The {name}",
+        name.replace('Brewing', 'Brewery'),
+        name + ' - Taproom'
+    ]
+    return rng.choice(variants)
+
+
+class SyntheticBreweries:
+    """Deterministic record source: record(index) -> brewery dict."""
+
+    def __init__(self, seed: int = 0, duplicate_rate: float = 0.02,
+                 exact_duplicate_rate: float = 0.002):
+        self.seed = seed
+        # Same brewery under a new id with a name variant
+        self.duplicate_rate = duplicate_rate
+        # Same id served twice (page overlap in the API)
+        self.exact_duplicate_rate = exact_duplicate_rate
+
+    def _rng(self, index: int, stream: str = 'base') -> random.Random:
+        return random.Random(f"{self.seed}:{stream}:{index}")
+
+    def _base_record(self, index: int) -> Dict[str, Any]:
+        rng = self._rng(index)
+        country, state, city, lat, lon, _ = _weighted(rng, LOCATIONS)
+        brewery_type, _ = _weighted(rng, BREWERY_TYPES)
+        has_coordinates = rng.random() >= NULL_RATES['coordinates']
+
+        street = (f"{rng.randint(1, 9999)} {rng.choice(STREETS)}"
+                  if rng.random() >= NULL_RATES['address_1'] else None)
+        slug = f"{rng.choice(NAME_FIRST)}{rng.choice(NAME_SECOND)}".lower()
+
+        return {
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'name': _name(rng, country),
+            'brewery_type': brewery_type,
+            'address_1': street,
+            'address_2': (f"Suite {rng.randint(100, 999)}"
+                          if rng.random() >= NULL_RATES['address_2']
+                          else None),
+            'address_3': (f"Unit {rng.randint(1, 20)}"
+                          if rng.random() >= NULL_RATES['address_3']
+                          else None),
+            'city': city,
+            'state_province': state,
+            'postal_code': _postal_code(rng, country),
+            'country': country,
+            'longitude': (round(lon + rng.uniform(-0.3, 0.3), 7)
+                          if has_coordinates else None),
+            'latitude': (round(lat + rng.uniform(-0.3, 0.3), 8)
+                         if has_coordinates else None),
+            'phone': (_phone(rng, country)
+                      if rng.random() >= NULL_RATES['phone'] else None),
+            'website_url': (f"http://www.{slug}{index}.com"
+                            if rng.random() >= NULL_RATES['website_url']
+                            else None),
+            'state': state,
+            'street': street
+        }
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Brewery at a position of the listing."""
+        rng = self._rng(index, 'duplicate')
+        if index > 0:
+            roll = rng.random()
+            if roll < self.exact_duplicate_rate:
+                return self._base_record(rng.randrange(index))
+            if roll < self.exact_duplicate_rate + self.duplicate_rate:
+                duplicate = self._base_record(rng.randrange(index))
+                duplicate['id'] = str(uuid.UUID(int=rng.getrandbits(128)))
+                duplicate['name'] = _name_variant(rng, duplicate['name'])
+                return duplicate
+        return self._base_record(index)
+
+    def pages(self, total: int,
+              per_page: int = BREWERIES_PER_PAGE) -> Iterator[List[dict]]:
+        """Records split in API pages."""
+        for start in range(0, total, per_page):
+            yield [self.record(index)
+                   for index in range(start, min(start + per_page, total))]
+
+    def write_bronze(self, bronze_dir: str, date: str, total: int,
+                     per_page: int = BREWERIES_PER_PAGE) -> int:
+        """
+        Write page_N.json files as api-extract does; returns total bytes
+        """
+        date_dir = os.path.join(bronze_dir, date)
+        os.makedirs(date_dir, exist_ok=True)
+        total_bytes = 0
+        for page_number, page in enumerate(self.pages(total, per_page), 1):
+            content = json.dumps(page, indent=2, ensure_ascii=False)
+            path = os.path.join(date_dir, f"page_{page_number}.json")
+            with open(path, 'w', encoding='utf-8') as page_file:
+                page_file.write(content)
+            total_bytes += len(content.encode('utf-8'))
+        return total_bytes
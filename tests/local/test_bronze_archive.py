@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Round trip of bronze pages through the monthly archive
+(common/bronze_archive.py) over the local GCS fake:
+pytest tests/local/test_bronze_archive.py
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+from . import fakes
+
+DATAPROC_COMMON_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__), '..', '..', 'scr', 'dataproc', 'breweries',
+    'common'))
+BUCKET = 'bronze'
+
+# Line separators json.dumps(ensure_ascii=False) leaves unescaped
+PAGES = {
+    1: [{'id': 'a', 'name': 'Next\x85Line Brewing'},
+        {'id': 'b', 'name': 'Line\u2028Separator Ales'},
+        {'id': 'c', 'name': 'Paragraph\u2029Taproom'}],
+    2: [{'id': 'd', 'name': 'Plain Brewery'},
+        {'id': 'e', 'name': 'Escaped\nNewline Pub'}]
+}
+
+
+@pytest.fixture
+def bronze_archive(tmp_path):
+    fakes.install(str(tmp_path / 'gcs'))
+    if DATAPROC_COMMON_DIR not in sys.path:
+        sys.path.insert(0, DATAPROC_COMMON_DIR)
+    import bronze_archive
+    bronze_archive._cached_index.cache_clear()
+    yield bronze_archive
+    bronze_archive._cached_index.cache_clear()
+
+
+def write_pages(date):
+    bucket = fakes.FakeStorageClient().bucket(BUCKET)
+    for page, records in PAGES.items():
+        bucket.blob(f"{date}/page_{page}.json").upload_from_string(
+            json.dumps(records, ensure_ascii=False))
+
+
+def test_archived_date_round_trip(bronze_archive):
+    dates = ['2025-01-01', '2025-01-02']
+    for date in dates:
+        write_pages(date)
+
+    # Two compactions, so the second date is appended with a compose
+    for date in dates:
+        compressed = bronze_archive.compress_date_pages(BUCKET, date)
+        bronze_archive.append_to_archive(BUCKET, '2025-01', [compressed])
+        bronze_archive.delete_raw_pages(BUCKET, date)
+
+    expected = [(page, record) for page, records in sorted(PAGES.items())
+                for record in records]
+    for date in dates:
+        pairs = bronze_archive.read_archived_date(BUCKET, date)
+        assert [(page, json.loads(line)) for page, line in pairs] == expected
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end run of the pipeline on one machine.
+"""
+
+import sys
+import os
+import argparse
+import logging
+import tempfile
+
+# Add the tests directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+from local.pipeline import LocalPipeline
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def log_report(report: dict):
+    """Print throughput and stage latency."""
+    extraction = report['extraction']
+    spark = report['spark']
+
+    logger.info(f"\n{'='*60}")
+    logger.info("📊 LOCAL PIPELINE REPORT")
+    logger.info(f"{'='*60}")
+    logger.info(f"⏱️  End to end: {report['total_seconds']:.2f}s "
+                f"({report['total_breweries']} breweries)")
+    logger.info(f"📥 Extraction: {extraction['pages']} pages in "
+                f"{extraction['seconds']:.2f}s "
+                f"({extraction['pages_per_second']:.1f} pages/s, "
+                f"{extraction['records_per_second']:.0f} records/s)")
+    logger.info(f"🥈 Load: {spark['load_records']} records in "
+                f"{spark['load_seconds']:.2f}s "
+                f"({spark['load_records_per_second']:.0f} records/s)")
+    logger.info(f"🥇 Transform: {spark['transform_records']} records in "
+                f"{spark['transform_seconds']:.2f}s "
+                f"({spark['transform_records_per_second']:.0f} records/s)")
+
+    logger.info("\n📋 Stage latency (run ledger):")
+    for stage in report['stages']:
+        logger.info(f"  {stage['component']:<18} {stage['stage']:<22} "
+                    f"n={stage['count']:<5} "
+                    f"p50={stage['p50_seconds']:.3f}s "
+                    f"p95={stage['p95_seconds']:.3f}s "
+                    f"max={stage['max_seconds']:.3f}s")
+
+    if extraction['delivery_errors']:
+        logger.error(f"❌ {len(extraction['delivery_errors'])} message "
+                     f"deliveries failed")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Run the pipeline locally with fake cloud services')
+
+    parser.add_argument('--breweries', type=int, default=2000,
+                        help='Breweries served by the fake API')
+    parser.add_argument('--page-workers', type=int, default=8,
+                        help='Concurrent page invocations')
+    parser.add_argument('--api-latency', type=float, default=0.0,
+                        help='Seconds of latency per fake API request')
+    parser.add_argument('--parquet-fragments', action='store_true',
+                        help='Write Parquet fragments in api-extract')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the synthetic breweries')
+    parser.add_argument('--workdir', default=None,
+                        help='Directory for buckets and the report '
+                             '(temporary by default)')
+    parser.add_argument('--spark-master', default='local[*]',
+                        help='Spark master URL')
+    parser.add_argument('--timeout', type=int, default=600,
+                        help='Timeout in seconds for the extraction')
+
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+    workdir = args.workdir or tempfile.mkdtemp(prefix='brwy-local-')
+
+    pipeline = LocalPipeline(
+        workdir, args.breweries,
+        page_workers=args.page_workers, seed=args.seed,
+        api_latency=args.api_latency,
+        parquet_fragments=args.parquet_fragments,
+        spark_master=args.spark_master, timeout=args.timeout)
+
+    try:
+        report = pipeline.run()
+    except KeyboardInterrupt:
+        logger.error("🛑 Local run interrupted")
+        sys.exit(130)
+    except Exception as e:
+        logger.error(f"💥 Local run failed: {e}")
+        sys.exit(1)
+
+    log_report(report)
+    sys.exit(1 if report['extraction']['delivery_errors'] else 0)
+
+
+if __name__ == "__main__":
+    main()
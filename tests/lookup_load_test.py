@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Load test for the brewery-lookup function: in-process against the index
+(synthetic breweries or a local silver partition) or over HTTP against a
+deployed function.
+"""
+
+import sys
+import os
+import time
+import random
+import argparse
+import logging
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the tests directory, the lookup function and the shared search
+# index module (packaged into the function by functions.tf) to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scr',
+                                'dataproc', 'breweries', 'common'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scr',
+                                'functions', 'brewery-lookup'))
+
+from brewery_index import BreweryIndex, LOOKUP_COLUMNS
+from search_index import SearchIndex, build_search_index, tokenize
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Bronze fields in the same order as the silver LOOKUP_COLUMNS
+BRONZE_FIELDS = ['id', 'name', 'brewery_type', 'address_1', 'address_2',
+                 'address_3', 'city', 'state_province', 'postal_code',
+                 'country', 'longitude', 'latitude', 'phone', 'website_url',
+                 'state', 'street']
+# Share of id lookups for unknown ids
+MISS_RATE = 0.05
+
+
+def percentiles(samples: list) -> dict:
+    """p50/p95/p99/max of a list of latencies."""
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        'p50': ordered[int(last * 0.50)],
+        'p95': ordered[int(last * 0.95)],
+        'p99': ordered[int(last * 0.99)],
+        'max': ordered[-1],
+        'mean': statistics.fmean(ordered)
+    }
+
+
+def log_percentiles(name: str, samples: list, unit: str):
+    """Print the latency percentiles of one kind of request."""
+    stats = percentiles(samples)
+    logger.info(f"  {name:<14} n={len(samples):<7} "
+                f"p50={stats['p50']:.1f}{unit} p95={stats['p95']:.1f}{unit} "
+                f"p99={stats['p99']:.1f}{unit} max={stats['max']:.1f}{unit}")
+
+
+def synthetic_table(total: int, seed: int):
+    """Arrow table with silver column names from synthetic breweries."""
+    import pyarrow as pa
+    from local.synthetic import SyntheticBreweries
+
+    generator = SyntheticBreweries(seed=seed)
+    records = [generator.record(i) for i in range(total)]
+    return pa.table({
+        column: [record[field] for record in records]
+        for field, column in zip(BRONZE_FIELDS, LOOKUP_COLUMNS)
+    })
+
+
+def build_queries(sample: list, count: int, seed: int) -> list:
+    """Mix of id, state and state+city lookups from sampled breweries."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        row = rng.choice(sample)
+        roll = rng.random()
+        if roll < 0.8:
+            brewery_id = (row['id_brewery'] if rng.random() >= MISS_RATE
+                          else f"missing-{rng.getrandbits(32)}")
+            queries.append(('id', {'id': brewery_id}))
+        elif roll < 0.9:
+            queries.append(('state', {'state': row['name_state']}))
+        else:
+            queries.append(('state+city', {'state': row['name_state'],
+                                           'city': row['name_city']}))
+    return queries
+
+
+def build_search_queries(sample: list, count: int, seed: int) -> list:
+    """Name prefixes as typed in an autocomplete, a share with a typo."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        tokens = tokenize(rng.choice(sample)['name_brewery'])
+        if not tokens:
+            continue
+        token = rng.choice(tokens)
+        query = token[:rng.randint(min(3, len(token)), len(token))]
+        if len(query) > 5 and rng.random() < 0.2:
+            position = rng.randrange(len(query))
+            query = query[:position] + query[position + 1:]
+        queries.append(query)
+    return queries
+
+
+def run_in_process(args):
+    """Time lookups directly against the index."""
+    import pyarrow.parquet as pq
+
+    started = time.time()
+    if args.parquet:
+        table = pq.read_table(args.parquet)
+        # Older silver snapshots (test/silver) still use the bronze names
+        if 'id' in table.column_names:
+            table = table.rename_columns([
+                dict(zip(BRONZE_FIELDS, LOOKUP_COLUMNS)).get(name, name)
+                for name in table.column_names])
+        snapshot = (os.path.basename(args.parquet.rstrip('/')), 0)
+    else:
+        table = synthetic_table(args.breweries, args.seed)
+        snapshot = ('synthetic', 0)
+    index = BreweryIndex(table, snapshot)
+    logger.info(f"📦 Index: {index.num_rows} breweries, "
+                f"{index.nbytes / 2**20:.1f} MB columnar, built in "
+                f"{time.time() - started:.2f}s")
+
+    started = time.time()
+    search = SearchIndex(build_search_index(table.to_pylist()))
+    logger.info(f"🔎 Search index: {search.num_terms} terms, built in "
+                f"{time.time() - started:.2f}s")
+
+    rng = random.Random(args.seed)
+    sample = index.rows(rng.sample(range(index.num_rows),
+                                   min(1000, index.num_rows)))
+
+    latencies = {}
+    for kind, params in build_queries(sample, args.requests, args.seed):
+        filters = {k: v for k, v in params.items() if k != 'id'}
+        started = time.perf_counter_ns()
+        if kind == 'id':
+            index.get_json(params['id'])
+        else:
+            index.find_json(filters, limit=args.limit)
+        elapsed_us = (time.perf_counter_ns() - started) / 1000
+        latencies.setdefault(kind, []).append(elapsed_us)
+
+    for query in build_search_queries(sample, args.requests // 10,
+                                      args.seed):
+        started = time.perf_counter_ns()
+        search.search(query)
+        elapsed_us = (time.perf_counter_ns() - started) / 1000
+        latencies.setdefault('search', []).append(elapsed_us)
+
+    logger.info("⏱️  In-process latency:")
+    for kind, samples in latencies.items():
+        log_percentiles(kind, samples, 'µs')
+
+
+def run_http(args):
+    """Load a deployed function with concurrent HTTP requests."""
+    import requests
+
+    headers = {'Authorization': f"Bearer {args.token}"} if args.token else {}
+    session = requests.Session()
+    listing = session.get(args.url, params={'limit': 1000},
+                          headers=headers, timeout=60)
+    listing.raise_for_status()
+    snapshot = listing.json()
+    logger.info(f"📦 Snapshot {snapshot['snapshot_date']}: "
+                f"{snapshot['total']} breweries")
+
+    queries = build_queries(snapshot['breweries'], args.requests, args.seed)
+
+    def send(query):
+        kind, params = query
+        started = time.perf_counter()
+        response = session.get(args.url, params={**params,
+                                                 'limit': args.limit},
+                               headers=headers, timeout=30)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        timing = response.headers.get('Server-Timing', '')
+        server_ms = (float(timing.split('dur=')[1])
+                     if 'dur=' in timing else None)
+        return kind, response.status_code, elapsed_ms, server_ms
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(executor.map(send, queries))
+    duration = time.time() - started
+
+    errors = [r for r in results if r[1] >= 500]
+    logger.info(f"🚀 {len(results)} requests in {duration:.2f}s "
+                f"({len(results) / duration:.0f} req/s, "
+                f"{len(errors)} errors)")
+    logger.info("⏱️  Client latency:")
+    for kind in sorted({r[0] for r in results}):
+        log_percentiles(kind, [r[2] for r in results if r[0] == kind], 'ms')
+    server = [r[3] for r in results if r[3] is not None]
+    if server:
+        log_percentiles('server lookup', server, 'ms')
+    return not errors
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Load test the brewery lookup service')
+
+    parser.add_argument('--url', default=None,
+                        help='Deployed function URL (in-process if omitted)')
+    parser.add_argument('--token', default=None,
+                        help='Identity token for a private function')
+    parser.add_argument('--parquet', default=None,
+                        help='Local silver partition directory '
+                             '(synthetic breweries if omitted)')
+    parser.add_argument('--breweries', type=int, default=50000,
+                        help='Synthetic breweries to index')
+    parser.add_argument('--requests', type=int, default=20000,
+                        help='Lookups to send')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='Concurrent HTTP requests')
+    parser.add_argument('--limit', type=int, default=100,
+                        help='Page size of state/city lookups')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the synthetic data and query mix')
+
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+
+    try:
+        if args.url:
+            success = run_http(args)
+        else:
+            run_in_process(args)
+            success = True
+    except Exception as e:
+        logger.error(f"💥 Load test failed: {e}")
+        sys.exit(1)
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the load and transform jobs on synthetic data.
+"""
+
+import sys
+import os
+import json
+import math
+import argparse
+import logging
+import subprocess
+import tempfile
+from datetime import datetime
+
+# Add the tests directory to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__)))
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+TIMED_STEPS = ['load_seconds', 'transform_seconds']
+# Time growing faster than n^1.2 between scales is reported as superlinear
+SCALING_EXPONENT_LIMIT = 1.2
+# Per-record time this much slower than the baseline is a regression
+REGRESSION_RATIO = 1.25
+
+
+def run_scale_process(scale: float, args, workdir: str) -> dict:
+    """Run one scale in a child process and return its result."""
+    output = os.path.join(workdir, f"result-{scale:g}.json")
+    command = [
+        sys.executable, '-m', 'local.benchmark',
+        '--scale', str(scale), '--workdir', workdir,
+        '--seed', str(args.seed), '--spark-master', args.spark_master,
+        '--output', output
+    ]
+    logger.info(f"🧪 Running scale x{scale:g}...")
+    subprocess.run(command, check=True,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    with open(output) as result_file:
+        return json.load(result_file)
+
+
+def scaling_exponents(results: list) -> list:
+    """
+    Exponent k of time ~ records^k between consecutive scales (1.0 is
+    linear)
+    """
+    exponents = []
+    for previous, current in zip(results, results[1:]):
+        growth = math.log(current['records'] / previous['records'])
+        entry = {'from_scale': previous['scale'],
+                 'to_scale': current['scale']}
+        for step in TIMED_STEPS:
+            if previous[step] > 0 and current[step] > 0 and growth:
+                entry[step] = math.log(current[step] / previous[step]) \
+                    / growth
+        exponents.append(entry)
+    return exponents
+
+
+def compare_with_baseline(results: list, baseline: dict) -> list:
+    """Per-record time against a previous report, matched by scale."""
+    baseline_by_scale = {r['scale']: r for r in baseline['results']}
+    regressions = []
+    for result in results:
+        previous = baseline_by_scale.get(result['scale'])
+        if not previous:
+            continue
+        for step in TIMED_STEPS:
+            ratio = ((result[step] / result['records'])
+                     / (previous[step] / previous['records']))
+            if ratio >= REGRESSION_RATIO:
+                regressions.append({'scale': result['scale'],
+                                    'step': step, 'ratio': ratio})
+    return regressions
+
+
+def log_report(report: dict):
+    """Print the benchmark table and scaling findings."""
+    logger.info(f"\n{'='*78}")
+    logger.info("📊 SCALING BENCHMARK")
+    logger.info(f"{'='*78}")
+    logger.info(f"{'scale':>7} {'records':>10} {'bronze MB':>10} "
+                f"{'load s':>8} {'transform s':>12} {'output MB':>10} "
+                f"{'JVM MB':>8}")
+    for result in report['results']:
+        jvm = result['jvm_peak_rss_mb']
+        jvm_text = '-' if jvm is None else f"{jvm:.0f}"
+        logger.info(f"{result['scale']:>7g} {result['records']:>10} "
+                    f"{result['bronze_bytes'] / 2**20:>10.1f} "
+                    f"{result['load_seconds']:>8.2f} "
+                    f"{result['transform_seconds']:>12.2f} "
+                    f"{result['output_bytes'] / 2**20:>10.1f} "
+                    f"{jvm_text:>8}")
+
+    for entry in report['scaling_exponents']:
+        for step in TIMED_STEPS:
+            exponent = entry.get(step)
+            if exponent is None:
+                continue
+            flag = ("⚠️ superlinear" if exponent > SCALING_EXPONENT_LIMIT
+                    else "")
+            logger.info(f"  x{entry['from_scale']:g} -> "
+                        f"x{entry['to_scale']:g} {step}: "
+                        f"n^{exponent:.2f} {flag}")
+
+    for regression in report.get('regressions', []):
+        logger.error(f"❌ x{regression['scale']:g} {regression['step']} "
+                     f"is {regression['ratio']:.2f}x slower per record "
+                     f"than the baseline")
+
+
+def parse_arguments():
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark load and transform at growing volumes')
+
+    parser.add_argument('--scales', default='1,10,100',
+                        help='Comma-separated multiples of today\'s '
+                             'volume (e.g. 1,10,100,1000)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Seed of the synthetic breweries')
+    parser.add_argument('--workdir', default=None,
+                        help='Directory for generated data '
+                             '(temporary by default)')
+    parser.add_argument('--spark-master', default='local[*]',
+                        help='Spark master URL')
+    parser.add_argument('--output', default='scaling_benchmark.json',
+                        help='JSON report path')
+    parser.add_argument('--baseline', default=None,
+                        help='Previous JSON report to compare against')
+
+    return parser.parse_args()
+
+
+def main():
+    """Main entry point."""
+    args = parse_arguments()
+    workdir = args.workdir or tempfile.mkdtemp(prefix='brwy-bench-')
+    scales = sorted(float(scale) for scale in args.scales.split(','))
+
+    try:
+        results = [run_scale_process(scale, args, workdir)
+                   for scale in scales]
+    except subprocess.CalledProcessError as e:
+        logger.error(f"💥 Benchmark scale failed: {e}")
+        sys.exit(1)
+
+    report = {
+        'created_at': datetime.now().isoformat(),
+        'spark_master': args.spark_master,
+        'seed': args.seed,
+        'results': results,
+        'scaling_exponents': scaling_exponents(results)
+    }
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report['regressions'] = compare_with_baseline(
+                results, json.load(baseline_file))
+
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+
+    log_report(report)
+    logger.info(f"Report written to {args.output}")
+    sys.exit(1 if report.get('regressions') else 0)
+
+
+if __name__ == "__main__":
+    main()
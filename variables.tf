@@ -35,3 +35,33 @@ variable "subnet_name" {
     description = "Subnet name for dataproc cluster"
     default = "default"
 }
+
+variable "streaming-load" {
+    type = bool
+    description = "Start the streaming load at extraction fan-out instead of the batch load after the last page"
+    default = false
+}
+
+variable "parquet-fragments" {
+    type = bool
+    description = "Write a typed Parquet fragment next to each bronze JSON page in api-extract"
+    default = false
+}
+
+variable "trace-exporter" {
+    type = string
+    description = "Span exporter for functions and Dataproc jobs: none, log, file or otlp (OTEL_EXPORTER_OTLP_ENDPOINT)"
+    default = "none"
+}
+
+variable "spark-profiling" {
+    type = bool
+    description = "Write per-stage Spark metrics profiles of the load and transform jobs to the Dataproc staging bucket"
+    default = false
+}
+
+variable "corrupt-page-budget" {
+    type = number
+    description = "Fraction of the bronze pages of a date that may hold corrupt records before total-load fails (they are quarantined in silver)"
+    default = 0.05
+}